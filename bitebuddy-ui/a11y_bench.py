@@ -0,0 +1,595 @@
+"""
+Benchmarks for the accessibility fixer (accessibility_fix.py).
+
+Usage:
+  python a11y_bench.py audit --pages 20                      # URLs derived from src/page (route-map.json aware)
+  python a11y_bench.py audit --url http://localhost:8989/login --pages 50
+  python a11y_bench.py postprocess --lines 5000              # regex chain vs. single pass (nested / self-closing)
+  python a11y_bench.py stream --elements 20                  # streamed vs blocking calls on a bad first answer
+  python a11y_bench.py startup --max-ms 300                  # `python -X importtime` of accessibility_fix
+  python a11y_bench.py e2e --sizes 10 100 1000               # offline pipeline on a synthetic corpus
+"""
+import argparse
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import accessibility_fix as fixer
+from a11y_stream import FakeBedrockClient
+
+
+def collect_urls(explicit_urls, pages):
+    """Repeat the given URLs (or the routes under JSX_FOLDER) until `pages` URLs are collected."""
+    urls = list(explicit_urls or [])
+    if not urls:
+        route_map = fixer.load_route_map()
+        targets = list(fixer.JSX_FOLDER.rglob("*.jsx")) + list(fixer.JSX_FOLDER.rglob("*.tsx"))
+        urls = [fixer.file_path_to_route(t, route_map) for t in targets]
+    if not urls:
+        raise SystemExit("No URLs to audit: pass --url or add pages under " + str(fixer.JSX_FOLDER))
+    return [urls[i % len(urls)] for i in range(pages)]
+
+
+def _timed(label, urls, audit):
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        ok = 0
+        for i, url in enumerate(urls):
+            if audit(url, Path(tmp) / f"{i}.json"):
+                ok += 1
+        elapsed = time.perf_counter() - started
+    result = {
+        "mode": label,
+        "pages": len(urls),
+        "succeeded": ok,
+        "seconds": round(elapsed, 3),
+        "pages_per_minute": round(len(urls) / elapsed * 60, 2) if elapsed else None,
+    }
+    print(f"{label:<12} {len(urls):>5} pages  {elapsed:8.2f}s  {result['pages_per_minute']:>8} pages/min  ({ok} ok)")
+    return result
+
+
+def bench_audit(urls):
+    """Compare the per-page `node accessibility-check.js` path with the shared AuditWorker."""
+    fixer.write_check_script()
+    results = [_timed("subprocess", urls, fixer.run_subprocess_audit)]
+    with fixer.AuditWorker() as worker:
+        results.append(_timed("worker", urls, lambda url, out: fixer.run_worker_audit(worker, url, out)))
+    base, warm = results[0]["seconds"], results[1]["seconds"]
+    if base and warm:
+        print(f"speedup: {base / warm:.2f}x")
+    return results
+
+
+# ---------- JSX post-processing ----------
+# The regex chain accessibility_fix.py ran before postprocess_jsx(); kept as the baseline.
+def add_aria_labels_to_buttons(jsx: str) -> str:
+    def replace(m):
+        attrs, inner = m.group(1), m.group(2).strip()
+        if 'aria-label=' in attrs or not inner:
+            return m.group(0)
+        if attrs.strip().endswith('/'):
+            attrs = attrs.strip()[:-1]
+        return f'<Button{attrs} aria-label="{inner}">{inner}</Button>'
+    return re.sub(r"<Button([^>]*)>(.*?)</Button>", replace, jsx, flags=re.DOTALL)
+
+
+def add_aria_labels_to_icons(jsx: str) -> str:
+    def replace(m):
+        tag, attrs = m.group(1), m.group(2).strip()
+        if 'aria-label=' not in attrs:
+            label = "Edit icon" if tag.lower().startswith("edit") else "Trash icon"
+            return f'<{tag} {attrs} aria-label="{label}" />'
+        return m.group(0)
+    return re.sub(r"<(Edit|Trash)([^>]*)/>", replace, jsx, flags=re.IGNORECASE)
+
+
+def add_aria_labels_to_typography(jsx: str) -> str:
+    """
+    Add aria-label to Typography elements that don't already have one.
+    Automatically quotes and escapes the value for JSX.
+    """
+    def replace(match):
+        attrs = match.group(1)
+        inner = match.group(2).strip()
+        # Skip if already has aria-label or if no content
+        if 'aria-label=' in attrs or not inner:
+            return match.group(0)
+        # Clean up the inner text for aria-label (remove HTML tags, React expressions)
+        clean_text = re.sub(r'<[^>]+>', '', inner)  # Remove HTML tags
+        clean_text = re.sub(r'\{[^}]*\}', '', clean_text)  # Remove React expressions
+        clean_text = re.sub(r'\s+', ' ', clean_text).strip()  # Normalize whitespace
+        clean_text = clean_text.replace('"', '&quot;')  # Escape quotes
+        # For React intl.formatMessage, extract message ID if present
+        if '{intl.formatMessage' in inner:
+            id_match = re.search(r"id:\s*['\"]([^'\"]+)['\"]", inner)
+            if id_match:
+                message_id = id_match.group(1).replace('-', ' ').replace('_', ' ')
+                clean_text = message_id.title()
+        # Limit length
+        if len(clean_text) > 100:
+            clean_text = clean_text[:97] + '...'
+        # Only add aria-label if meaningful
+        if clean_text and len(clean_text) > 2:
+            if attrs.strip():
+                return f'<Typography{attrs} aria-label={inner}>{inner}</Typography>'
+            else:
+                return f'<Typography aria-label={inner}>{inner}</Typography>'
+        return match.group(0)
+    return re.sub(r"<Typography([^>]*)>(.*?)</Typography>", replace, jsx, flags=re.DOTALL)
+
+
+def add_tabindex_to_focusable(jsx: str) -> str:
+    pattern = r"<(span|Typography|p|Table|TableCell|TableHead)([^>]*)>(.*?)</\1>|<(TableCell)([^>]*)/>"
+    def patch(m):
+        tag = m.group(1) or m.group(4)
+        attrs = m.group(2) or m.group(5) or ""
+        content = m.group(3) or ""
+        if 'tabindex=' not in attrs.lower():
+            if tag in ["TableCell"]:
+                return f'<{tag}{attrs} tabIndex="0" />'
+            return f'<{tag}{attrs} tabIndex="0">{content}</{tag}>'
+        return m.group(0)
+    return re.sub(pattern, patch, jsx, flags=re.IGNORECASE | re.DOTALL)
+
+
+def legacy_regex_chain(jsx: str) -> str:
+    jsx = add_aria_labels_to_buttons(jsx)
+    jsx = add_tabindex_to_focusable(jsx)
+    jsx = add_aria_labels_to_icons(jsx)
+    return add_aria_labels_to_typography(jsx)
+
+
+_SECTION = """      <Typography variant="h6">Section {n} <Typography component="span">nested {n}</Typography></Typography>
+      <Button onClick={{() => setOpen(n > {n})}}>Open {n}</Button>
+      <EditIcon onClick={{() => edit({n})}} />
+      <TrashIcon />
+      <Table>
+        <TableHead>
+          <TableRow>
+            <TableCell>Name {n}</TableCell>
+            <TableCell>Price</TableCell>
+          </TableRow>
+        </TableHead>
+        <TableBody>
+          {{rows.map(row => (
+            <TableRow key={{row.id}}>
+              <TableCell><Table><TableCell>{{row.name}}</TableCell></Table></TableCell>
+              <TableCell>{{row.price}}</TableCell>
+            </TableRow>
+          ))}}
+        </TableBody>
+      </Table>
+      <p>Don't miss item {n}</p>
+      <span className="muted">{{label}}</span>
+"""
+
+_SELF_CLOSING_SECTION = """      <Typography variant="h6">Section {n}</Typography>
+      <Button onClick={{() => setOpen({n})}}>Open {n}</Button>
+      <span className="spacer" />
+      <svg viewBox="0 0 24 24"><path d="M{n} 0h24v24H0z" /></svg>
+      <TableCell padding="none" />
+      <EditIcon onClick={{() => edit({n})}} />
+"""
+POSTPROCESS_SHAPES = {
+    # Balanced markup: every tag closes within a few lines
+    "nested": _SECTION,
+    # Tags that never close later in the file (<span />, <TableCell />, <path /> read as <p>):
+    # each one sends the chain's `(.*?)</tag>` to the end of the file
+    "self-closing": _SELF_CLOSING_SECTION,
+}
+
+
+def synthetic_component(lines: int, section: str = _SECTION) -> str:
+    """A component of roughly `lines` lines of repeated `section` (nested Typography/Table by default)."""
+    head = "import React from \"react\";\n\nexport default function Big({ rows, label, setOpen, edit }) {\n  return (\n    <div>\n"
+    tail = "    </div>\n  );\n}\n"
+    per_section = section.count("\n")
+    body = "".join(section.format(n=i) for i in range(max(1, lines // per_section)))
+    return head + body + tail
+
+
+def _best_of(fn, src, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(src)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_postprocess(lines: int, repeat: int = 5):
+    """
+    Regex chain vs. single pass on each POSTPROCESS_SHAPES component. On balanced markup the
+    chain's four C-level re.sub passes are cheaper than a Python tokenizer; on tags that never
+    close it is quadratic in the file size while the single pass stays linear.
+    """
+    results = []
+    for shape, section in POSTPROCESS_SHAPES.items():
+        src = synthetic_component(lines, section)
+        n_lines = src.count("\n")
+        regex = _best_of(legacy_regex_chain, src, repeat)
+        visitors = _best_of(fixer.postprocess_jsx, src, repeat)
+        print(f"{shape} component: {n_lines} lines, {len(src)} chars (best of {repeat})")
+        print(f"regex chain      {regex * 1000:9.2f} ms")
+        print(f"single pass      {visitors * 1000:9.2f} ms")
+        print(f"regex chain / single pass: {regex / visitors:.2f}x (above 1: the single pass is faster)")
+        results.append({"shape": shape, "lines": n_lines, "regex_ms": round(regex * 1000, 3),
+                        "visitors_ms": round(visitors * 1000, 3)})
+    return results
+
+
+# ---------- Streaming ----------
+def _bad_then_good(elements, chatter_chars):
+    """Fake Bedrock answers: narration plus a long rewrite first, the JSON array on the retry."""
+    good = json.dumps([{"id": e["id"], "replacement": e["source"][:-1] + ' aria-label="Item">'} for e in elements])
+    def respond(request):
+        if "rejected" in request["messages"][0]["content"]:
+            return good
+        return "Here is the updated JSX with the fixes applied:\n" + "x" * chatter_chars + good
+    return respond
+
+
+def bench_stream(elements: int, chatter_chars: int = 8000, delay: float = 0.002):
+    """Time to first fix and wasted output tokens when the first answer starts with narration."""
+    items = [{"id": f"P1.n{i}", "source": f'<button className="b{i}">', "issues": []} for i in range(elements)]
+    results = []
+    for streaming in (False, True):
+        fixer.BEDROCK_STREAMING = streaming
+        fixer._BEDROCK_CLIENT = FakeBedrockClient(_bad_then_good(items, chatter_chars), chunk_chars=32, delay=delay)
+        fixer.LLM_STATS = fixer.LlmStats()
+        batcher = fixer.SuggestionBatcher(token_budget=0)
+        job = fixer.make_page_job(0, fixer.JSX_FOLDER / "bench.jsx", {})
+        started = time.perf_counter()
+        fixes = batcher.submit(job, [{**e, "id": e["id"].split(".")[1]} for e in items]).result()
+        elapsed = time.perf_counter() - started
+        call = fixer.LLM_STATS.calls[0]
+        label = "streamed" if streaming else "blocking"
+        print(f"{label:<10} {len(fixes):>4} fixes  {elapsed:7.2f}s  first fix {call['time_to_first_fix_s']:>6}s  "
+              f"wasted out {call['wasted_output_tokens']:>6}  attempts {call['attempts']}")
+        results.append({"mode": label, "fixes": len(fixes), "seconds": round(elapsed, 3),
+                        "time_to_first_fix_s": call["time_to_first_fix_s"],
+                        "wasted_output_tokens": call["wasted_output_tokens"]})
+    return results
+
+
+# ---------- Startup ----------
+# Modules that must stay out of `import accessibility_fix` (loaded on first Bedrock call / first served audit)
+LAZY_MODULES = ("boto3", "botocore", "a11y_server", "http")
+
+
+def parse_importtime(stderr: str) -> dict:
+    """{module: (self_us, cumulative_us)} from `python -X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if m:
+            modules[m.group(4)] = (int(m.group(1)), int(m.group(2)))
+    return modules
+
+
+def bench_startup(repeat: int = 5, max_ms: float | None = None):
+    """Import cost of accessibility_fix in a fresh interpreter; fails when the AWS SDK sneaks back in."""
+    runs = []
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import accessibility_fix"],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise SystemExit(proc.stderr.strip().splitlines()[-1])
+        runs.append(parse_importtime(proc.stderr))
+    best = min(runs, key=lambda m: m["accessibility_fix"][1])
+    total_ms = best["accessibility_fix"][1] / 1000
+    print(f"import accessibility_fix: {total_ms:.1f} ms cumulative (best of {repeat})")
+    print("slowest imports:")
+    top = sorted(((cum, self_us, name) for name, (self_us, cum) in best.items() if name != "accessibility_fix"),
+                 reverse=True)[:10]
+    for cum, self_us, name in top:
+        print(f"  {name:<40} {cum / 1000:8.1f} ms  (self {self_us / 1000:.1f} ms)")
+    eager = sorted(name for name in best if name.split(".")[0] in LAZY_MODULES)
+    failures = []
+    if eager:
+        failures.append(f"imported at startup but should be lazy: {', '.join(eager[:5])}")
+    if max_ms is not None and total_ms > max_ms:
+        failures.append(f"startup {total_ms:.1f} ms exceeds --max-ms {max_ms}")
+    for failure in failures:
+        print("FAIL: " + failure)
+    result = {"import_ms": round(total_ms, 2), "eager_lazy_modules": eager,
+              "top": [{"module": n, "cumulative_ms": round(c / 1000, 2)} for c, _, n in top], "ok": not failures}
+    return result
+
+
+# ---------- End to end (offline) ----------
+E2E_SIZES = (10, 100, 1000)
+E2E_RESULTS_PATH = Path("bench-results") / "e2e.jsonl"
+
+# Seeded violation kinds: (axe rule, JSX as written, axe `html` as rendered, extra node fields).
+# The first four are handled by the rule engine, the last two go to (fake) Bedrock.
+E2E_KINDS = {
+    "image-alt": ('<img src="/img/p{n}-{k}.png" />', '<img src="/img/p{n}-{k}.png">', {}),
+    "button-name": ('<button className="icon-{k}"><DeleteIcon /></button>',
+                    '<button class="icon-{k}"><svg data-testid="DeleteIcon"></svg></button>', {}),
+    "link-name": ('<a href="/go/{n}/{k}" className="more-{k}"></a>', '<a href="/go/{n}/{k}" class="more-{k}"></a>', {}),
+    "color-contrast": ('<p className="note-{k}" style={{{{ color: "#777777" }}}}>Note {n}.{k}</p>',
+                       '<p class="note-{k}" style="color: #777777;">Note {n}.{k}</p>',
+                       # As axe reports it: colors in the check data, nothing pre-extracted
+                       {"any": [{"id": "color-contrast", "data": {
+                           "fgColor": "#777777", "bgColor": "#ffffff", "contrastRatio": 4.48,
+                           "fontSize": "12.0pt (16px)", "fontWeight": "normal", "expectedContrastRatio": "4.5:1"}}],
+                        "failureSummary": "Fix any of the following:\n  Element has insufficient color contrast of 4.48 "
+                                          "(foreground color: #777777, background color: #ffffff, font size: 12.0pt "
+                                          "(16px), font weight: normal). Expected contrast ratio of 4.5:1"}),
+    "aria-command-name": ('<div role="button" className="tile-{n}-{k}" onClick={{() => open({k})}}>Tile</div>',
+                          '<div role="button" class="tile-{n}-{k}">Tile</div>', {}),
+    # Same shape on many pages: what the fix store and batch dedup are for
+    "target-size": ('<span role="link" className="chip" onClick={{back}}>x</span>',
+                    '<span role="link" class="chip">x</span>', {}),
+}
+E2E_SHARED = (
+    'export default function Footer() {\n'
+    '  return <footer className="site-footer"><a href="/contact" className="footer-link"></a></footer>;\n'
+    '}\n'
+)
+
+
+def generate_corpus(root: Path, pages: int, seed: int = 0, per_page: tuple = (3, 8)) -> dict:
+    """
+    Write `pages` JSX pages under root/src/page (nested in groups of 25) plus one shared
+    component, and return the canned axe violations of each page ({relative path: violations}).
+    """
+    rng = random.Random(seed)
+    (root / "src" / "components").mkdir(parents=True, exist_ok=True)
+    (root / "src" / "components" / "Footer.jsx").write_text(E2E_SHARED, encoding="utf-8")
+    footer = {"id": "link-name", "impact": "serious", "help": "Links must have discernible text",
+              "nodes": [{"html": '<a href="/contact" class="footer-link"></a>', "target": ["a.footer-link"]}]}
+    reports = {}
+    for n in range(pages):
+        relative = Path(f"group{n // 25}") / f"page{n}.jsx"
+        body, violations = [], {}
+        for k in range(rng.randint(*per_page)):
+            rule = rng.choice(list(E2E_KINDS))
+            jsx, html, extra = E2E_KINDS[rule]
+            body.append("      " + jsx.format(n=n, k=k))
+            node = {"html": html.format(n=n, k=k), "target": [f"#p{n} > :nth-child({k + 1})"], **extra}
+            violations.setdefault(rule, {"id": rule, "impact": "serious", "help": rule, "nodes": []})["nodes"].append(node)
+        source = (
+            'import React from "react";\n'
+            'import Footer from "../../components/Footer";\n\n'
+            f"export default function Page{n}({{ open, back }}) {{\n"
+            f'  return (\n    <main id="p{n}">\n' + "\n".join(body) + "\n      <Footer />\n    </main>\n  );\n}\n"
+        )
+        path = root / "src" / "page" / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding="utf-8")
+        reports[relative.as_posix()] = list(violations.values()) + [footer]
+    return reports
+
+
+def _fake_fixes(request: dict) -> str:
+    """A well-behaved model: every element gets an aria-label on its opening tag."""
+    content = request["messages"][0]["content"]
+    elements = json.loads(content[content.index("Elements:\n") + len("Elements:\n"):])
+    fixes = []
+    for element in elements:
+        source = element["source"]
+        cut = len(source) - (2 if source.endswith("/>") else 1)
+        fixes.append({"id": element["id"], "replacement": source[:cut].rstrip() + ' aria-label="Fixed"' + source[cut:]})
+    return json.dumps(fixes)
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_e2e(pages: int, seed: int = 0, llm_latency: float = 0.2, audit_ms: float = 20,
+            chars_per_token: float = 4, fix_store: bool = True) -> dict:
+    """
+    One offline run of the real pipeline in a temp git repo: process_jsx_file for every page
+    (audit -> rules -> Bedrock -> apply -> create_pr), shared components, verification and
+    publish (no push). Audits come from canned reports and Bedrock from FakeBedrockClient.
+    """
+    home = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="a11y-e2e-") as tmp:
+        root = Path(tmp)
+        reports = generate_corpus(root, pages, seed)
+        os.environ.update({"GIT_AUTHOR_NAME": "bench", "GIT_AUTHOR_EMAIL": "bench@localhost",
+                           "GIT_COMMITTER_NAME": "bench", "GIT_COMMITTER_EMAIL": "bench@localhost"})
+        for cmd in (["git", "init", "-q"], ["git", "add", "-A"], ["git", "commit", "-qm", "corpus"]):
+            subprocess.run(cmd, cwd=root, check=True)
+        os.chdir(root)
+        try:
+            route_map = fixer.load_route_map()
+            targets = sorted(fixer.JSX_FOLDER.rglob("*.jsx"))
+            jobs = [fixer.make_page_job(i, t, route_map) for i, t in enumerate(targets)]
+            canned = {job.url: reports[job.relative.as_posix()] for job in jobs}
+
+            def fake_audit(url, output_path, include=None):
+                time.sleep(audit_ms / 1000)
+                report = {"url": url, "testEngine": {"name": "axe-core", "version": "fake"},
+                          "violations": [] if include is not None else canned.get(url, [])}
+                fixer.PROFILE.note(bytes_written=fixer.save_page_report(output_path, report))
+                return report
+
+            fixer.run_playwright_audit = fake_audit
+            fixer.AUDIT_CACHE_MODE = "off"
+            fixer.DEV_SERVER = True  # nothing to build or serve: audits are canned
+            fixer.FIX_STORE = fixer.FixStore() if fix_store else None
+            client = FakeBedrockClient(_fake_fixes, chunk_chars=64, latency=llm_latency, chars_per_token=chars_per_token)
+            fixer._BEDROCK_CLIENT = client
+            fixer.BACKUP_ROOT.mkdir(parents=True, exist_ok=True)
+            fixer.PROFILE.open(fixer.PROFILE_PATH)
+            fixer.CONSOLIDATED_REPORT = fixer.ReportWriter(fixer.CONSOLIDATED_REPORT_PATH)
+
+            started = time.perf_counter()
+            fixer.run_pages(jobs)
+            fixer.run_shared_components(len(jobs))
+            fixer.run_verification()
+            with fixer.PROFILE.span("publish", ""):
+                branch = fixer.CHANGES.publish(squash=False, push=False)
+            wall = time.perf_counter() - started
+            fixer.CONSOLIDATED_REPORT.close()
+            fixer.PROFILE.close()
+
+            # Post-processing cost on the fixed corpus: the old regex chain vs. the single pass
+            sources = [t.read_text(encoding="utf-8") for t in targets]
+            regex = sum(_best_of(legacy_regex_chain, src, 1) for src in sources)
+            visitors = sum(_best_of(fixer.postprocess_jsx, src, 1) for src in sources)
+            stages = fixer.PROFILE.summary()
+            commits = int(subprocess.run(["git", "rev-list", "--count", "HEAD.." + branch], capture_output=True,
+                                         text=True).stdout.strip() or 0) if branch else 0
+        finally:
+            os.chdir(home)
+    llm_calls = len(client.requests)
+    return {
+        "pages": pages,
+        "seed": seed,
+        "wall_s": round(wall, 3),
+        "pages_per_s": round(pages / wall, 2) if wall else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "stages": {name: {k: row[k] for k in ("count", "p50_s", "p95_s", "total_s")} for name, row in stages.items()},
+        "postprocess": {"regex_chain_ms": round(regex * 1000, 2), "single_pass_ms": round(visitors * 1000, 2),
+                        "in_pipeline_ms": round(stages.get("postprocess", {}).get("total_s", 0) * 1000, 2)},
+        "bedrock_calls": llm_calls,
+        "input_tokens": stages.get("llm", {}).get("input_tokens", 0),
+        "output_tokens": stages.get("llm", {}).get("output_tokens", 0),
+        "commits": commits,
+        "fake": {"llm_latency_s": llm_latency, "audit_ms": audit_ms, "chars_per_token": chars_per_token,
+                 "fix_store": fix_store},
+    }
+
+
+def _git_rev() -> str | None:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True)
+    return proc.stdout.strip() or None if proc.returncode == 0 else None
+
+
+def bench_e2e(sizes, results_path: Path = E2E_RESULTS_PATH, **options) -> list:
+    """
+    run_e2e for each size in a fresh interpreter (so peak RSS and module state are per size),
+    appended to results_path and compared with the previous record of the same size.
+    """
+    previous = {}
+    if results_path.exists():
+        for line in results_path.read_text(encoding="utf-8").splitlines():
+            if line.strip():
+                record = json.loads(line)
+                previous[record["pages"]] = record
+    flags = []
+    for name, value in options.items():
+        flag = "--" + name.replace("_", "-")
+        if isinstance(value, bool):
+            flags += [] if value else ["--no-" + name.replace("_", "-")]
+        else:
+            flags += [flag, str(value)]
+    results = []
+    rev = _git_rev()
+    for pages in sizes:
+        proc = subprocess.run([sys.executable, str(Path(__file__).resolve()), "e2e-run", "--pages", str(pages), *flags],
+                              capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise SystemExit(f"e2e run with {pages} pages failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+        result = {"timestamp": datetime.now().isoformat(timespec="seconds"), "git_rev": rev,
+                  **json.loads(proc.stdout.strip().splitlines()[-1])}
+        results.append(result)
+        before = previous.get(pages)
+        delta = ""
+        if before and before.get("pages_per_s") and result["pages_per_s"]:
+            delta = f"  ({result['pages_per_s'] / before['pages_per_s'] - 1:+.0%} vs {before.get('git_rev') or 'last run'})"
+        print(f"{pages:>5} pages  {result['wall_s']:8.2f}s  {result['pages_per_s']:>8} pages/s  "
+              f"peak RSS {result['peak_rss_mb']} MB  {result['bedrock_calls']} Bedrock call(s){delta}")
+        for stage, row in result["stages"].items():
+            print(f"        {stage:<12} n={row['count']:<5} p50 {row['p50_s']:.4f}s  p95 {row['p95_s']:.4f}s  "
+                  f"total {row['total_s']:.2f}s")
+        post = result["postprocess"]
+        print(f"        postprocess  regex chain {post['regex_chain_ms']} ms vs single pass {post['single_pass_ms']} ms "
+              f"({post['in_pipeline_ms']} ms in the run)")
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    with results_path.open("a", encoding="utf-8") as f:
+        for result in results:
+            f.write(json.dumps(result) + "\n")
+    print(f"results appended to {results_path}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    audit = sub.add_parser("audit", help="pages/minute: per-page node process vs shared audit worker")
+    audit.add_argument("--url", action="append", help="URL to audit (repeatable); defaults to src/page routes")
+    audit.add_argument("--pages", type=int, default=20, help="number of page audits per mode")
+    audit.add_argument("--json", type=Path, help="write results to this JSON file")
+
+    post = sub.add_parser("postprocess", help="regex post-processing chain vs. single-pass JSX visitors")
+    post.add_argument("--lines", type=int, default=5000, help="size of the synthetic component")
+    post.add_argument("--repeat", type=int, default=5)
+    post.add_argument("--json", type=Path, help="write results to this JSON file")
+
+    stream = sub.add_parser("stream", help="streamed + validated vs blocking Bedrock calls (offline fake)")
+    stream.add_argument("--elements", type=int, default=20, help="elements in the fix request")
+    stream.add_argument("--chatter", type=int, default=8000, help="characters of bad output before the JSON")
+    stream.add_argument("--json", type=Path, help="write results to this JSON file")
+
+    startup = sub.add_parser("startup", help="import time of accessibility_fix (python -X importtime)")
+    startup.add_argument("--repeat", type=int, default=5)
+    startup.add_argument("--max-ms", type=float, help="exit non-zero when the import takes longer than this")
+    startup.add_argument("--json", type=Path, help="write results to this JSON file")
+
+    def e2e_options(p):
+        p.add_argument("--seed", type=int, default=0, help="corpus seed (same seed, same pages and violations)")
+        p.add_argument("--llm-latency", type=float, default=0.2, help="fake Bedrock seconds per call")
+        p.add_argument("--audit-ms", type=float, default=20, help="fake audit milliseconds per page")
+        p.add_argument("--chars-per-token", type=float, default=4, help="fake Bedrock token accounting")
+        p.add_argument("--no-fix-store", dest="fix_store", action="store_false", help="disable the fix memo store")
+
+    e2e = sub.add_parser("e2e", help="offline end-to-end run on synthetic pages (fake axe + fake Bedrock)")
+    e2e.add_argument("--sizes", type=int, nargs="+", default=list(E2E_SIZES), help="page counts to run")
+    e2e.add_argument("--results", type=Path, default=E2E_RESULTS_PATH, help="JSONL history to append to")
+    e2e_options(e2e)
+    e2e_run = sub.add_parser("e2e-run", help="one e2e size in this process, result as JSON (used by e2e)")
+    e2e_run.add_argument("--pages", type=int, default=10)
+    e2e_options(e2e_run)
+
+    args = parser.parse_args(argv)
+    if args.command == "audit":
+        results = bench_audit(collect_urls(args.url, args.pages))
+    elif args.command == "postprocess":
+        results = bench_postprocess(args.lines, args.repeat)
+    elif args.command == "stream":
+        results = bench_stream(args.elements, args.chatter)
+    elif args.command == "startup":
+        results = bench_startup(args.repeat, args.max_ms)
+    elif args.command in ("e2e", "e2e-run"):
+        options = {"seed": args.seed, "llm_latency": args.llm_latency, "audit_ms": args.audit_ms,
+                   "chars_per_token": args.chars_per_token, "fix_store": args.fix_store}
+        if args.command == "e2e":
+            bench_e2e(args.sizes, args.results, **options)
+        else:
+            # Pipeline output goes to stderr; stdout's last line is the result
+            stdout, sys.stdout = sys.stdout, sys.stderr
+            try:
+                result = run_e2e(args.pages, **options)
+            finally:
+                sys.stdout = stdout
+            print(json.dumps(result))
+        return
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if isinstance(results, dict) and not results.get("ok", True):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
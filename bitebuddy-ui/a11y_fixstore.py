@@ -0,0 +1,163 @@
+"""
+Fix memo store for accessibility_fix.py.
+
+- normalize_snippet: axe's rendered `html` with volatile attributes dropped (ids, data-*,
+  id references, generated CSS-in-JS class names) and whitespace collapsed, so the same
+  element renders the same key on every page and every run.
+- FixStore: SQLite table of accepted replacements keyed by the element's rule ids, its
+  normalized snippets (plus the fg/bg pair for color-contrast, read from axe's color data when
+  the issue has no fg/bg of its own) and its JSX opening tag. Entries are evicted least recently used past
+  max_entries, and the whole store is dropped when the model id or prompt version changes.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from a11y_rules import contrast_data
+
+VOLATILE_ATTR_RE = re.compile(
+    r"""\s(?:id|for|data-[\w-]+|aria-(?:describedby|labelledby|controls|owns|activedescendant))(?![\w-])"""
+    r"""(?:\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>]+))?""",
+    re.IGNORECASE,
+)
+CLASS_ATTR_RE = re.compile(r"""\sclass\s*=\s*("[^"]*"|'[^']*')""", re.IGNORECASE)
+# css-1x2y3z (emotion), sc-abc123 (styled-components), jsx-123 (styled-jsx), makeStyles-root-12 (JSS)
+GENERATED_CLASS_RE = re.compile(r"^(?:css|sc|jsx|emotion|jss)-[\w-]+$|-\d+$|^[A-Za-z]+_[\w-]*__[A-Za-z0-9_-]{5}$")
+# Rules whose fix also depends on the computed colours axe reports next to the snippet
+COLOR_RULES = {"color-contrast"}
+# Rules decided by the element's own attributes: its children do not change the fix
+OPENING_TAG_RULES = {"color-contrast", "image-alt", "input-image-alt", "label", "select-name"}
+
+
+def _stable_classes(match: re.Match) -> str:
+    value = match.group(1)[1:-1]
+    kept = [c for c in value.split() if not GENERATED_CLASS_RE.search(c)]
+    return f' class="{" ".join(sorted(kept))}"' if kept else ""
+
+
+def normalize_snippet(rule_id: str, html: str) -> str:
+    html = re.sub(r"\s+", " ", html).strip()
+    if rule_id in OPENING_TAG_RULES:
+        end = html.find(">")
+        html = html[:end + 1] if end != -1 else html
+    html = VOLATILE_ATTR_RE.sub("", html)
+    return CLASS_ATTR_RE.sub(_stable_classes, html)
+
+
+def _issue_key(issue: dict) -> tuple:
+    rule_id = issue.get("rule") or ""
+    colors = ()
+    if rule_id in COLOR_RULES:
+        # Raw axe issues only carry the colors in their check data / summary, not as fg/bg
+        data = contrast_data(issue)
+        colors = tuple((issue.get(k) or data.get(k) or "").lower() for k in ("fg", "bg"))
+    return (rule_id, normalize_snippet(rule_id, issue.get("htmlSnippet", ""))) + colors
+
+
+def fix_key(issues: list, source: str) -> str:
+    """
+    Key of one prompt element: its (rule, normalized snippet) pairs plus its opening tag.
+    color-contrast issues add their fg/bg pair: the same <span className="muted"> on a
+    light and a dark background needs different colours.
+    """
+    pairs = sorted({_issue_key(i) for i in issues})
+    payload = json.dumps({"issues": pairs, "source": re.sub(r"\s+", " ", source).strip()}, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FixStore:
+    """
+    Thread-safe memo of accepted fixes. get() and put() take prompt elements
+    ({source, issues}); hits, misses and evictions are counted for the run summary.
+    """
+
+    def __init__(self, path: Path | str = ":memory:", model_id: str = "", prompt_version: str = "",
+                 max_entries: int = 5000):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = self.misses = self.stored = self.evicted = 0
+        self.rejected = 0  # entries dropped because their fix regressed in verification
+        self.invalidated = 0  # entries dropped on open because the model or prompt changed
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS fixes (
+                key TEXT PRIMARY KEY,
+                rules TEXT NOT NULL,
+                source TEXT NOT NULL,
+                replacement TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS fixes_last_used ON fixes(last_used);
+        """)
+        version = json.dumps({"model": model_id, "prompt": prompt_version})
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != version:
+            if row is not None:
+                self.invalidated = self._db.execute("DELETE FROM fixes").rowcount
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)", (version,))
+
+    def get(self, element: dict) -> str | None:
+        """The stored replacement for a prompt element, or None (counted as a miss)."""
+        key = fix_key(element["issues"], element["source"])
+        with self._lock:
+            row = self._db.execute("SELECT replacement, source FROM fixes WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] != element["source"]:
+                # A whitespace-only difference in the tag still matches the key, but the
+                # stored replacement was written for the old text: do not splice it in
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._db.execute("UPDATE fixes SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        return row[0]
+
+    def put(self, element: dict, replacement: str):
+        key = fix_key(element["issues"], element["source"])
+        rules = ",".join(sorted({i.get("rule") or "" for i in element["issues"]}))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO fixes (key, rules, source, replacement, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, rules, element["source"], replacement, now, now),
+            )
+            self.stored += 1
+            count = self._db.execute("SELECT COUNT(*) FROM fixes").fetchone()[0]
+            if count > self.max_entries:
+                self.evicted += self._db.execute(
+                    "DELETE FROM fixes WHERE key IN (SELECT key FROM fixes ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                ).rowcount
+
+    def reject(self, keys: list[str]) -> int:
+        """Drop entries (by fix_key) whose replacement regressed, so no later run reapplies them."""
+        if not keys:
+            return 0
+        with self._lock:
+            dropped = self._db.execute(f"DELETE FROM fixes WHERE key IN ({','.join('?' * len(keys))})",
+                                       list(keys)).rowcount
+            self.rejected += dropped
+        return dropped
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM fixes").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "stored": self.stored, "evicted": self.evicted, "rejected": self.rejected,
+                "invalidated": self.invalidated, "entries": size}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,145 @@
+"""
+Crash safety for accessibility_fix.py.
+
+- RunJournal: SQLite record of how far each page got in a run
+  (audited -> rules -> suggested -> applied -> queued -> verified -> committed). `--resume` reopens
+  the last unfinished run and skips the stages already recorded.
+- atomic_write_bytes / atomic_write_text: temp file in the same directory + os.replace,
+  so a crash never leaves a half-written JSX file or report.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+STAGES = ("audited", "rules", "suggested", "applied", "queued", "verified", "committed")
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return len(data)
+
+
+def atomic_write_text(path: Path, text: str, encoding: str = "utf-8") -> int:
+    return atomic_write_bytes(path, text.encode(encoding))
+
+
+def source_digest(path: Path) -> str:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return ""
+
+
+class RunJournal:
+    """
+    One row per (run, page, stage), committed as soon as the stage finishes.
+    Every row stores the page's source hash after that stage, so a page edited
+    between runs (or interrupted between a write and its journal entry) is detected
+    and processed again from the start.
+    """
+
+    def __init__(self, path: Path | str = ":memory:", resume: bool = False, argv: list | None = None):
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started REAL NOT NULL,
+                finished REAL,
+                argv TEXT
+            );
+            CREATE TABLE IF NOT EXISTS stages (
+                run_id INTEGER NOT NULL REFERENCES runs(id),
+                page TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                source_hash TEXT NOT NULL,
+                detail TEXT,
+                at REAL NOT NULL,
+                PRIMARY KEY (run_id, page, stage)
+            );
+        """)
+        row = None
+        if resume:
+            row = self._db.execute("SELECT id FROM runs WHERE finished IS NULL ORDER BY id DESC LIMIT 1").fetchone()
+        if row:
+            self.run_id, self.resumed = row[0], True
+        else:
+            cur = self._db.execute("INSERT INTO runs (started, argv) VALUES (?, ?)",
+                                   (time.time(), json.dumps(argv or [])))
+            self.run_id, self.resumed = cur.lastrowid, False
+        self._seq = self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM stages WHERE run_id = ?",
+                                     (self.run_id,)).fetchone()[0]
+
+    def completed(self, page: str, stage: str) -> dict | None:
+        """The detail recorded for a finished stage ({} without detail), or None."""
+        with self._lock:
+            row = self._db.execute("SELECT detail FROM stages WHERE run_id = ? AND page = ? AND stage = ?",
+                                   (self.run_id, page, stage)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]) if row[0] else {}
+
+    def mark(self, page: str, stage: str, source_hash: str, detail: dict | None = None):
+        with self._lock:
+            self._seq += 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO stages (run_id, page, stage, seq, source_hash, detail, at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, page, stage, self._seq, source_hash,
+                 json.dumps(detail, separators=(",", ":")) if detail is not None else None, time.time()),
+            )
+
+    def is_stale(self, page: str, source_hash: str) -> bool:
+        """True when the page has journal entries but its source no longer matches the latest one."""
+        with self._lock:
+            row = self._db.execute("SELECT source_hash FROM stages WHERE run_id = ? AND page = ? "
+                                   "ORDER BY seq DESC LIMIT 1", (self.run_id, page)).fetchone()
+        return row is not None and row[0] != source_hash
+
+    def forget(self, page: str):
+        with self._lock:
+            self._db.execute("DELETE FROM stages WHERE run_id = ? AND page = ?", (self.run_id, page))
+
+    def progress(self) -> dict:
+        """{stage: pages} reached in this run (each page counted at its furthest stage)."""
+        with self._lock:
+            rows = self._db.execute("SELECT page, stage FROM stages WHERE run_id = ?", (self.run_id,)).fetchall()
+        furthest = {}
+        for page, stage in rows:
+            if STAGES.index(stage) > STAGES.index(furthest.get(page, STAGES[0])):
+                furthest[page] = stage
+            furthest.setdefault(page, stage)
+        counts = {}
+        for stage in furthest.values():
+            counts[stage] = counts.get(stage, 0) + 1
+        return counts
+
+    def finish(self):
+        with self._lock:
+            self._db.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), self.run_id))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
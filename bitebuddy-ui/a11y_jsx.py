@@ -0,0 +1,481 @@
+"""
+JSX scanning helpers for the accessibility fixer.
+
+- parse_open_tag/iter_open_tags: opening tags and their attributes, respecting
+  quoted strings and `{...}` expressions (which may contain `>`).
+- parse_jsx: one linear pass over a file that builds the element tree.
+- run_visitors: walk that tree once with several visitors and apply all their
+  edits in one go, leaving every untouched byte (formatting, comments) as it was.
+"""
+import re
+from dataclasses import dataclass, field
+from operator import itemgetter
+
+_NAME_RE = re.compile(r"[A-Za-z][\w.:-]*")
+# One attribute: name, then optionally = and a quoted value or the "{" that opens an expression
+_ATTR_RE = re.compile(
+    r"""\s*([A-Za-z_][\w:.-]*)(?:\s*=\s*("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|\{))?"""
+)
+_TAG_END_RE = re.compile(r"\s*(/?>|\{)")
+_ASSIGN_RE = re.compile(r"\s*=")
+# Fast path: a whole opening tag whose attribute values are quoted strings or flat {expressions}
+_SIMPLE_TAG = r"""<([A-Za-z][\w.:-]*)(?:\s+[A-Za-z_][\w:.-]*(?:\s*=\s*(?:"[^"\\]*"|'[^'\\]*'|\{[^{}"'`/]*\}))?)*(\s*)(/?>)"""
+_SIMPLE_TAG_RE = re.compile(_SIMPLE_TAG)
+# Characters that matter while skipping JavaScript: strings, comments and braces
+_JS_SPECIAL_RE = re.compile(r"""["'`{}]|//|/\*""")
+
+
+@dataclass(slots=True)
+class Attr:
+    name: str
+    raw: str | None          # source text of the value, including quotes/braces (None for bare attributes)
+    start: int               # span of the whole `name=value` in the source
+    end: int
+
+    @property
+    def value(self) -> str | None:
+        """Literal string value for `a="x"`, `a='x'` and `a={"x"}`; None for other expressions."""
+        if self.raw is None:
+            return None
+        raw = self.raw
+        if raw[:1] in "\"'" and raw[-1:] == raw[:1]:
+            return raw[1:-1]
+        m = re.fullmatch(r"\{\s*([\"'`])(.*)\1\s*\}", raw, flags=re.DOTALL)
+        if m and "${" not in m.group(2):
+            return m.group(2)
+        return None
+
+
+@dataclass(slots=True)
+class OpenTag:
+    name: str
+    start: int               # index of "<"
+    end: int                 # index just past ">"
+    self_closing: bool
+    attrs_end: int = 0       # where a new attribute can be inserted (before "/>" or ">")
+    src: str = field(default="", repr=False)
+    _attrs: list[Attr] | None = field(default=None, repr=False)
+
+    @property
+    def attrs(self) -> list[Attr]:
+        # Tags matched by the fast path split their attributes only when asked
+        if self._attrs is None:
+            full = _parse_open_tag_full(self.src, self.start)
+            self._attrs = full._attrs if full else []
+        return self._attrs
+
+    def attr(self, name: str) -> Attr | None:
+        lname = name.lower()
+        if lname not in self.src[self.start:self.attrs_end].lower():
+            return None
+        for a in self.attrs:
+            if a.name.lower() == lname:
+                return a
+        return None
+
+    def has_attr(self, name: str) -> bool:
+        return self.attr(name) is not None
+
+
+def _skip_string(src: str, i: int) -> int:
+    """i points at a quote; return the index just past the closing quote."""
+    quote = src[i]
+    i += 1
+    while i < len(src):
+        c = src[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == quote:
+            return i + 1
+        if quote == "`" and src.startswith("${", i):
+            i = skip_expression(src, i + 1)
+            continue
+        i += 1
+    return i
+
+
+def skip_expression(src: str, i: int) -> int:
+    """i points at "{"; return the index just past the matching "}"."""
+    depth = 0
+    n = len(src)
+    while i < n:
+        m = _JS_SPECIAL_RE.search(src, i)
+        if not m:
+            return n
+        i = m.start()
+        c = src[i]
+        if c in "\"'`":
+            i = _skip_string(src, i)
+            continue
+        if src.startswith("//", i):
+            nl = src.find("\n", i)
+            i = n if nl == -1 else nl
+            continue
+        if src.startswith("/*", i):
+            close = src.find("*/", i + 2)
+            i = n if close == -1 else close + 2
+            continue
+        if c == "{":
+            depth += 1
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def parse_open_tag(src: str, start: int) -> OpenTag | None:
+    """Parse the opening tag starting at src[start] == "<". None if it is not a JSX opening tag."""
+    m = _SIMPLE_TAG_RE.match(src, start)
+    if m:
+        return OpenTag(name=m.group(1), start=start, end=m.end(), self_closing=m.group(3) == "/>",
+                       attrs_end=m.start(2), src=src)
+    return _parse_open_tag_full(src, start)
+
+
+def _parse_open_tag_full(src: str, start: int) -> OpenTag | None:
+    m = _NAME_RE.match(src, start + 1)
+    if not m:
+        return None
+    tag = OpenTag(name=m.group(0), start=start, end=start, self_closing=False, src=src, _attrs=[])
+    i = m.end()
+    while True:
+        end = _TAG_END_RE.match(src, i)
+        if end:
+            if end.group(1) == "{":
+                # Spread attribute {...props}
+                j = skip_expression(src, end.start(1))
+                tag._attrs.append(Attr("{...}", src[end.start(1):j], end.start(1), j))
+                i = j
+                continue
+            tag.attrs_end = end.start(1)
+            tag.end = end.end()
+            tag.self_closing = end.group(1) == "/>"
+            return tag
+        am = _ATTR_RE.match(src, i)
+        if not am:
+            return None
+        value = am.group(2)
+        if value == "{":
+            v_end = skip_expression(src, am.start(2))
+            tag._attrs.append(Attr(am.group(1), src[am.start(2):v_end], am.start(1), v_end))
+            i = v_end
+        elif value is not None:
+            tag._attrs.append(Attr(am.group(1), value, am.start(1), am.end()))
+            i = am.end()
+        else:
+            # Bare attribute; reject "name=" with an unquoted value
+            if _ASSIGN_RE.match(src, am.end()):
+                return None
+            tag._attrs.append(Attr(am.group(1), None, am.start(1), am.end()))
+            i = am.end()
+
+
+def iter_open_tags(src: str, names=None):
+    """Yield every JSX opening tag (optionally only those whose name is in `names`)."""
+    i = src.find("<")
+    while i != -1:
+        tag = parse_open_tag(src, i)
+        if tag and (names is None or tag.name in names):
+            yield tag
+        i = src.find("<", i + 1)
+
+
+def find_close_tag(src: str, tag: OpenTag) -> tuple[int, int] | None:
+    """Span of the closing tag that matches `tag` (same-name nesting aware)."""
+    if tag.self_closing:
+        return None
+    depth = 1
+    pattern = re.compile(r"<(/?)" + re.escape(tag.name) + r"(?=[\s/>])")
+    pos = tag.end
+    while True:
+        m = pattern.search(src, pos)
+        if not m:
+            return None
+        if m.group(1):
+            close_end = src.find(">", m.end())
+            if close_end == -1:
+                return None
+            depth -= 1
+            if depth == 0:
+                return m.start(), close_end + 1
+            pos = close_end + 1
+        else:
+            inner = parse_open_tag(src, m.start())
+            if inner is None:
+                pos = m.end()
+                continue
+            if not inner.self_closing:
+                depth += 1
+            pos = inner.end
+
+
+def insert_attribute(src: str, tag: OpenTag, text: str) -> str:
+    """Insert ` text` as the last attribute of tag."""
+    at = tag.attrs_end
+    # Keep "attr />" spacing: insert before any whitespace that precedes "/>" or ">"
+    while at > tag.start and src[at - 1].isspace():
+        at -= 1
+    return src[:at] + " " + text + src[at:]
+
+
+def same_element_tag(original: str, replacement: str) -> bool:
+    """Is `replacement` exactly one opening tag for the same element as `original`?"""
+    replacement = replacement.strip()
+    old = parse_open_tag(original, 0) if original.startswith("<") else None
+    new = parse_open_tag(replacement, 0) if replacement.startswith("<") else None
+    return (
+        old is not None and new is not None
+        and new.end == len(replacement)
+        and new.name == old.name
+        and new.self_closing == old.self_closing
+    )
+
+
+def set_attribute(src: str, tag: OpenTag, name: str, raw_value: str) -> str:
+    """Replace the value of an existing attribute or append it."""
+    existing = tag.attr(name)
+    if existing is not None:
+        return src[:existing.start] + f"{existing.name}={raw_value}" + src[existing.end:]
+    return insert_attribute(src, tag, f"{name}={raw_value}")
+
+
+# ---------- Element tree ----------
+@dataclass(slots=True)
+class Element:
+    name: str                           # "" for fragments
+    open: OpenTag | None                # None for fragments
+    start: int
+    close: tuple[int, int] | None = None
+    children: list["Element"] = field(default_factory=list)
+    parent: "Element | None" = None
+
+    @property
+    def self_closing(self) -> bool:
+        return self.open is not None and self.open.self_closing
+
+    @property
+    def inner_span(self) -> tuple[int, int] | None:
+        if self.open is None or self.close is None:
+            return None
+        return self.open.end, self.close[0]
+
+    def inner(self, src: str) -> str:
+        span = self.inner_span
+        return src[span[0]:span[1]] if span else ""
+
+    def walk(self):
+        stack = [self]
+        while stack:
+            element = stack.pop()
+            yield element
+            stack.extend(reversed(element.children))
+
+
+_JSX_PRECEDERS = set("(,=:?&|{}[;!>") | {""}
+_JS_MODE_RE = re.compile(r"""["'`{}<]|//|/\*""")
+# One token of JSX children: "{", a closing tag (1: name), "<>", a simple opening tag
+# (2: name, 3: space before the end, 4: "/>" or ">") or any other "<" (text, or a tag for the full parser)
+_CHILDREN_TOKEN_RE = re.compile(r"\{|</\s*([A-Za-z][\w.:-]*)?\s*>|<>|" + _SIMPLE_TAG + "|<")
+
+
+def _starts_jsx(src: str, i: int) -> bool:
+    """In JavaScript, is the "<" at i the start of a JSX element (not a comparison or a type argument)?"""
+    nxt = src[i + 1:i + 2]
+    if not (nxt.isalpha() or nxt == ">"):
+        return False
+    j = i - 1
+    while j >= 0 and src[j].isspace():
+        j -= 1
+    prev = src[j] if j >= 0 else ""
+    if prev in _JSX_PRECEDERS:
+        return True
+    return src[max(0, j - 5):j + 1] == "return" and (j < 6 or not (src[j - 6].isalnum() or src[j - 6] == "_"))
+
+
+def parse_jsx(src: str) -> list[Element]:
+    """
+    Parse every JSX element of a file in one left-to-right pass.
+    JavaScript and JSX children are tracked with a mode stack, so strings and comments in
+    code are skipped, `{...}` children are scanned for nested JSX, and text such as
+    "Don't" inside elements is left alone. Returns the top-level elements.
+    """
+    return _scan_jsx(src)[0]
+
+
+def _scan_jsx(src: str) -> tuple[list[Element], list[Element]]:
+    """parse_jsx(), plus every element in document order (what the visitors walk)."""
+    roots = []
+    order = []
+    elements = []            # open elements, innermost last
+    modes = [[0]]            # [brace depth] in JavaScript | the element whose children are being read
+    n = len(src)
+    i = 0
+
+    def push(element, tag):
+        if elements:
+            element.parent = elements[-1]
+            elements[-1].children.append(element)
+        else:
+            roots.append(element)
+        order.append(element)
+        if tag is None or not tag.self_closing:
+            elements.append(element)
+            modes.append(element)
+
+    def open_element(i):
+        if src.startswith("<>", i):
+            push(Element("", None, i), None)
+            return i + 2
+        tag = parse_open_tag(src, i)
+        if tag is None:
+            return None
+        push(Element(tag.name, tag, i), tag)
+        return tag.end
+
+    search_js = _JS_MODE_RE.search
+    search_children = _CHILDREN_TOKEN_RE.search
+    while i < n:
+        mode = modes[-1]
+        if type(mode) is list:
+            m = search_js(src, i)
+            if not m:
+                break
+            i = m.start()
+            c = src[i]
+            if c in "\"'`":
+                i = _skip_string(src, i)
+                continue
+            if src.startswith("//", i):
+                nl = src.find("\n", i)
+                i = n if nl == -1 else nl
+                continue
+            if src.startswith("/*", i):
+                close = src.find("*/", i + 2)
+                i = n if close == -1 else close + 2
+                continue
+            if c == "{":
+                mode[0] += 1
+            elif c == "}":
+                if mode[0] == 0 and len(modes) > 1:
+                    modes.pop()           # end of a {...} child expression
+                else:
+                    mode[0] -= 1
+            elif c == "<" and _starts_jsx(src, i):
+                end = open_element(i)
+                if end is not None:
+                    i = end
+                    continue
+            i += 1
+            continue
+
+        # JSX children: text, {expressions}, child elements and the closing tag, one regex token each
+        m = search_children(src, i)
+        if not m:
+            break
+        i, end = m.span()
+        name = m.group(2)
+        if name:
+            # Inline push(): the common case, one simple opening tag inside `mode`
+            closing = m.group(4) == "/>"
+            element = Element(name, OpenTag(name, i, end, closing, m.start(3), src), i, parent=mode)
+            mode.children.append(element)
+            order.append(element)
+            if not closing:
+                elements.append(element)
+                modes.append(element)
+            i = end
+            continue
+        if end - i == 1:
+            if src[i] == "{":
+                modes.append([0])
+                i += 1
+                continue
+            # Text "<", or an opening tag the simple pattern does not cover
+            tag_end = open_element(i)
+            i = i + 1 if tag_end is None else tag_end
+            continue
+        if src[i + 1] == ">":
+            push(Element("", None, i), None)
+            i = end
+            continue
+        name = m.group(1) or ""
+        # Close the innermost matching element; unclosed inner elements end here too
+        for depth in range(len(elements) - 1, -1, -1):
+            if elements[depth].name == name:
+                while len(elements) > depth:
+                    element = elements.pop()
+                    element.close = (i, end) if len(elements) == depth else None
+                    while modes and type(modes[-1]) is list:
+                        modes.pop()
+                    modes.pop()
+                break
+        i = end
+    return roots, order
+
+
+def iter_elements(roots: list[Element]):
+    for root in roots:
+        yield from root.walk()
+
+
+def apply_edits(src: str, edits: list[tuple[int, int, str]]) -> str:
+    """Apply (start, end, replacement) edits. Insertions at the same offset keep their given order."""
+    if not edits:
+        return src
+    # sorted() is stable, so same-span edits keep their given order
+    ordered = sorted(edits, key=itemgetter(0, 1))
+    out = []
+    pos = 0
+    for start, end, text in ordered:
+        if start < pos:
+            continue  # overlaps an earlier edit
+        out.append(src[pos:start])
+        out.append(text)
+        pos = end
+    out.append(src[pos:])
+    return "".join(out)
+
+
+def attribute_insertion(src: str, tag: OpenTag, text: str) -> tuple[int, int, str]:
+    """Edit equivalent of insert_attribute()."""
+    at = tag.attrs_end
+    while at > tag.start and src[at - 1].isspace():
+        at -= 1
+    return at, at, " " + text
+
+
+def visits(*names):
+    """Limit a visitor to elements with these (case-insensitive) names; prefix matches end with "*"."""
+    def mark(fn):
+        fn.visits = tuple(n.lower() for n in names)
+        return fn
+    return mark
+
+
+def _wants(visitor, lname: str) -> bool:
+    names = getattr(visitor, "visits", None)
+    if names is None:
+        return True
+    return any(lname.startswith(n[:-1]) if n.endswith("*") else lname == n for n in names)
+
+
+def run_visitors(src: str, visitors) -> str:
+    """
+    Parse src once and call every visitor(element, src) -> [edits] on each element in
+    document order. Visitors see the original source; all edits are applied at the end.
+    """
+    edits = []
+    by_name = {}
+    for element in _scan_jsx(src)[1]:
+        if element.open is None:
+            continue
+        lname = element.name.lower()
+        wanted = by_name.get(lname)
+        if wanted is None:
+            wanted = by_name[lname] = [v for v in visitors if _wants(v, lname)]
+        for visitor in wanted:
+            edits.extend(visitor(element, src) or ())
+    return apply_edits(src, edits)
@@ -0,0 +1,187 @@
+"""
+Audit report storage for accessibility_fix.py.
+
+- slim_report: only what the fixer and the consolidated report use (violations + run metadata);
+  axe's passes/inapplicable/incomplete lists are dropped.
+- save_page_report / load_page_report: per-page reports as .json, .json.gz or .msgpack,
+  chosen by the file suffix (msgpack needs the optional `msgpack` package).
+- ReportWriter: the consolidated report as NDJSON, one line appended per page as it finishes
+  and the file put in job order on close (an interrupted run keeps completion order).
+- iter_report / load_legacy_report / write_legacy_report: read it back, including the
+  legacy {"pages": [...]} accessibility-report.json.
+
+Usage:
+  python a11y_report.py legacy accessibility-report.ndjson -o accessibility-report.json
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+from pathlib import Path
+
+from a11y_journal import atomic_write_bytes
+
+REPORT_FORMATS = {"json": ".json", "gzip": ".json.gz", "msgpack": ".msgpack"}
+SLIM_KEYS = ("url", "timestamp", "testEngine", "testRunner", "testEnvironment", "toolOptions", "violations",
+             "missing")  # scoped verification audits: include selectors that matched nothing
+
+
+def slim_report(report: dict) -> dict:
+    return {key: report[key] for key in SLIM_KEYS if key in report}
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise RuntimeError("--report-format msgpack needs the msgpack package (pip install msgpack)") from None
+    return msgpack
+
+
+def ensure_report_format(name: str):
+    """Fail before the run starts when the chosen format's optional dependency is missing."""
+    if name == "msgpack":
+        _msgpack()
+
+
+def encode_report(path: Path, report: dict) -> bytes:
+    name = path.name
+    if name.endswith(".msgpack"):
+        return _msgpack().packb(report, use_bin_type=True)
+    data = json.dumps(report, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(data, mtime=0) if name.endswith(".gz") else data
+
+
+def save_page_report(path: Path, report: dict) -> int:
+    """Write the slimmed report in the format of `path`'s suffix; returns the bytes written."""
+    return atomic_write_bytes(path, encode_report(path, slim_report(report)))
+
+
+def load_page_report(path: Path) -> dict:
+    data = path.read_bytes()
+    if path.name.endswith(".msgpack"):
+        return _msgpack().unpackb(data, raw=False)
+    if path.name.endswith(".gz"):
+        data = gzip.decompress(data)
+    return json.loads(data)
+
+
+class ReportWriter:
+    """
+    Thread-safe NDJSON appender; every line is flushed so a crash keeps the pages already done.
+    Pages finish out of order, so close() rewrites the file in job ("index") order when needed.
+    """
+
+    def __init__(self, path: Path, mode: str = "w"):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._last_index = None
+        self._in_order = mode == "w"  # appending to an earlier file: its order is unknown
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open(mode, encoding="utf-8")
+
+    def append(self, entry: dict):
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        index = entry.get("index", 0)
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            self.count += 1
+            if self._last_index is not None and index < self._last_index:
+                self._in_order = False
+            self._last_index = index if self._last_index is None else max(index, self._last_index)
+
+    def close(self):
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+            if not self._in_order:
+                sort_report(self.path)
+                self._in_order = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _iter_lines(path: Path):
+    """(offset, entry) per complete line; a torn last line (interrupted run) is skipped."""
+    with path.open("rb") as f:
+        offset = 0
+        for raw in f:
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                if raw.endswith(b"\n"):
+                    raise
+                print(f"⚠ Ignoring incomplete last line of {path}")
+                break
+            yield offset, entry
+            offset += len(raw)
+
+
+def _legacy(entry: dict) -> dict:
+    return {k: v for k, v in entry.items() if k != "index"}
+
+
+def iter_report(path: Path):
+    """Consolidated-report entries in file order: job order once the writer closed."""
+    for _, entry in _iter_lines(path):
+        yield entry
+
+
+def sort_report(path: Path) -> int:
+    """Rewrite the NDJSON in job order: one pass for offsets, then the lines are copied over."""
+    order = sorted((entry.get("index", 0), offset) for offset, entry in _iter_lines(path))
+    tmp = path.with_name(f".{path.name}.tmp")
+    with path.open("rb") as src, tmp.open("wb") as dst:
+        for _, offset in order:
+            src.seek(offset)
+            dst.write(src.readline())
+    os.replace(tmp, path)
+    return len(order)
+
+
+def load_legacy_report(path: Path) -> dict:
+    """The legacy {"pages": [...]} document, pages in job order."""
+    entries = sorted(iter_report(path), key=lambda e: e.get("index", 0))
+    return {"pages": [_legacy(e) for e in entries]}
+
+
+def write_legacy_report(path: Path, out: Path) -> int:
+    """
+    Rebuild the legacy accessibility-report.json from the NDJSON without holding every
+    page in memory: one pass for offsets, then entries are copied over in job order.
+    """
+    order = sorted((entry.get("index", 0), offset) for offset, entry in _iter_lines(path))
+    tmp = out.with_name(f".{out.name}.tmp")
+    with path.open("rb") as src, tmp.open("w", encoding="utf-8") as dst:
+        dst.write('{\n  "pages": [')
+        for i, (_, offset) in enumerate(order):
+            src.seek(offset)
+            page = json.dumps(_legacy(json.loads(src.readline())), indent=2)
+            dst.write(("," if i else "") + "\n    " + page.replace("\n", "\n    "))
+        dst.write("\n  ]\n}\n" if order else "]\n}\n")
+    os.replace(tmp, out)
+    return len(order)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    legacy = sub.add_parser("legacy", help='rebuild the {"pages": [...]} report from the NDJSON one')
+    legacy.add_argument("report", type=Path, help="consolidated NDJSON report")
+    legacy.add_argument("-o", "--out", type=Path, default=Path("accessibility-report.json"))
+    args = parser.parse_args(argv)
+    if args.command == "legacy":
+        pages = write_legacy_report(args.report, args.out)
+        print(f"✅ {pages} page(s) written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
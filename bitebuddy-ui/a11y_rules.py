@@ -0,0 +1,367 @@
+"""
+Deterministic fixes for common axe rules, applied to the JSX source without Bedrock.
+
+Handlers are registered per axe rule id with @rule_fixer. Each one receives the
+current source, the opening tag the axe node was located at, the node and its
+violation, and returns the patched source, or None when it cannot fix the node
+safely. Unfixed nodes are handed back to the caller (and from there to the LLM).
+Handlers only ever edit the opening tag they were given.
+"""
+import re
+from pathlib import PurePosixPath
+
+from a11y_jsx import OpenTag, find_close_tag, insert_attribute, iter_open_tags, parse_open_tag, set_attribute
+
+RULE_FIXERS = {}
+
+# Rendered HTML tag -> JSX element names that commonly render it
+JSX_CANDIDATES = {
+    "img": {"img"},
+    "button": {"button", "Button", "IconButton"},
+    "a": {"a", "Link", "NavLink"},
+    "input": {"input", "Input", "TextField"},
+    "select": {"select", "Select"},
+    "textarea": {"textarea"},
+    "th": {"th", "TableCell"},
+    "td": {"td", "TableCell"},
+}
+
+# HTML attributes worth comparing against JSX literals (JSX name in parentheses when it differs)
+_MATCH_ATTRS = {
+    "id": "id", "name": "name", "type": "type", "src": "src", "href": "href", "placeholder": "placeholder",
+    "alt": "alt", "title": "title", "role": "role", "aria-label": "aria-label", "for": "htmlFor",
+}
+
+
+def rule_fixer(*rule_ids):
+    def register(fn):
+        for rule_id in rule_ids:
+            RULE_FIXERS[rule_id] = fn
+        return fn
+    return register
+
+
+# ---------- Locating axe nodes in the source ----------
+def _html_text(html: str) -> str:
+    text = re.sub(r"<[^>]*>", " ", html)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _jsx_inner(src: str, tag: OpenTag) -> str:
+    close = find_close_tag(src, tag)
+    return src[tag.end:close[0]] if close else ""
+
+
+def _score(src: str, tag: OpenTag, html_tag: OpenTag, html: str) -> int:
+    score = 0
+    for html_name, jsx_name in _MATCH_ATTRS.items():
+        html_attr = html_tag.attr(html_name)
+        if html_attr is None or html_attr.value is None:
+            continue
+        jsx_attr = tag.attr(jsx_name) or (tag.attr("to") if html_name == "href" else None)
+        if jsx_attr is None or jsx_attr.value is None:
+            continue
+        score += 3 if jsx_attr.value == html_attr.value else -3
+
+    html_class = html_tag.attr("class")
+    jsx_class = tag.attr("className")
+    if html_class and jsx_class and html_class.value and jsx_class.value:
+        shared = set(html_class.value.split()) & set(jsx_class.value.split())
+        score += min(len(shared), 3)
+
+    text = _html_text(html)
+    if text:
+        inner = _html_text(_jsx_inner(src, tag))
+        if inner and text in inner:
+            score += 2
+    return score
+
+
+def match_node(src: str, node: dict) -> tuple[int, OpenTag] | None:
+    """
+    (score, tag) of the best JSX opening tag for an axe node, judged by its `html` snippet:
+    tag name, literal attribute values, shared class names and text.
+    Returns None unless the best candidate scores above zero and beats the runner-up; a lone
+    <img> whose literal src contradicts the snippet is someone else's element.
+    """
+    html = node.get("html") or ""
+    html_tag = parse_open_tag(html, html.find("<")) if "<" in html else None
+    if html_tag is None:
+        return None
+    names = JSX_CANDIDATES.get(html_tag.name.lower(), {html_tag.name.lower()})
+    candidates = list(iter_open_tags(src, names))
+    if not candidates:
+        return None
+    scored = sorted(((_score(src, t, html_tag, html), t.start, t) for t in candidates), key=lambda x: (-x[0], x[1]))
+    best = scored[0]
+    if best[0] <= 0 or (len(scored) > 1 and best[0] == scored[1][0]):
+        return None
+    return best[0], best[2]
+
+
+def locate_node(src: str, node: dict) -> OpenTag | None:
+    """Best JSX opening tag for an axe node (see match_node)."""
+    match = match_node(src, node)
+    return match[1] if match else None
+
+
+# ---------- Labels ----------
+def humanize(value: str) -> str:
+    """'main-logo.png' -> 'Main logo', '/order-history' -> 'Order history', 'DeleteIcon' -> 'Delete'."""
+    value = PurePosixPath(value.split("?")[0].split("#")[0].rstrip("/")).stem if value else ""
+    value = re.sub(r"(Outlined|Rounded|Sharp|TwoTone)?Icon$", "", value)
+    value = re.sub(r"^(Fa|Md|Io|Ai|Bi|Hi)(?=[A-Z])", "", value)
+    value = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", value)
+    value = re.sub(r"[-_.\s]+", " ", value).strip()
+    return value[:1].upper() + value[1:].lower() if value else ""
+
+
+def _quote(label: str) -> str:
+    return '"' + label.replace('"', "&quot;") + '"'
+
+
+def _has_name(tag: OpenTag) -> bool:
+    return any(tag.has_attr(a) for a in ("aria-label", "aria-labelledby"))
+
+
+def _imported_path(src: str, identifier: str) -> str | None:
+    m = re.search(r"import\s+" + re.escape(identifier) + r"\s+from\s+[\"']([^\"']+)[\"']", src)
+    return m.group(1) if m else None
+
+
+def _icon_label(src: str, tag: OpenTag) -> str:
+    """Label from the first icon-like component inside the element (<DeleteIcon />, <FaTrash />)."""
+    inner = _jsx_inner(src, tag)
+    for child in iter_open_tags(inner):
+        if re.search(r"Icon$|^(Fa|Md|Io|Ai|Bi|Hi)[A-Z]", child.name):
+            return humanize(child.name)
+    return ""
+
+
+# ---------- Handlers ----------
+@rule_fixer("image-alt")
+def fix_image_alt(src: str, tag: OpenTag, node: dict, violation: dict) -> str | None:
+    if tag.has_attr("alt"):
+        return None
+    src_attr = tag.attr("src")
+    if src_attr is None:
+        return None
+    path = src_attr.value
+    if path is None:
+        # src={logo} where `import logo from "./logo.png"`
+        m = re.fullmatch(r"\{\s*([A-Za-z_$][\w$]*)\s*\}", src_attr.raw or "")
+        path = _imported_path(src, m.group(1)) if m else None
+    label = humanize(path) if path else ""
+    if not label:
+        return None
+    return insert_attribute(src, tag, f"alt={_quote(label)}")
+
+
+@rule_fixer("button-name")
+def fix_button_name(src: str, tag: OpenTag, node: dict, violation: dict) -> str | None:
+    if _has_name(tag):
+        return None
+    title = tag.attr("title")
+    label = (title.value if title else None) or _icon_label(src, tag)
+    if not label:
+        return None
+    return insert_attribute(src, tag, f"aria-label={_quote(label)}")
+
+
+@rule_fixer("link-name")
+def fix_link_name(src: str, tag: OpenTag, node: dict, violation: dict) -> str | None:
+    if _has_name(tag):
+        return None
+    title = tag.attr("title")
+    target = tag.attr("to") or tag.attr("href")
+    label = (title.value if title else None) or _icon_label(src, tag)
+    if not label and target is not None and target.value and target.value not in ("#", "/"):
+        label = humanize(target.value)
+    if not label:
+        return None
+    return insert_attribute(src, tag, f"aria-label={_quote(label)}")
+
+
+@rule_fixer("label", "select-name")
+def fix_form_label(src: str, tag: OpenTag, node: dict, violation: dict) -> str | None:
+    if _has_name(tag) or tag.has_attr("label"):
+        return None
+    for source in ("placeholder", "name", "id"):
+        attr = tag.attr(source)
+        if attr is not None and attr.value:
+            label = attr.value if source == "placeholder" else humanize(attr.value)
+            return insert_attribute(src, tag, f"aria-label={_quote(label)}")
+    return None
+
+
+@rule_fixer("scope-attr-valid")
+def fix_th_scope(src: str, tag: OpenTag, node: dict, violation: dict) -> str | None:
+    scope = tag.attr("scope")
+    if scope is not None and scope.value in ("row", "col", "rowgroup", "colgroup"):
+        return None
+    # Header cells inside <thead>/<TableHead> label columns; anything else labels its row
+    before = src[:tag.start]
+    in_head = max(before.rfind("<thead"), before.rfind("<TableHead")) > max(
+        before.rfind("</thead"), before.rfind("</TableHead"))
+    return set_attribute(src, tag, "scope", '"col"' if in_head else '"row"')
+
+
+# ---------- Color contrast ----------
+def _hex_to_rgb(value: str) -> tuple[int, int, int]:
+    h = value.lstrip("#")
+    if len(h) == 3:
+        h = "".join(c * 2 for c in h)
+    return int(h[0:2], 16), int(h[2:4], 16), int(h[4:6], 16)
+
+
+def _rgb_to_hex(rgb) -> str:
+    return "#" + "".join(f"{max(0, min(255, round(c))):02x}" for c in rgb)
+
+
+def relative_luminance(rgb) -> float:
+    def channel(c):
+        c = c / 255
+        return c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4
+    r, g, b = (channel(c) for c in rgb)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def contrast_ratio(fg: str, bg: str) -> float:
+    l1, l2 = relative_luminance(_hex_to_rgb(fg)), relative_luminance(_hex_to_rgb(bg))
+    hi, lo = max(l1, l2), min(l1, l2)
+    return (hi + 0.05) / (lo + 0.05)
+
+
+def nearest_compliant_color(fg: str, bg: str, target: float = 4.5) -> str | None:
+    """
+    Smallest change to `fg` (mixing it toward black or white) that reaches `target`
+    contrast against `bg`. None if neither direction can reach it.
+    """
+    if contrast_ratio(fg, bg) >= target:
+        return fg.lower()
+    base = _hex_to_rgb(fg)
+    best = None
+    for toward in ((0, 0, 0), (255, 255, 255)):
+        if contrast_ratio(_rgb_to_hex(toward), bg) < target:
+            continue
+        lo, hi = 0.0, 1.0
+        for _ in range(24):
+            mid = (lo + hi) / 2
+            mixed = _rgb_to_hex(b + (t - b) * mid for b, t in zip(base, toward))
+            if contrast_ratio(mixed, bg) >= target:
+                hi = mid
+            else:
+                lo = mid
+        # Rounding to 8-bit channels can land just under the target: step until it passes
+        while True:
+            candidate = _rgb_to_hex(b + (t - b) * hi for b, t in zip(base, toward))
+            if contrast_ratio(candidate, bg) >= target or hi >= 1.0:
+                break
+            hi = min(1.0, hi + 1 / 255)
+        if best is None or hi < best[0]:
+            best = (hi, candidate)
+    return best[1] if best else None
+
+
+_SUMMARY_CONTRAST = {
+    "fg": re.compile(r"foreground colou?r:\s*(#[0-9a-fA-F]{3,8})", re.IGNORECASE),
+    "bg": re.compile(r"background colou?r:\s*(#[0-9a-fA-F]{3,8})", re.IGNORECASE),
+    "contrast": re.compile(r"contrast of\s*([\d.]+)", re.IGNORECASE),
+    "expected": re.compile(r"Expected contrast ratio of\s*([\d.]+)", re.IGNORECASE),
+}
+
+
+def contrast_data(node: dict) -> dict:
+    """
+    {fg, bg, contrast, expected} for a color-contrast node. axe puts these in the check's
+    data (fgColor, bgColor, contrastRatio, expectedContrastRatio); the failureSummary
+    wording ("foreground color: #777777, ...") is only the fallback.
+    """
+    for check in node.get("any", []) + node.get("all", []) + node.get("none", []):
+        data = check.get("data") if isinstance(check, dict) else None
+        if isinstance(data, dict) and data.get("fgColor") and data.get("bgColor"):
+            found = {"fg": data["fgColor"], "bg": data["bgColor"]}
+            if data.get("contrastRatio"):
+                found["contrast"] = float(data["contrastRatio"])
+            m = re.match(r"\s*([\d.]+)", str(data.get("expectedContrastRatio", "")))
+            if m:
+                found["expected"] = float(m.group(1))
+            return found
+    summary = node.get("failureSummary", "")
+    found = {}
+    for key, pattern in _SUMMARY_CONTRAST.items():
+        m = pattern.search(summary)
+        if m:
+            found[key] = m.group(1) if key in ("fg", "bg") else float(m.group(1).rstrip("."))
+    return found
+
+
+def _hex_variants(color: str) -> list[str]:
+    h = color.lstrip("#").lower()
+    if len(h) == 3:
+        return ["#" + h, "#" + "".join(c * 2 for c in h)]
+    if len(h) == 6 and h[0::2] == h[1::2]:
+        return ["#" + h, "#" + h[0::2]]
+    return ["#" + h]
+
+
+@rule_fixer("color-contrast")
+def fix_color_contrast(src: str, tag: OpenTag, node: dict, violation: dict) -> str | None:
+    data = contrast_data(node)
+    fg, bg = node.get("fg") or data.get("fg"), node.get("bg") or data.get("bg")
+    if not fg or not bg:
+        return None
+    target = data.get("expected") or 4.5
+    replacement = nearest_compliant_color(fg, bg, target)
+    if not replacement:
+        return None
+    # Only inline literals on this element can be patched safely (not classes or theme values)
+    segment = src[tag.start:tag.end]
+    pattern = re.compile(
+        r"(?<![0-9a-fA-F])(" + "|".join(re.escape(v) for v in _hex_variants(fg)) + r")(?![0-9a-fA-F])",
+        re.IGNORECASE,
+    )
+    patched, count = pattern.subn(replacement, segment, count=1)
+    if not count:
+        return None
+    return src[:tag.start] + patched + src[tag.end:]
+
+
+# ---------- Engine ----------
+def apply_rule_fixes(src: str, violations: list) -> tuple[str, list, int]:
+    """
+    Run every registered handler over the violations.
+    Returns (patched source, violations still needing a fix, number of nodes fixed).
+    Nodes that resolve to the same element and rule (e.g. one JSX element rendered by
+    .map()) are fixed once and all count as handled.
+    """
+    work = {}        # (tag start, rule id) -> [(node, violation)]
+    remaining = {}   # id(violation) -> unfixed nodes
+    for violation in violations:
+        handler = RULE_FIXERS.get(violation.get("id"))
+        for node in violation.get("nodes", []):
+            tag = locate_node(src, node) if handler else None
+            if tag is None:
+                remaining.setdefault(id(violation), []).append(node)
+                continue
+            work.setdefault((tag.start, violation["id"]), []).append((node, violation))
+
+    fixed = 0
+    # Edits stay inside one opening tag, so going back to front keeps earlier offsets valid
+    for (start, rule_id), items in sorted(work.items(), key=lambda kv: kv[0][0], reverse=True):
+        tag = parse_open_tag(src, start)
+        node, violation = items[0]
+        patched = RULE_FIXERS[rule_id](src, tag, node, violation) if tag else None
+        if patched is None:
+            for node, violation in items:
+                remaining.setdefault(id(violation), []).append(node)
+            continue
+        src = patched
+        fixed += len(items)
+
+    left = []
+    for violation in violations:
+        nodes = remaining.get(id(violation))
+        if nodes:
+            left.append({**violation, "nodes": nodes})
+    return src, left, fixed
@@ -0,0 +1,293 @@
+"""
+Local app for accessibility_fix.py audits, so BASE_URL does not have to be up already.
+
+- build_app: `npm run build` into dist/ once per run, skipped when the sources, public/,
+  index.html, configs and lockfile hash to the same stamp as the last build.
+- StaticAppServer: in-process HTTP server for dist/ with SPA fallback (paths without a file
+  extension get index.html), on a daemon thread.
+- StubBackend: canned JSON for the endpoints in src/services/api.js (port 5000), so pages
+  that load data render without the real backend.
+- AppServers: both of the above for the whole run, as a context manager. With the stub it
+  also names the localStorage (a stub session token) the audits seed, so private routes
+  render their page instead of redirecting to /login.
+
+Built bundles serve every page from static files; the Vite dev server (--dev-server)
+transforms modules on demand, which made each page.goto slow.
+"""
+import functools
+import hashlib
+import json
+import re
+import shutil
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+BUILD_INPUTS = ("src", "public", "index.html", "package.json", "package-lock.json",
+                "vite.config.js", "vite.config.ts", "postcss.config.js", "tailwind.config.js")
+BUILD_STAMP = ".a11y-build-stamp"
+STUB_BACKEND_PORT = 5000  # api.js: baseURL "http://localhost:5000/api"
+# What loginPage.jsx stores after a stub login; PrivateRoute only checks that "token" is set
+STUB_LOCAL_STORAGE = {"token": "stub-token"}
+
+
+def build_stamp(root: Path) -> str:
+    h = hashlib.sha256()
+    for name in BUILD_INPUTS:
+        path = root / name
+        files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for file_path in files:
+            try:
+                data = file_path.read_bytes()
+            except OSError:
+                continue
+            h.update(file_path.relative_to(root).as_posix().encode("utf-8") + b"\0" + data + b"\0")
+    return h.hexdigest()
+
+
+def build_app(root: Path = Path("."), out_dir: Path = Path("dist"), force: bool = False) -> bool:
+    """Build the app into out_dir unless it is up to date. Returns True when a build ran."""
+    stamp = build_stamp(root)
+    stamp_path = root / out_dir / BUILD_STAMP
+    if not force and (root / out_dir / "index.html").exists() and stamp_path.exists() \
+            and stamp_path.read_text(encoding="utf-8") == stamp:
+        return False
+    npm = shutil.which("npm")
+    if npm is None:
+        raise RuntimeError("npm not found: install Node.js or audit a running server with --dev-server")
+    subprocess.run([npm, "run", "build", "--", "--outDir", str(out_dir), "--emptyOutDir"], cwd=root, check=True)
+    stamp_path.write_text(stamp, encoding="utf-8")
+    return True
+
+
+def wait_for_http(url: str, timeout: float = 30.0, interval: float = 0.1):
+    """Poll `url` until it answers with a 2xx/3xx status."""
+    deadline = time.monotonic() + timeout
+    last_error = None
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=interval * 10) as response:
+                if response.status < 400:
+                    return
+                last_error = f"HTTP {response.status}"
+        except (urllib.error.URLError, OSError) as e:
+            last_error = e
+        time.sleep(interval)
+    raise RuntimeError(f"{url} not ready after {timeout:.0f}s: {last_error}")
+
+
+class _ThreadedServer:
+    """ThreadingHTTPServer on a daemon thread; start() binds, stop() shuts down and closes."""
+
+    handler = None
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _make_handler(self):
+        return self.handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name=type(self).__name__, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=5)
+        self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _SpaHandler(SimpleHTTPRequestHandler):
+    def _spa_path(self):
+        path = urlsplit(self.path).path
+        if Path(path).suffix:
+            return  # assets stay 404 when missing
+        if not Path(self.translate_path(path)).is_file():
+            self.path = "/index.html"
+
+    def do_GET(self):
+        self._spa_path()
+        super().do_GET()
+
+    def do_HEAD(self):
+        self._spa_path()
+        super().do_HEAD()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StaticAppServer(_ThreadedServer):
+    def __init__(self, directory: Path, host: str = "127.0.0.1", port: int = 8989):
+        super().__init__(host, port)
+        self.directory = directory
+
+    def _make_handler(self):
+        return functools.partial(_SpaHandler, directory=str(self.directory))
+
+
+# ---------- Stub backend ----------
+STUB_USER = {"_id": "u1", "name": "Audit User", "email": "audit@example.com", "role": "user"}
+STUB_ITEMS = [
+    {"_id": f"i{n}", "name": name, "description": desc, "price": price, "image": "/vite.svg"}
+    for n, (name, desc, price) in enumerate([
+        ("Margherita Pizza", "Tomato, mozzarella and basil", 9.5),
+        ("Caesar Salad", "Romaine, parmesan and croutons", 7.0),
+        ("Lemonade", "Freshly squeezed", 3.25),
+    ], start=1)
+]
+STUB_ORDER = {"_id": "o1", "user": "u1", "status": "pending", "totalPrice": 16.5,
+              "items": [{**STUB_ITEMS[0], "quantity": 1}, {**STUB_ITEMS[1], "quantity": 1}]}
+
+# (method, path regex under /api, response); mirrors the calls in src/services/api.js
+STUB_ROUTES = [
+    ("POST", r"/auth/login", {"token": STUB_LOCAL_STORAGE["token"], "user": STUB_USER}),
+    ("POST", r"/auth/register", {"message": "Registered", "user": STUB_USER}),
+    ("GET", r"/auth/me", STUB_USER),
+    ("GET", r"/catalog", {"items": STUB_ITEMS, "total": len(STUB_ITEMS)}),
+    ("POST", r"/catalog", STUB_ITEMS[0]),
+    ("GET", r"/orders", {"items": [STUB_ORDER], "total": 1}),
+    ("POST", r"/orders", STUB_ORDER),
+    ("POST", r"/orders/[^/]+/cancel", {**STUB_ORDER, "status": "cancelled"}),
+    ("PATCH", r"/orders/[^/]+", STUB_ORDER),
+    ("POST", r"/payments/create", {"paymentId": "pay_stub", "clientSecret": "secret_stub"}),
+    ("POST", r"/payments/confirm", {"success": True, "order": {**STUB_ORDER, "status": "confirmed"}}),
+]
+
+
+def stub_response(method: str, path: str) -> tuple[int, dict]:
+    route = urlsplit(path).path
+    if route.startswith("/api"):
+        route = route[len("/api"):]
+        for verb, pattern, body in STUB_ROUTES:
+            if verb == method and re.fullmatch(pattern, route.rstrip("/") or "/"):
+                return 200, body
+    return 404, {"message": f"No stub for {method} {route}"}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def _cors(self):
+        self.send_header("Access-Control-Allow-Origin", self.headers.get("Origin") or "*")
+        self.send_header("Access-Control-Allow-Credentials", "true")
+        self.send_header("Access-Control-Allow-Headers", "Authorization, Content-Type")
+        self.send_header("Access-Control-Allow-Methods", "GET, POST, PATCH, PUT, DELETE, OPTIONS")
+
+    def _answer(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        status, body = stub_response(self.command, self.path)
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self._cors()
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PATCH = do_PUT = do_DELETE = _answer
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self._cors()
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubBackend(_ThreadedServer):
+    handler = _StubHandler
+
+    def __init__(self, host: str = "127.0.0.1", port: int = STUB_BACKEND_PORT):
+        super().__init__(host, port)
+
+
+class AppServers:
+    """
+    Build once, then serve dist/ at base_url and the stub backend for the whole run.
+    A backend port already in use is taken to be the real backend and left alone.
+    """
+
+    def __init__(self, base_url: str, root: Path = Path("."), out_dir: Path = Path("dist"), stub_backend: bool = True):
+        parts = urlsplit(base_url)
+        self.base_url = base_url.rstrip("/")
+        self.root = root
+        self.out_dir = out_dir
+        self.app = StaticAppServer(root / out_dir, host=parts.hostname or "127.0.0.1", port=parts.port or 80)
+        self.backend = StubBackend() if stub_backend else None
+
+    def start(self, timeout: float = 30.0):
+        started = time.perf_counter()
+        built = build_app(self.root, self.out_dir)
+        print(f"📦 {'Built' if built else 'Reusing up-to-date build in'} {self.out_dir} "
+              f"({time.perf_counter() - started:.1f}s)")
+        try:
+            self.app.start()
+        except OSError as e:
+            raise RuntimeError(f"cannot serve {self.out_dir} at {self.base_url} ({e}); "
+                               "stop the server using that port or pass --dev-server") from None
+        if self.backend is not None:
+            try:
+                self.backend.start()
+            except OSError:
+                print(f"⚠ Port {self.backend.port} is busy; assuming the real backend is running there.")
+                self.backend = None
+        try:
+            wait_for_http(self.base_url + "/", timeout)
+        except RuntimeError:
+            self.stop()
+            raise
+        stub = f", stub API on {self.backend.url}/api" if self.backend else ""
+        print(f"🖥️ Serving {self.out_dir} at {self.base_url}{stub}")
+        return self
+
+    @property
+    def local_storage(self) -> dict:
+        """localStorage each audited page starts with: a stub session, so private routes render."""
+        return dict(STUB_LOCAL_STORAGE) if self.backend is not None else {}
+
+    def rebuild(self) -> bool:
+        """Rebuild dist/ in place after the sources changed; the running server picks it up."""
+        started = time.perf_counter()
+        built = build_app(self.root, self.out_dir)
+        if built:
+            print(f"📦 Rebuilt {self.out_dir} with the fixes ({time.perf_counter() - started:.1f}s)")
+        return built
+
+    def stop(self):
+        if self.backend is not None:
+            self.backend.stop()
+        self.app.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,115 @@
+"""
+Sharded runs of accessibility_fix.py (`--shard i/n`, then `merge`).
+
+- partition: deterministic split of the target pages into n shards, balanced by cost
+  (longest-processing-time first). A page's cost is its wall time in the last run when
+  known, else an estimate from its file size and last violation count, calibrated against
+  the pages that have both.
+- Costs come from one shard-costs.json written by single-node runs and by `merge`. Every
+  runner must read the same file (or none), so all shards compute the same partition;
+  shards record its fingerprint and `merge` refuses a mix.
+- collect_costs / merge_ndjson: the per-page history and merged consolidated report.
+
+Usage:
+  python accessibility_fix.py --shard 3/8          # on each of 8 runners
+  python accessibility_fix.py merge a11y_shards/*  # once, with every shard's bundle
+"""
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+from a11y_journal import atomic_write_text
+from a11y_report import ReportWriter, iter_report
+
+BASE_COST_S = 1.0  # browser navigation + axe on an empty page
+COST_PER_KB_S = 0.05
+COST_PER_VIOLATION_S = 0.5  # rule engine / Bedrock work per failing rule
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """'3/8' -> (3, 8); shards are numbered from 1."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/n, got {value!r}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {value!r} out of range (1 <= i <= n)")
+    return index, count
+
+
+def load_costs(path: Path) -> dict:
+    """{page: {"violations", "wall_s"}} from shard-costs.json, or {} without one."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("pages", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def costs_digest(costs: dict) -> str:
+    return hashlib.sha256(json.dumps(costs, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def targets_digest(pages: list[str]) -> str:
+    return hashlib.sha256("\n".join(pages).encode("utf-8")).hexdigest()[:16]
+
+
+def _estimate(size: int, history: dict) -> float:
+    return BASE_COST_S + size / 1024 * COST_PER_KB_S + history.get("violations", 0) * COST_PER_VIOLATION_S
+
+
+def page_costs(pages: dict[str, int], costs: dict) -> dict[str, float]:
+    """{page: seconds} for {page: file size}; measured wall time wins over the estimate."""
+    ratios = sorted(costs[p]["wall_s"] / _estimate(size, costs[p]) for p, size in pages.items()
+                    if costs.get(p, {}).get("wall_s"))
+    scale = ratios[len(ratios) // 2] if ratios else 1.0
+    return {page: costs.get(page, {}).get("wall_s") or _estimate(size, costs.get(page, {})) * scale
+            for page, size in pages.items()}
+
+
+def partition(pages: dict[str, int], count: int, costs: dict) -> list[list[str]]:
+    """
+    Split {page: file size} into `count` shards of similar total cost. Pages are placed most
+    expensive first on the currently cheapest shard; ties break on names and shard numbers,
+    so every runner computes the same split. Each shard lists its pages sorted.
+    """
+    cost = page_costs(pages, costs)
+    shards = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for page in sorted(pages, key=lambda p: (-cost[p], p)):
+        target = min(range(count), key=lambda i: (loads[i], i))
+        shards[target].append(page)
+        loads[target] += cost[page]
+    return [sorted(shard) for shard in shards]
+
+
+def collect_costs(report_entries, profile_records) -> dict:
+    """Per-page history for the next partition: violation count and wall time of the `page` stage."""
+    pages = {}
+    for entry in report_entries:
+        pages.setdefault(entry["page"], {})["violations"] = len(entry.get("violations", []))
+    for record in profile_records:
+        if record.get("stage") == "page" and record.get("page"):
+            pages.setdefault(record["page"], {})["wall_s"] = round(record["wall_s"], 3)
+    return pages
+
+
+def save_costs(path: Path, pages: dict):
+    atomic_write_text(path, json.dumps({"pages": dict(sorted(pages.items()))}, indent=2))
+
+
+def read_profile(path: Path) -> list:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except OSError:
+        return []
+
+
+def merge_ndjson(paths: list[Path], out: Path) -> list:
+    """Concatenate per-shard consolidated reports into `out` in job order; returns the entries."""
+    entries = sorted((entry for path in paths for entry in iter_report(path)), key=lambda e: e.get("index", 0))
+    with ReportWriter(out) as writer:
+        for entry in entries:
+            writer.append(entry)
+    return entries
@@ -0,0 +1,216 @@
+"""
+Streaming Bedrock answers for accessibility_fix.py.
+
+- iter_stream_events: decoded Anthropic events from invoke_model_with_response_stream.
+- FixStreamValidator: checks the `[{"id", "replacement"}, ...]` answer while it streams,
+  so a bad answer is cut off at the first offending token instead of after max_tokens.
+- FakeBedrockClient: offline stand-in for the bedrock-runtime client (streamed and not).
+"""
+import io
+import json
+import re
+import time
+
+from a11y_jsx import same_element_tag
+
+# Shared with clean_updated_jsx(): what it strips is what the validator rejects
+NARRATION_RE = re.compile(
+    r"^\s*(here'?s|here is|updated jsx|updated code|the key changes|summary of changes|assistant:)\b",
+    re.IGNORECASE,
+)
+PLACEHOLDER_RE = re.compile(
+    r"\{\s*/\*\s*(other content|unchanged|placeholder|omitted|rows omitted|table content)\s*\*/\s*\}",
+    re.IGNORECASE,
+)
+HTML_WRAPPER_RE = re.compile(r"(?is)<!DOCTYPE[^>]*>|</?(html|head|body)\b[^>]*>")
+
+
+class StreamRejected(Exception):
+    """The answer broke the output contract; the message is quoted in the retry prompt."""
+
+
+class FixStreamValidator:
+    """
+    Incremental check of a fix-suggestion answer.
+    feed() returns the fixes completed by the new text and raises StreamRejected on
+    narration, placeholder comments, malformed JSON or a replacement that is not the
+    element's opening tag. Fixes accepted before a rejection stay in `fixes`. `done` is set
+    by the closing `]`, or as soon as every id has its fix (the rest is not worth waiting for).
+    """
+
+    def __init__(self, sources: dict):
+        self.sources = sources  # id -> original opening tag
+        self.fixes = []
+        self.done = False  # the closing `]` has arrived, or every id is answered
+        self._answered = set()
+        self._buf = ""
+        self._pos = None  # index after `[` once the array has started
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text: str) -> list:
+        self._buf += text
+        if self.done or (self._pos is None and not self._start()):
+            return []
+        return self._drain()
+
+    def finish(self):
+        if not self.done:
+            raise StreamRejected("the answer ended before the JSON array was closed")
+
+    def _start(self) -> bool:
+        buf = self._buf
+        i = len(buf) - len(buf.lstrip())
+        if buf.startswith("```", i):
+            newline = buf.find("\n", i)
+            if newline == -1:
+                return False
+            i = newline + 1
+            while i < len(buf) and buf[i].isspace():
+                i += 1
+        elif "```".startswith(buf[i:i + 3]) and i + 3 > len(buf):
+            return False  # a fence may still be arriving
+        if i >= len(buf):
+            return False
+        if buf[i] != "[":
+            raise StreamRejected(f"narration before the JSON array: {buf[i:i + 60]!r}")
+        self._pos = i + 1
+        return True
+
+    def _drain(self) -> list:
+        new, buf = [], self._buf
+        while True:
+            i = self._pos
+            while i < len(buf) and (buf[i].isspace() or buf[i] == ","):
+                i += 1
+            self._pos = i
+            if i >= len(buf):
+                return new
+            if buf[i] == "]":
+                self.done = True
+                return new
+            if buf[i] != "{":
+                raise StreamRejected(f"malformed JSON near {buf[i:i + 60]!r}")
+            try:
+                obj, end = self._decoder.raw_decode(buf, i)
+            except json.JSONDecodeError as e:
+                partial = buf[i:]
+                if PLACEHOLDER_RE.search(partial) or HTML_WRAPPER_RE.search(partial):
+                    raise StreamRejected("placeholder comment or HTML wrapper inside a replacement")
+                # A chunk may end inside a string or a \uXXXX escape: json reports an escape as
+                # invalid (e.pos at its "u") until one more character follows it
+                cut_escape = e.msg.startswith("Invalid \\uXXXX") and e.pos + 5 >= len(buf)
+                if e.msg.startswith("Unterminated string") or cut_escape or e.pos >= len(buf) - 1:
+                    return new  # incomplete, wait for more text
+                raise StreamRejected(f"malformed JSON: {e.msg}")
+            self._pos = end
+            fix = self._accept(obj)
+            # Recorded now, so a rejection later in the same chunk keeps it
+            self.fixes.append(fix)
+            new.append(fix)
+            self._answered.add(fix["id"])
+            if len(self._answered) == len(self.sources):
+                self.done = True
+                return new
+
+    def _accept(self, obj) -> dict:
+        fix_id = obj.get("id") if isinstance(obj, dict) else None
+        replacement = obj.get("replacement") if isinstance(obj, dict) else None
+        source = self.sources.get(fix_id)
+        if source is None or not isinstance(replacement, str):
+            raise StreamRejected(f"unknown id or missing replacement in {json.dumps(obj)[:80]}")
+        replacement = replacement.strip()
+        if PLACEHOLDER_RE.search(replacement) or HTML_WRAPPER_RE.search(replacement):
+            raise StreamRejected(f"{fix_id}: placeholder comment or HTML wrapper in the replacement")
+        if not same_element_tag(source, replacement):
+            raise StreamRejected(f"{fix_id}: replacement is not a single opening tag of the same element")
+        return {"id": fix_id, "replacement": replacement}
+
+
+def iter_stream_events(body):
+    """Decoded Anthropic events from an invoke_model_with_response_stream body."""
+    for event in body:
+        chunk = event.get("chunk")
+        if chunk is None:
+            raise RuntimeError(f"Bedrock stream error: {event}")
+        yield json.loads(chunk["bytes"])
+
+
+# ---------- Offline fake ----------
+class FakeStreamBody:
+    """Iterable of Bedrock stream events; counts what was actually delivered before close()."""
+
+    def __init__(self, events: list, delay: float = 0.0):
+        self.events = events
+        self.delay = delay
+        self.delivered = 0
+        self.closed = False
+
+    def __iter__(self):
+        for event in self.events:
+            if self.closed:
+                return
+            if self.delay:
+                time.sleep(self.delay)
+            self.delivered += 1
+            yield event
+
+    def close(self):
+        self.closed = True
+
+
+def _estimate_tokens(text: str, chars_per_token: float = 4) -> int:
+    return max(1, int(len(text) / chars_per_token))
+
+
+def fake_stream_events(text: str, input_tokens: int, chunk_chars: int = 16, chars_per_token: float = 4) -> list:
+    events = [{"type": "message_start", "message": {"usage": {"input_tokens": input_tokens, "output_tokens": 1}}},
+              {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}]
+    for i in range(0, len(text), chunk_chars):
+        events.append({"type": "content_block_delta", "index": 0,
+                       "delta": {"type": "text_delta", "text": text[i:i + chunk_chars]}})
+    events += [{"type": "content_block_stop", "index": 0},
+               {"type": "message_delta", "delta": {"stop_reason": "end_turn"},
+                "usage": {"output_tokens": _estimate_tokens(text, chars_per_token)}},
+               {"type": "message_stop"}]
+    return [{"chunk": {"bytes": json.dumps(e).encode()}} for e in events]
+
+
+class FakeBedrockClient:
+    """
+    bedrock-runtime stand-in. `respond(request) -> text` produces each answer from the
+    decoded request body; streamed answers arrive in `chunk_chars` pieces, `delay` apart,
+    after `latency` seconds. Token counts are characters / `chars_per_token`.
+    """
+
+    def __init__(self, respond, chunk_chars: int = 16, delay: float = 0.0, latency: float = 0.0,
+                 chars_per_token: float = 4):
+        self.respond = respond
+        self.chunk_chars = chunk_chars
+        self.delay = delay
+        self.latency = latency
+        self.chars_per_token = chars_per_token
+        self.requests = []
+        self.bodies = []
+
+    def _answer(self, body: str) -> tuple[str, int]:
+        request = json.loads(body)
+        self.requests.append(request)
+        if self.latency:
+            time.sleep(self.latency)
+        return self.respond(request), _estimate_tokens(body, self.chars_per_token)
+
+    def invoke_model(self, modelId, body, **kwargs):
+        text, input_tokens = self._answer(body)
+        if self.delay:
+            time.sleep(self.delay * max(1, len(text) // self.chunk_chars))
+        payload = {"content": [{"type": "text", "text": text}],
+                   "usage": {"input_tokens": input_tokens,
+                             "output_tokens": _estimate_tokens(text, self.chars_per_token)}}
+        return {"body": io.BytesIO(json.dumps(payload).encode())}
+
+    def invoke_model_with_response_stream(self, modelId, body, **kwargs):
+        text, input_tokens = self._answer(body)
+        stream = FakeStreamBody(fake_stream_events(text, input_tokens, self.chunk_chars, self.chars_per_token),
+                                self.delay)
+        self.bodies.append(stream)
+        return {"body": stream, "contentType": "application/json"}
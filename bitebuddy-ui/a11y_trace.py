@@ -0,0 +1,168 @@
+"""
+Run profile for accessibility_fix.py: one record per stage per page.
+
+- RunProfile.span(stage, page) times a block and RunProfile.stage(name) a function taking a
+  PageJob. Code inside adds fields with RunProfile.note(retries=..., input_tokens=...,
+  output_tokens=..., bytes_written=..., cached=...); counters roll up into the enclosing
+  span, so a page's record carries its totals.
+- Records are appended to a JSONL trace as they finish, summarised as p50/p95 per
+  stage at the end, and optionally exported as Chrome trace events (chrome://tracing,
+  https://ui.perfetto.dev).
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+SUMMED_FIELDS = ("retries", "input_tokens", "output_tokens", "bytes_written")
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+class RunProfile:
+    def __init__(self, trace_path: Path | None = None):
+        self.trace_path = trace_path
+        self.records = []
+        self._lock = threading.Lock()
+        self._trace = None
+        self._t0 = time.perf_counter()
+        self._local = threading.local()
+
+    def open(self, trace_path: Path):
+        """Start (or restart) the JSONL trace at `trace_path`."""
+        self.close()
+        self.trace_path = trace_path
+        trace_path.parent.mkdir(parents=True, exist_ok=True)
+        self._trace = trace_path.open("w", encoding="utf-8", buffering=1)
+
+    def close(self):
+        with self._lock:
+            if self._trace is not None:
+                self._trace.close()
+                self._trace = None
+
+    @contextmanager
+    def span(self, stage: str, page: str, **fields):
+        record = dict(fields)
+        stack = self._stack()
+        stack.append(record)
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            ended = time.perf_counter()
+            stack.pop()
+            if stack:
+                for field in SUMMED_FIELDS:
+                    if record.get(field):
+                        stack[-1][field] = stack[-1].get(field, 0) + record[field]
+            record.update({
+                "stage": stage,
+                "page": page,
+                "start_s": round(started - self._t0, 6),
+                "wall_s": round(ended - started, 6),
+                "thread": threading.current_thread().name,
+                "tid": threading.get_ident(),
+            })
+            self._add(record)
+
+    def stage(self, name: str):
+        """Decorator: run the function inside span(name, <page of its PageJob argument>)."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                job = kwargs.get("job") or next((a for a in args if hasattr(a, "page")), None)
+                with self.span(name, job.page if job is not None else ""):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def note(self, **fields):
+        """Add fields to the innermost open span on this thread (numbers accumulate)."""
+        stack = self._stack()
+        if not stack:
+            return
+        record = stack[-1]
+        for key, value in fields.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and key in record:
+                record[key] += value
+            else:
+                record[key] = value
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self, record: dict):
+        with self._lock:
+            self.records.append(record)
+            if self._trace is not None:
+                self._trace.write(json.dumps(record) + "\n")
+
+    def summary(self) -> dict:
+        """{stage: {count, p50_s, p95_s, max_s, total_s, <summed fields>}} in first-seen stage order."""
+        stages = {}
+        with self._lock:
+            records = list(self.records)
+        for record in records:
+            stages.setdefault(record["stage"], []).append(record)
+        result = {}
+        for stage, items in stages.items():
+            walls = [r["wall_s"] for r in items]
+            row = {
+                "count": len(items),
+                "p50_s": round(percentile(walls, 50), 4),
+                "p95_s": round(percentile(walls, 95), 4),
+                "max_s": round(max(walls), 4),
+                "total_s": round(sum(walls), 4),
+            }
+            for field in SUMMED_FIELDS:
+                row[field] = sum(r.get(field, 0) or 0 for r in items)
+            result[stage] = row
+        return result
+
+    def print_summary(self):
+        rows = self.summary()
+        if not rows:
+            return
+        print("\n⏱️ Stage timings (wall seconds per page):")
+        print(f"  {'stage':<12} {'n':>5} {'p50':>8} {'p95':>8} {'max':>8} {'total':>9}  "
+              f"{'retries':>7} {'tok in':>8} {'tok out':>8} {'bytes':>10}")
+        for stage, r in rows.items():
+            print(f"  {stage:<12} {r['count']:>5} {r['p50_s']:>8.3f} {r['p95_s']:>8.3f} {r['max_s']:>8.3f} "
+                  f"{r['total_s']:>9.2f}  {r['retries']:>7} {r['input_tokens']:>8} {r['output_tokens']:>8} "
+                  f"{r['bytes_written']:>10}")
+        if self.trace_path:
+            print(f"⏱️ Trace saved to {self.trace_path}")
+
+    def write_chrome_trace(self, path: Path):
+        """Complete ("X") events, one row per worker thread."""
+        pid = os.getpid()
+        with self._lock:
+            records = list(self.records)
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in sorted({(r["tid"], r["thread"]) for r in records})]
+        for r in records:
+            args = {k: v for k, v in r.items() if k not in ("stage", "start_s", "wall_s", "thread", "tid")}
+            events.append({
+                "name": r["stage"], "cat": "a11y", "ph": "X", "pid": pid, "tid": r["tid"],
+                "ts": round(r["start_s"] * 1e6), "dur": round(r["wall_s"] * 1e6), "args": args,
+            })
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
+        print(f"⏱️ Chrome trace saved to {path}")
@@ -1,13 +1,35 @@
 import os
+import sys
 import json
+import argparse
 import subprocess
 import traceback
 import re
+import threading
+import hashlib
+import time
+import functools
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
 from dotenv import load_dotenv
 from datetime import datetime
-import boto3
-from botocore.config import Config
+
+from a11y_jsx import Element, apply_edits, attribute_insertion, run_visitors, same_element_tag, visits
+from a11y_rules import apply_rule_fixes, contrast_data, locate_node, match_node
+from a11y_journal import RunJournal, atomic_write_bytes, atomic_write_text, source_digest
+from a11y_fixstore import FixStore, fix_key
+from a11y_report import (
+    REPORT_FORMATS, ReportWriter, ensure_report_format, iter_report, load_page_report, save_page_report, slim_report,
+    write_legacy_report,
+)
+from a11y_shard import (
+    collect_costs, costs_digest, load_costs, merge_ndjson, parse_shard, partition, read_profile, save_costs,
+    targets_digest,
+)
+from a11y_trace import RunProfile
+from a11y_stream import NARRATION_RE, PLACEHOLDER_RE, FixStreamValidator, StreamRejected, iter_stream_events
 
 # === Load AWS credentials & env ===
 load_dotenv()
@@ -16,16 +38,101 @@ ROUTE_MAP_PATH = Path("route-map.json")  # optional: { "src/page/home.jsx": "/ho
 
 # === Paths ===
 JSX_FOLDER = Path("src/page")
-REPORT_PATH = Path("accessibility-report.json")  # legacy single report (kept for compatibility)
-CHECK_SCRIPT_PATH = Path("accessibility-check.js")  # node script invoked per page
+SRC_ROOT = Path("src")  # scanned for the reverse import graph used by --since
+APP_HTML = Path("index.html")  # its module script is the app entry that every page renders inside
+REPORT_PATH = Path("accessibility-report.json")  # legacy single report, rebuilt at the end of each run
+CONSOLIDATED_REPORT_PATH = Path("accessibility-report.ndjson")  # one line per page, appended as pages finish
+REPORT_FORMAT = "json"  # per-page report encoding: "json" | "gzip" | "msgpack" (see a11y_report.py)
+CHECK_SCRIPT_PATH = Path("accessibility-check.cjs")  # node script invoked per page
+WORKER_SCRIPT_PATH = Path("accessibility-worker.cjs")  # long-lived node audit sidecar
 BACKUP_ROOT = Path("a11y_backups")
+AUDIT_CACHE_DIR = BACKUP_ROOT / ".audit-cache"  # content-addressed axe reports (<key>.json)
+AUDIT_CACHE_MAX_ENTRIES = int(os.getenv("A11Y_AUDIT_CACHE_SIZE", "500"))
+AUDIT_CACHE_MODE = "on"  # "on" | "refresh" (re-audit, then store) | "off" (no reads, no writes)
+DEV_SERVER = False  # --dev-server: audit whatever already runs at BASE_URL instead of a fresh build of dist/
+AUDIT_ONLY = False  # --audit-only: reports only; boto3 is never imported and git never runs
+PROFILE_PATH = BACKUP_ROOT / "run-profile.jsonl"  # one JSON record per stage per page
+JOURNAL_PATH = BACKUP_ROOT / "journal.sqlite"  # per-run stage journal read by --resume
+FIX_STORE_PATH = BACKUP_ROOT / "fix-store.sqlite"  # accepted fixes reused across pages and runs
+FIX_STORE_MAX_ENTRIES = int(os.getenv("A11Y_FIX_STORE_SIZE", "5000"))
+ATTRIBUTION = True  # --no-attribution: fix every violation in the page file, as before
+VERIFY = True  # --no-verify: publish without the scoped re-audit of fixed pages
+VERIFICATION_PATH = BACKUP_ROOT / "verification.json"  # fixed / still failing / new violations per page
+SHARED_PREFIX = Path("_shared")  # artifacts of shared components: a11y_backups/_shared/<path under src>
+SHARD_COSTS_PATH = BACKUP_ROOT / "shard-costs.json"  # per-page costs of the last full run, read by --shard
+SHARD_ROOT = Path("a11y_shards")  # --shard bundles (a11y_shards/<i>-of-<n>/), combined by `merge`
+
+# === Per-page job context (replaces the old JSX_PATH/BACKUP_PATH/FIX_SUGGESTIONS_PATH globals) ===
+@dataclass
+class PageJob:
+    index: int                  # position in the sorted target list (drives report order)
+    jsx_path: Path
+    relative: Path              # jsx_path relative to JSX_FOLDER
+    url: str
+    backup_path: Path           # source before the first run that ever fixed the file (committed)
+    start_path: Path            # source as this run found it; verification rolls back to it
+    fix_suggestions_path: Path
+    report_path: Path
+    verify_report_path: Path    # scoped re-audit after the fixes
+
+    @property
+    def page(self) -> str:
+        return str(self.relative).replace("\\", "/")
+
+def make_page_job(index: int, file_path: Path, route_map: dict) -> PageJob:
+    return _make_job(index, file_path, file_path.relative_to(JSX_FOLDER), file_path_to_route(file_path, route_map))
+
+def make_component_job(index: int, file_path: Path, url: str) -> PageJob:
+    """Job for a shared component; `url` is one of the pages rendering it."""
+    try:
+        relative = SHARED_PREFIX / file_path.relative_to(SRC_ROOT)
+    except ValueError:
+        relative = SHARED_PREFIX / Path(*[part for part in file_path.parts if part not in ("..", ".")])
+    return _make_job(index, file_path, relative, url)
+
+def _make_job(index: int, file_path: Path, relative: Path, url: str) -> PageJob:
+    # Per-file artifacts live under a11y_backups/<same-subdir>/, prefixed with the page stem
+    # so pages sharing a directory never overwrite each other's files.
+    return PageJob(
+        index=index,
+        jsx_path=file_path,
+        relative=relative,
+        url=url,
+        backup_path=BACKUP_ROOT / relative.with_name(relative.stem + "_backup" + file_path.suffix),
+        start_path=BACKUP_ROOT / relative.with_name(relative.stem + "_run-start" + file_path.suffix),
+        fix_suggestions_path=BACKUP_ROOT / relative.with_name(relative.stem + "_fix-suggestions.json"),
+        report_path=BACKUP_ROOT / relative.with_name(relative.stem + "_accessibility-report" + REPORT_FORMATS[REPORT_FORMAT]),
+        verify_report_path=BACKUP_ROOT / relative.with_name(relative.stem + "_verify-report" + REPORT_FORMATS[REPORT_FORMAT]),
+    )
+
+# === Concurrency limits per pipeline stage ===
+class StageLimits:
+    """
+    Bounded parallelism for the three expensive stages of a page:
+    - audit: browser audits in flight
+    - llm:   concurrent Bedrock calls
+    - write: JSX/backup writes
+    Git runs once per run, after all pages (see ChangeCollector).
+    """
 
-# === Globals set per-file during processing ===
-JSX_PATH = None
-BACKUP_PATH = None
-FIX_SUGGESTIONS_PATH = None
+    def __init__(self, audit: int = 4, llm: int = 2, write: int = 1):
+        self.sizes = {"audit": audit, "llm": llm, "write": write}
+        self.audit = threading.BoundedSemaphore(audit)
+        self.llm = threading.BoundedSemaphore(llm)
+        self.write = threading.BoundedSemaphore(write)
 
-# === Node axe+playwright script (CLI: --url, --out) ===
+    @property
+    def max_in_flight(self) -> int:
+        # Enough pages in flight to keep every stage saturated
+        return sum(self.sizes.values())
+
+STAGE_LIMITS = StageLimits()
+PROFILE = RunProfile()  # stage timings/tokens/bytes; the trace file is opened in __main__
+JOURNAL = RunJournal()  # in-memory until __main__ opens JOURNAL_PATH
+FIX_STORE = FixStore()  # in-memory until __main__ opens FIX_STORE_PATH; None with --no-fix-store
+
+# === Node axe+playwright script (CLI: --url, --out, --include '<json list of axe targets>') ===
+# Written as .cjs: package.json sets "type": "module", so a .js file could not use require().
 ACCESSIBILITY_CHECK_JS = r"""
 const { chromium } = require('playwright');
 const AxeBuilder = require('@axe-core/playwright').default;
@@ -37,60 +144,435 @@ function parseArg(flag, fallback) {
   return fallback;
 }
 
+// Verification audits pass the selectors that failed before (axe `target`s). Selectors that no
+// longer match are reported back instead of being handed to axe, which rejects an empty context.
+async function scopedBuilder(page, include) {
+  let builder = new AxeBuilder({ page });
+  const missing = [];
+  if (!include) return { builder, missing, empty: false };
+  let present = 0;
+  for (const target of include) {
+    const last = Array.isArray(target) ? target[target.length - 1] : target;
+    if (Array.isArray(target) && target.length > 1 || typeof last !== 'string' || await page.$(last)) {
+      builder = builder.include(Array.isArray(target) && target.length === 1 ? target[0] : target);
+      present++;
+    } else {
+      missing.push(target);
+    }
+  }
+  return { builder, missing, empty: present === 0 };
+}
+
+// Runs in the page before the app: e.g. the stub session token, so private routes do not
+// redirect to /login in a fresh context
+function seedLocalStorage(items) {
+  for (const [key, value] of Object.entries(items)) localStorage.setItem(key, value);
+}
+
 (async () => {
   const url = parseArg('--url', 'http://localhost:8989/');
   const outPath = parseArg('--out', 'accessibility-report.json');
+  const include = parseArg('--include', null);
+  const storage = parseArg('--storage', null);
 
   const browser = await chromium.launch();
   const context = await browser.newContext();
+  if (storage) await context.addInitScript(seedLocalStorage, JSON.parse(storage));
   const page = await context.newPage();
 
   await page.goto(url, { waitUntil: 'domcontentloaded' });
   await page.waitForLoadState('domcontentloaded');
 
-  const results = await new AxeBuilder({ page }).analyze();
+  const { builder, missing, empty } = await scopedBuilder(page, include ? JSON.parse(include) : null);
+  const results = empty ? { violations: [] } : await builder.analyze();
+  if (include) results.missing = missing;
 
   // Enrich color-contrast nodes with color info
   results.violations.forEach(v => {
     if (v.id === 'color-contrast') {
       v.nodes.forEach(n => {
+        // axe reports the colors in the check data; the summary wording is the fallback
+        const data = [...(n.any || []), ...(n.all || []), ...(n.none || [])]
+          .map(c => c.data).find(d => d && d.fgColor && d.bgColor);
         const summary = n.failureSummary || '';
-        const ratioMatch = summary.match(/contrast of ([\d\.]+):1/i);
-        const fgMatch = summary.match(/Foreground:\s*(#[0-9a-fA-F]{3,6})/i);
-        const bgMatch = summary.match(/Background:\s*(#[0-9a-fA-F]{3,6})/i);
-        if (fgMatch) n.fg = fgMatch[1];
-        if (bgMatch) n.bg = bgMatch[1];
-        if (ratioMatch) n.contrast = parseFloat(ratioMatch[1]);
+        const fgMatch = summary.match(/foreground colou?r:\s*(#[0-9a-fA-F]{3,8})/i);
+        const bgMatch = summary.match(/background colou?r:\s*(#[0-9a-fA-F]{3,8})/i);
+        const ratioMatch = summary.match(/contrast of\s*([\d.]+)/i);
+        if (data) { n.fg = data.fgColor; n.bg = data.bgColor; }
+        else { if (fgMatch) n.fg = fgMatch[1]; if (bgMatch) n.bg = bgMatch[1]; }
+        if (data && data.contrastRatio) n.contrast = data.contrastRatio;
+        else if (ratioMatch) n.contrast = parseFloat(ratioMatch[1]);
       });
     }
   });
 
+  // Only violations are used; passes/inapplicable/incomplete are most of axe's output
+  const { passes, inapplicable, incomplete, ...kept } = results;
   fs.mkdirSync(require('path').dirname(outPath), { recursive: true });
-  fs.writeFileSync(outPath, JSON.stringify({ url, ...results }, null, 2));
+  fs.writeFileSync(outPath, JSON.stringify({ url, ...kept }));
   console.log(`Accessibility report saved: ${outPath}`);
 
   await browser.close();
 })();
 """
 
+# === Node audit worker (JSON lines over stdin/stdout, one warm browser) ===
+# Request:  {"id": 1, "url": "http://...", "include": [<axe target>, ...] (optional: scope the audit),
+#            "storage": {"token": "..."} (optional: localStorage seeded before the page loads)}
+# Response: {"id": 1, "ok": true, "result": {...axe results...}} or {"id": 1, "ok": false, "error": "..."}
+ACCESSIBILITY_WORKER_JS = r"""
+const { chromium } = require('playwright');
+const AxeBuilder = require('@axe-core/playwright').default;
+const readline = require('readline');
+
+function send(msg) {
+  process.stdout.write(JSON.stringify(msg) + '\n');
+}
+
+// Verification audits pass the selectors that failed before (axe `target`s). Selectors that no
+// longer match are reported back instead of being handed to axe, which rejects an empty context.
+async function scopedBuilder(page, include) {
+  let builder = new AxeBuilder({ page });
+  const missing = [];
+  if (!include) return { builder, missing, empty: false };
+  let present = 0;
+  for (const target of include) {
+    const last = Array.isArray(target) ? target[target.length - 1] : target;
+    if (Array.isArray(target) && target.length > 1 || typeof last !== 'string' || await page.$(last)) {
+      builder = builder.include(Array.isArray(target) && target.length === 1 ? target[0] : target);
+      present++;
+    } else {
+      missing.push(target);
+    }
+  }
+  return { builder, missing, empty: present === 0 };
+}
+
+// Same as accessibility-check.cjs. Runs in the page before the app: e.g. the stub session token, so private routes do not
+// redirect to /login in a fresh context
+function seedLocalStorage(items) {
+  for (const [key, value] of Object.entries(items)) localStorage.setItem(key, value);
+}
+
+// Enrich color-contrast nodes with color info (same as accessibility-check.cjs)
+function enrichColorContrast(results) {
+  results.violations.forEach(v => {
+    if (v.id === 'color-contrast') {
+      v.nodes.forEach(n => {
+        // axe reports the colors in the check data; the summary wording is the fallback
+        const data = [...(n.any || []), ...(n.all || []), ...(n.none || [])]
+          .map(c => c.data).find(d => d && d.fgColor && d.bgColor);
+        const summary = n.failureSummary || '';
+        const fgMatch = summary.match(/foreground colou?r:\s*(#[0-9a-fA-F]{3,8})/i);
+        const bgMatch = summary.match(/background colou?r:\s*(#[0-9a-fA-F]{3,8})/i);
+        const ratioMatch = summary.match(/contrast of\s*([\d.]+)/i);
+        if (data) { n.fg = data.fgColor; n.bg = data.bgColor; }
+        else { if (fgMatch) n.fg = fgMatch[1]; if (bgMatch) n.bg = bgMatch[1]; }
+        if (data && data.contrastRatio) n.contrast = data.contrastRatio;
+        else if (ratioMatch) n.contrast = parseFloat(ratioMatch[1]);
+      });
+    }
+  });
+}
+
+(async () => {
+  const browser = await chromium.launch();
+  const pending = new Set();
+
+  async function audit(req) {
+    // Fresh context per URL so cookies/storage never leak between pages
+    const context = await browser.newContext();
+    try {
+      if (req.storage) await context.addInitScript(seedLocalStorage, req.storage);
+      const page = await context.newPage();
+      await page.goto(req.url, { waitUntil: 'domcontentloaded' });
+      await page.waitForLoadState('domcontentloaded');
+      const { builder, missing, empty } = await scopedBuilder(page, req.include);
+      const results = empty ? { violations: [] } : await builder.analyze();
+      if (req.include) results.missing = missing;
+      enrichColorContrast(results);
+      // Only violations are used; passes/inapplicable/incomplete are most of axe's output
+      const { passes, inapplicable, incomplete, ...kept } = results;
+      send({ id: req.id, ok: true, result: { url: req.url, ...kept } });
+    } catch (err) {
+      send({ id: req.id, ok: false, error: String((err && err.stack) || err) });
+    } finally {
+      await context.close().catch(() => {});
+    }
+  }
+
+  const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+  rl.on('line', line => {
+    if (!line.trim()) return;
+    let req;
+    try {
+      req = JSON.parse(line);
+    } catch (err) {
+      send({ id: null, ok: false, error: `Bad request: ${line}` });
+      return;
+    }
+    const task = audit(req);
+    pending.add(task);
+    task.finally(() => pending.delete(task));
+  });
+  rl.on('close', async () => {
+    await Promise.allSettled([...pending]);
+    await browser.close();
+  });
+
+  send({ id: null, ready: true });
+})().catch(err => {
+  console.error(err);
+  process.exit(1);
+});
+"""
+
 # ---------- Helpers ----------
+def write_script_if_changed(path: Path, source: str) -> bool:
+    """Write an embedded Node script unless the file on disk already has the same content hash."""
+    data = source.strip().encode("utf-8")
+    try:
+        if hashlib.sha256(path.read_bytes()).digest() == hashlib.sha256(data).digest():
+            return False
+    except OSError:
+        pass
+    path.write_bytes(data)
+    return True
+
 def write_check_script():
-    CHECK_SCRIPT_PATH.write_text(ACCESSIBILITY_CHECK_JS.strip(), encoding="utf-8")
+    write_script_if_changed(CHECK_SCRIPT_PATH, ACCESSIBILITY_CHECK_JS)
+
+def write_worker_script():
+    write_script_if_changed(WORKER_SCRIPT_PATH, ACCESSIBILITY_WORKER_JS)
+
+class AuditWorkerExited(RuntimeError):
+    """The worker process is gone (Chromium crash, node killed); later audits need a fallback."""
+
+class AuditWorker:
+    """
+    Long-lived `node accessibility-worker.cjs` process.
+    - Launches Chromium once and opens a new browser context per URL.
+    - Requests/responses are JSON lines matched by id, so audit() is thread-safe
+      and several URLs can be in flight at once.
+    """
 
-def run_playwright_audit(url: str, output_path: Path) -> dict | None:
+    def __init__(self, script_path: Path = WORKER_SCRIPT_PATH):
+        self.script_path = script_path
+        self.proc = None
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._next_id = 0
+        self._ready = threading.Event()
+        self._exited = False
+        self._reader = None
+
+    def start(self, timeout: float = 60):
+        write_worker_script()
+        self.proc = subprocess.Popen(
+            ["node", str(self.script_path)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+        )
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+        if not self._ready.wait(timeout) or self._exited:
+            self.close()
+            raise RuntimeError("Audit worker did not become ready")
+        return self
+
+    def _read_loop(self):
+        for line in self.proc.stdout:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+            if msg.get("ready"):
+                self._ready.set()
+                continue
+            with self._lock:
+                future = self._pending.pop(msg.get("id"), None)
+            if future:
+                future.set_result(msg)
+        # Worker exited: fail anything still waiting and unblock start()
+        with self._lock:
+            self._exited = True
+            pending, self._pending = list(self._pending.values()), {}
+        self._ready.set()
+        for future in pending:
+            future.set_exception(AuditWorkerExited("Audit worker exited"))
+
+    @property
+    def alive(self) -> bool:
+        return self.proc is not None and not self._exited
+
+    def audit(self, url: str, timeout: float = 180, include: list | None = None,
+              storage: dict | None = None) -> dict | None:
+        future = Future()
+        request = {"url": url}
+        if include is not None:
+            request["include"] = include
+        if storage:
+            request["storage"] = storage
+        with self._lock:
+            if self.proc is None or self._exited:
+                raise AuditWorkerExited("Audit worker is not running")
+            self._next_id += 1
+            req_id = self._next_id
+            self._pending[req_id] = future
+            try:
+                self.proc.stdin.write(json.dumps({"id": req_id, **request}) + "\n")
+                self.proc.stdin.flush()
+            except OSError as e:
+                self._pending.pop(req_id, None)
+                raise AuditWorkerExited(f"Audit worker is not running: {e}") from None
+        try:
+            msg = future.result(timeout=timeout)
+        except TimeoutError:
+            # A late answer for this id is then dropped by _read_loop
+            with self._lock:
+                self._pending.pop(req_id, None)
+            raise
+        if not msg.get("ok"):
+            print(f"Audit worker failed for {url}:")
+            print(msg.get("error"))
+            return None
+        return msg.get("result")
+
+    def close(self, timeout: float = 30):
+        if self.proc is None:
+            return
+        try:
+            if self.proc.stdin and not self.proc.stdin.closed:
+                self.proc.stdin.close()
+            self.proc.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            self.proc.wait()
+        self.proc = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Shared worker for the whole run (None -> fall back to one node process per page)
+AUDIT_WORKER = None
+
+def start_audit_worker() -> AuditWorker | None:
+    global AUDIT_WORKER
+    try:
+        AUDIT_WORKER = AuditWorker().start()
+        print("🌐 Audit worker ready (shared Chromium).")
+    except Exception as e:
+        print(f"⚠ Could not start audit worker, using one node process per page: {e}")
+        AUDIT_WORKER = None
+    return AUDIT_WORKER
+
+_WORKER_LOST_LOCK = threading.Lock()
+
+def audit_worker_lost(worker: AuditWorker):
+    """Stop using a worker that exited mid-run; the remaining audits use one node process per page."""
+    global AUDIT_WORKER
+    with _WORKER_LOST_LOCK:
+        if AUDIT_WORKER is not worker:
+            return
+        AUDIT_WORKER = None
+        print("⚠ Audit worker exited; using one node process per page for the rest of the run.")
+        write_check_script()
+        worker.close(timeout=5)
+
+def stop_audit_worker():
+    global AUDIT_WORKER
+    if AUDIT_WORKER is not None:
+        AUDIT_WORKER.close()
+        AUDIT_WORKER = None
+
+# Built app + stub backend, started by the first audit that is not served from the cache
+APP_SERVERS = None
+_APP_SERVERS_LOCK = threading.Lock()
+_APP_SERVERS_ERROR = None
+
+def ensure_app_servers() -> bool:
+    """Build and serve the app at BASE_URL once per run (no-op with --dev-server). False if that failed."""
+    global APP_SERVERS, _APP_SERVERS_ERROR
+    if DEV_SERVER:
+        return True
+    with _APP_SERVERS_LOCK:
+        if APP_SERVERS is None and _APP_SERVERS_ERROR is None:
+            try:
+                # Imported on first use: http.server/urllib are not needed for cached or --dev-server runs
+                from a11y_server import AppServers
+                with PROFILE.span("serve", ""):
+                    APP_SERVERS = AppServers(BASE_URL).start()
+            except Exception as e:
+                _APP_SERVERS_ERROR = e
+                print(f"❌ Could not build and serve the app: {e}")
+        return APP_SERVERS is not None
+
+def audit_local_storage() -> dict:
+    """localStorage seeded into every audited page: the stub's session token, none with --dev-server."""
+    return APP_SERVERS.local_storage if APP_SERVERS is not None else {}
+
+def stop_app_servers():
+    global APP_SERVERS
+    if APP_SERVERS is not None:
+        APP_SERVERS.stop()
+        APP_SERVERS = None
+
+def run_playwright_audit(url: str, output_path: Path, include: list | None = None) -> dict | None:
+    """Audit `url`; `include` (axe targets) limits axe to those elements and their subtrees."""
+    worker = AUDIT_WORKER
+    if worker is not None:
+        if worker.alive:
+            try:
+                return run_worker_audit(worker, url, output_path, include)
+            except AuditWorkerExited as e:
+                print(f"Error auditing {url} with worker: {e}")
+        audit_worker_lost(worker)
+    return run_subprocess_audit(url, output_path, include)
+
+def run_worker_audit(worker: AuditWorker, url: str, output_path: Path, include: list | None = None) -> dict | None:
+    try:
+        print(f"▶ Running Axe + Playwright audit for {url} (worker{', scoped' if include else ''})")
+        report = worker.audit(url, include=include, storage=audit_local_storage())
+        if report is None:
+            return None
+        report = slim_report(report)
+        PROFILE.note(bytes_written=save_page_report(output_path, report))
+        print(f"Accessibility report saved: {output_path}")
+        return report
+    except AuditWorkerExited:
+        raise
+    except Exception as e:
+        print(f"Error auditing {url} with worker: {e}")
+        return None
+
+def run_subprocess_audit(url: str, output_path: Path, include: list | None = None) -> dict | None:
     try:
-        print(f"▶ Running Axe + Playwright audit for {url}")
+        print(f"▶ Running Axe + Playwright audit for {url}{' (scoped)' if include else ''}")
+        # node writes plain JSON; it is re-encoded in the configured report format
+        raw_path = output_path.with_name(output_path.name + ".node.json")
+        scope = ["--include", json.dumps(include)] if include is not None else []
+        storage = audit_local_storage()
+        seed = ["--storage", json.dumps(storage)] if storage else []
         subprocess.run(
-            ["node", str(CHECK_SCRIPT_PATH), "--url", url, "--out", str(output_path)],
+            ["node", str(CHECK_SCRIPT_PATH), "--url", url, "--out", str(raw_path), *scope, *seed],
             check=True
         )
-        if output_path.exists():
-            with output_path.open("r", encoding="utf-8") as f:
-                return json.load(f)
-        print(f"⚠ No report found at {output_path}")
+        if raw_path.exists():
+            with raw_path.open("r", encoding="utf-8") as f:
+                report = slim_report(json.load(f))
+            raw_path.unlink()
+            PROFILE.note(bytes_written=save_page_report(output_path, report))
+            return report
+        print(f"⚠ No report found at {raw_path}")
         return None
     except subprocess.CalledProcessError as e:
-        print("Error running accessibility-check.js:")
+        print(f"Error running {CHECK_SCRIPT_PATH}:")
         print(getattr(e, "stderr", e))
         return None
 
@@ -110,13 +592,9 @@ def clean_updated_jsx(raw_jsx: str) -> str:
     text = re.sub(r'\s*```$', '', text)
 
     # Drop obvious narrator / preface lines
-    throwaway_prefix = re.compile(
-        r'^\s*(here\'?s|here is|updated jsx|updated code|the key changes|summary of changes|assistant:)\b',
-        re.IGNORECASE
-    )
     cleaned_lines = []
     for line in text.splitlines():
-        if throwaway_prefix.match(line.strip()):
+        if NARRATION_RE.match(line.strip()):
             continue
         # Skip bullet commentary
         if re.match(r'^\s*[-*]\s', line):
@@ -129,12 +607,7 @@ def clean_updated_jsx(raw_jsx: str) -> str:
     text = re.sub(r'(?is)</?(html|head|body)[^>]*>', '', text)
 
     # Remove placeholder / omission comments the model might add
-    text = re.sub(
-        r'\{\s*/\*\s*(other content|unchanged|placeholder|omitted|rows omitted|table content)\s*\*/\s*\}',
-        '',
-        text,
-        flags=re.IGNORECASE
-    )
+    text = PLACEHOLDER_RE.sub('', text)
 
     # Normalize redundant alt values (remove the word image/photo/picture if present)
     text = re.sub(r'alt\s*=\s*"([^"]*?)\b(?:image|photo|picture)\b([^"]*?)"', r'alt="\1\2"', text, flags=re.IGNORECASE)
@@ -155,193 +628,651 @@ def clean_updated_jsx(raw_jsx: str) -> str:
     # Final trim
     return text.strip()
 
-def add_aria_labels_to_buttons(jsx: str) -> str:
-    def replace(m):
-        attrs, inner = m.group(1), m.group(2).strip()
-        if 'aria-label=' in attrs or not inner:
-            return m.group(0)
-        if attrs.strip().endswith('/'):
-            attrs = attrs.strip()[:-1]
-        return f'<Button{attrs} aria-label="{inner}">{inner}</Button>'
-    return re.sub(r"<Button([^>]*)>(.*?)</Button>", replace, jsx, flags=re.DOTALL)
-
-def add_aria_labels_to_icons(jsx: str) -> str:
-    def replace(m):
-        tag, attrs = m.group(1), m.group(2).strip()
-        if 'aria-label=' not in attrs:
-            label = "Edit icon" if tag.lower().startswith("edit") else "Trash icon"
-            return f'<{tag} {attrs} aria-label="{label}" />'
-        return m.group(0)
-    return re.sub(r"<(Edit|Trash)([^>]*)/>", replace, jsx, flags=re.IGNORECASE)
-
-def add_aria_labels_to_typography(jsx: str) -> str:
+# ---------- JSX post-processing (one parse, visitors in a single traversal) ----------
+FOCUSABLE_TAGS = {"span", "typography", "p", "table", "tablecell", "tablehead"}
+
+def jsx_text(inner: str) -> str:
+    """Visible text of a JSX fragment: tags and {expressions} removed, whitespace collapsed."""
+    text = re.sub(r'<[^>]+>', '', inner)
+    text = re.sub(r'\{[^}]*\}', '', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+def quote_attr(value: str) -> str:
+    return '"' + value.replace('"', '&quot;') + '"'
+
+@visits("Button")
+def visit_button_label(element: Element, src: str):
+    """<Button>Save</Button> -> aria-label="Save"; a lone {expr} child becomes aria-label={expr}."""
+    tag = element.open
+    if element.name != "Button" or tag.self_closing or tag.has_attr("aria-label"):
+        return []
+    inner = element.inner(src).strip()
+    if not inner:
+        return []
+    if re.fullmatch(r"\{[^{}]+\}", inner):
+        return [attribute_insertion(src, tag, f"aria-label={inner}")]
+    text = jsx_text(inner)
+    if not text:
+        return []
+    return [attribute_insertion(src, tag, f"aria-label={quote_attr(text)}")]
+
+@visits(*FOCUSABLE_TAGS)
+def visit_tabindex(element: Element, src: str):
+    tag = element.open
+    if element.name.lower() not in FOCUSABLE_TAGS or tag.has_attr("tabindex"):
+        return []
+    # Self-closing tags only get tabIndex when they are table cells (as before)
+    if tag.self_closing and element.name.lower() != "tablecell":
+        return []
+    return [attribute_insertion(src, tag, 'tabIndex="0"')]
+
+@visits("edit*", "trash*")
+def visit_icon_label(element: Element, src: str):
+    tag = element.open
+    name = element.name.lower()
+    if not tag.self_closing or not name.startswith(("edit", "trash")) or tag.has_attr("aria-label"):
+        return []
+    label = "Edit icon" if name.startswith("edit") else "Trash icon"
+    return [attribute_insertion(src, tag, f'aria-label="{label}"')]
+
+@visits("Typography")
+def visit_typography_label(element: Element, src: str):
     """
     Add aria-label to Typography elements that don't already have one.
     Automatically quotes and escapes the value for JSX.
     """
-    def replace(match):
-        attrs = match.group(1)
-        inner = match.group(2).strip()
-        # Skip if already has aria-label or if no content
-        if 'aria-label=' in attrs or not inner:
-            return match.group(0)
-        # Clean up the inner text for aria-label (remove HTML tags, React expressions)
-        clean_text = re.sub(r'<[^>]+>', '', inner)  # Remove HTML tags
-        clean_text = re.sub(r'\{[^}]*\}', '', clean_text)  # Remove React expressions
-        clean_text = re.sub(r'\s+', ' ', clean_text).strip()  # Normalize whitespace
-        clean_text = clean_text.replace('"', '&quot;')  # Escape quotes
-        # For React intl.formatMessage, extract message ID if present
-        if '{intl.formatMessage' in inner:
-            id_match = re.search(r"id:\s*['\"]([^'\"]+)['\"]", inner)
-            if id_match:
-                message_id = id_match.group(1).replace('-', ' ').replace('_', ' ')
-                clean_text = message_id.title()
-        # Limit length
-        if len(clean_text) > 100:
-            clean_text = clean_text[:97] + '...'
-        # Only add aria-label if meaningful
-        if clean_text and len(clean_text) > 2:
-            if attrs.strip():
-                return f'<Typography{attrs} aria-label={inner}>{inner}</Typography>'
-            else:
-                return f'<Typography aria-label={inner}>{inner}</Typography>'
-        return match.group(0)
-    return re.sub(r"<Typography([^>]*)>(.*?)</Typography>", replace, jsx, flags=re.DOTALL) 
-
-def add_tabindex_to_focusable(jsx: str) -> str:
-    pattern = r"<(span|Typography|p|Table|TableCell|TableHead)([^>]*)>(.*?)</\1>|<(TableCell)([^>]*)/>"
-    def patch(m):
-        tag = m.group(1) or m.group(4)
-        attrs = m.group(2) or m.group(5) or ""
-        content = m.group(3) or ""
-        if 'tabindex=' not in attrs.lower():
-            if tag in ["TableCell"]:
-                return f'<{tag}{attrs} tabIndex="0" />'
-            return f'<{tag}{attrs} tabIndex="0">{content}</{tag}>'
-        return m.group(0)
-    return re.sub(pattern, patch, jsx, flags=re.IGNORECASE | re.DOTALL)
-
-def restore_table_from_backup(updated_jsx):
-    try:
-        backup = BACKUP_PATH.read_text(encoding='utf-8')
-        match = re.search(r"<Table.*?</Table>", backup, flags=re.DOTALL)
-        if not match:
-            print("Could not extract <Table> from backup.")
-            return updated_jsx
-        print("🛠️ Restoring <Table> from backup.")
-        return re.sub(r"<Table.*?</Table>", match.group(0), updated_jsx, flags=re.DOTALL)
-    except Exception:
-        print("Error restoring <Table> from backup.")
-        print(traceback.format_exc())
-        return updated_jsx
+    tag = element.open
+    if element.name != "Typography" or tag.self_closing or tag.has_attr("aria-label"):
+        return []
+    inner = element.inner(src).strip()
+    if not inner:
+        return []
+    clean_text = jsx_text(inner)
+    # For React intl.formatMessage, extract message ID if present
+    if '{intl.formatMessage' in inner:
+        id_match = re.search(r"id:\s*['\"]([^'\"]+)['\"]", inner)
+        if id_match:
+            clean_text = id_match.group(1).replace('-', ' ').replace('_', ' ').title()
+    # Limit length
+    if len(clean_text) > 100:
+        clean_text = clean_text[:97] + '...'
+    # Only add aria-label if meaningful
+    if len(clean_text) <= 2:
+        return []
+    return [attribute_insertion(src, tag, f"aria-label={quote_attr(clean_text)}")]
+
+# Same order as the old regex chain: buttons, tabIndex, icons, typography
+POSTPROCESS_VISITORS = [visit_button_label, visit_tabindex, visit_icon_label, visit_typography_label]
+
+def postprocess_jsx(jsx: str) -> str:
+    return run_visitors(jsx, POSTPROCESS_VISITORS)
+
+# ---------- Bedrock ----------
+# Cross-region inference profile of a model with prompt caching (Claude 3.5 Sonnet v1 rejects cache_control)
+BEDROCK_MODEL_ID = os.getenv("BEDROCK_MODEL_ID", "us.anthropic.claude-3-7-sonnet-20250219-v1:0")
+# Model families Bedrock caches prompts for; any other id is sent without cache_control
+PROMPT_CACHE_MODELS = ("claude-3-7-sonnet", "claude-sonnet-4", "claude-opus-4")
+PROMPT_CACHE_MIN_TOKENS = 1024  # Bedrock ignores cache points on shorter prefixes
+BATCH_TOKEN_BUDGET = int(os.getenv("A11Y_BATCH_TOKEN_BUDGET", "12000"))  # estimated input tokens per batched call
+BATCH_LINGER_SECONDS = float(os.getenv("A11Y_BATCH_LINGER", "0.5"))  # wait for other pages before sending
+LLM_USAGE_PATH = BACKUP_ROOT / "llm-usage.json"
+LLM_ATTEMPTS = int(os.getenv("A11Y_LLM_ATTEMPTS", "3"))  # first answer + retries after a rejected stream
+BEDROCK_STREAMING = True  # --no-stream: wait for the whole answer, then validate it
+
+SUGGESTION_INSTRUCTIONS = (
+    "You are an expert React accessibility engineer. Below is a JSON array of JSX elements from React "
+    "source files that fail accessibility checks. Each element has:\n"
+    "- `id`: identifier to echo back.\n"
+    "- `source`: the element's JSX opening tag exactly as written in the source file.\n"
+    "- `issues`: the axe violations on it (`rule`, `help`, the rendered `htmlSnippet`, `failureSummary`).\n"
+    "For each element, fix the opening tag by adding accessibility attributes like `aria-label`, `role`, "
+    "`alt`, `tabIndex`, `scope`, etc.\n"
+    "- For color-contrast violations:\n"
+    "  - Use the `fg` (foreground), `bg` (background), and `contrast` values from the input.\n"
+    "  - If contrast < 4.5:1, suggest a new foreground or background color to meet WCAG 2.1 AA (≥ 4.5:1).\n"
+    "  - Only update the `style={{ color: ..., backgroundColor: ... }}` part of the JSX tag or its `className` if applicable.\n"
+    "  - Do NOT remove any styles, props, or attributes.\n"
+    "\n"
+    "\n"
+    "Rule guidance (axe rule id -> what a correct opening tag looks like):\n"
+    "- `image-alt`: add `alt` describing what the image shows or does, from its `src`, surrounding class names "
+    "or `title` (`<img src={logo} />` -> `<img src={logo} alt=\"BiteBuddy logo\" />`). Purely decorative images get "
+    "`alt=\"\"`. Never start the text with \"image of\" or \"picture of\".\n"
+    "- `button-name`: icon-only buttons get an `aria-label` naming the action, not the icon "
+    "(`<IconButton onClick={removeItem}>` -> `<IconButton onClick={removeItem} aria-label=\"Remove item\">`).\n"
+    "- `link-name`: links without text get an `aria-label` naming the destination "
+    "(`<Link to=\"/cart\">` -> `<Link to=\"/cart\" aria-label=\"Cart\">`).\n"
+    "- `label` / `select-name`: form controls get an `aria-label`, preferring the visible placeholder or the "
+    "field's `name`; do not invent an `id` to pair with a label you cannot see.\n"
+    "- `aria-*` rules (`aria-valid-attr-value`, `aria-required-attr`, `aria-allowed-attr`): correct or remove only "
+    "the offending `aria-*` prop; keep every other prop.\n"
+    "- `scope-attr-valid`: header cells get `scope=\"col\"` in a table head and `scope=\"row\"` in a body row.\n"
+    "- `th-has-data-cells` and `td-headers-attr`: the fix usually lies in other elements; skip unless the tag itself "
+    "carries a wrong `headers` or `scope`.\n"
+    "- `nested-interactive`, `scrollable-region-focusable`: add `tabIndex={0}` (and a `role` when the element is "
+    "a plain `div`) only when that makes the element itself operable; otherwise skip it.\n"
+    "- `color-contrast`: change the smallest thing that reaches the ratio. Prefer darkening (on light "
+    "backgrounds) or lightening (on dark backgrounds) the existing foreground colour literal; keep the hue. "
+    "Colours set through `className` or theme values cannot be fixed from the tag: skip them unless a `style` "
+    "prop is already present.\n"
+    "\n"
+    "Examples (input element -> answer item):\n"
+    '- {"id": "n1", "source": "<img src=\\"/hero.png\\" className=\\"hero\\" />", "issues": [{"rule": "image-alt"}]}\n'
+    '  -> {"id": "n1", "replacement": "<img src=\\"/hero.png\\" className=\\"hero\\" alt=\\"Hero\\" />"}\n'
+    '- {"id": "n2", "source": "<Button variant=\\"text\\" onClick={() => setOpen(true)}>", '
+    '"issues": [{"rule": "button-name"}]}\n'
+    '  -> {"id": "n2", "replacement": "<Button variant=\\"text\\" onClick={() => setOpen(true)} '
+    'aria-label=\\"Open menu\\">"}\n'
+    '- {"id": "n3", "source": "<p style={{ color: \\"#999\\", fontSize: 12 }}>", "issues": [{"rule": '
+    '"color-contrast", "fg": "#999999", "bg": "#ffffff", "contrast": 2.84}]}\n'
+    '  -> {"id": "n3", "replacement": "<p style={{ color: \\"#767676\\", fontSize: 12 }}>"}\n'
+    '- {"id": "n4", "source": "<span className=\\"muted\\">", "issues": [{"rule": "color-contrast"}]}\n'
+    "  -> no item (the colour comes from a class).\n"
+    '- {"id": "n6", "source": "<div className=\\"banner\\" style={{ background: \\"#1a1a1a\\", color: \\"#5c5c5c\\" }}>", '
+    '"issues": [{"rule": "color-contrast", "fg": "#5c5c5c", "bg": "#1a1a1a", "contrast": 2.6}]}\n'
+    '  -> {"id": "n6", "replacement": "<div className=\\"banner\\" style={{ background: \\"#1a1a1a\\", '
+    'color: \\"#828282\\" }}>"}\n'
+    '- {"id": "n7", "source": "<NavLink to=\\"/orders\\" className={linkClass}>", "issues": [{"rule": "link-name"}]}\n'
+    '  -> {"id": "n7", "replacement": "<NavLink to=\\"/orders\\" className={linkClass} aria-label=\\"My orders\\">"}\n'
+    '- {"id": "n8", "source": "<Select value={slot} onChange={pickSlot} name=\\"deliverySlot\\">", '
+    '"issues": [{"rule": "select-name"}]}\n'
+    '  -> {"id": "n8", "replacement": "<Select value={slot} onChange={pickSlot} name=\\"deliverySlot\\" '
+    'aria-label=\\"Delivery slot\\">"}\n'
+    '- {"id": "n5", "source": "<input type=\\"search\\" placeholder=\\"Search dishes\\" value={query} />", '
+    '"issues": [{"rule": "label"}]}\n'
+    '  -> {"id": "n5", "replacement": "<input type=\\"search\\" placeholder=\\"Search dishes\\" value={query} '
+    'aria-label=\\"Search dishes\\" />"}\n'
+    "\n"
+    "Strict rules:\n"
+    "- ONLY modify the opening tag given in `source`; keep its element name, props and expressions.\n"
+    "- Keep the tag's own formatting: quotes, prop order, line breaks and whether it is self-closing.\n"
+    "- Never output the element's children, its closing tag, or any other element.\n"
+    "- DO NOT write comments like `// logic unchanged` or `// styles unchanged`.\n"
+    "- Use plain English labels of one to four words; never placeholders such as `TODO` or `...`.\n"
+    "- Skip elements you cannot fix from the opening tag alone.\n"
+    "- Answer with ONLY a JSON array, no prose and no code fences: "
+    '[{"id": "<id>", "replacement": "<complete fixed JSX opening tag>"}]'
+)
+
+# Part of the fix store version: editing the instructions invalidates every stored fix
+PROMPT_VERSION = hashlib.sha256(SUGGESTION_INSTRUCTIONS.encode("utf-8")).hexdigest()[:12]
+
+RETRY_NOTE = (
+    "Your previous answer was rejected: {reason}.\n"
+    "Reply with the JSON array ONLY: start with `[`, no text before or after it, no comments, "
+    "and make every `replacement` exactly one opening tag of the same element as its `source`.\n\n"
+)
+
+_BEDROCK_CLIENT = None
+_BEDROCK_LOCK = threading.Lock()
+_PROMPT_CACHE_SUPPORTED = any(family in BEDROCK_MODEL_ID for family in PROMPT_CACHE_MODELS)
+
+def get_bedrock_client():
+    """One pooled bedrock-runtime client for the whole run (boto3 clients are thread-safe)."""
+    global _BEDROCK_CLIENT
+    with _BEDROCK_LOCK:
+        if _BEDROCK_CLIENT is None:
+            # Imported on first use: the AWS SDK takes longer to import than an audit-only run needs
+            import boto3
+            from botocore.config import Config
+            config = Config(
+                connect_timeout=60,
+                read_timeout=600,
+                max_pool_connections=max(10, STAGE_LIMITS.sizes["llm"] * 2),
+                retries={
+                    'max_attempts': 3,
+                    'mode': 'adaptive'
+                }
+            )
+            _BEDROCK_CLIENT = boto3.client("bedrock-runtime", region_name=os.getenv("AWS_REGION"), config=config)
+        return _BEDROCK_CLIENT
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def claude_request(system: str, user_content: str, max_tokens: int, temperature: float) -> dict:
+    """
+    Request body for one Bedrock call. The static instructions go in the system prompt marked
+    with cache_control so repeated calls can reuse them, when the model caches prompts and the
+    instructions are long enough to be cached at all.
+    """
+    system_block = {"type": "text", "text": system}
+    if _PROMPT_CACHE_SUPPORTED and estimate_tokens(system) >= PROMPT_CACHE_MIN_TOKENS:
+        system_block["cache_control"] = {"type": "ephemeral"}
+    return {
+        "anthropic_version": "bedrock-2023-05-31",
+        "system": [system_block],
+        "messages": [{ "role": "user", "content": user_content }],
+        "max_tokens": max_tokens,
+        "temperature": temperature,
+        "stop_sequences": ["\n\nHuman:"]
+    }
 
-def generate_fix_suggestions(violations):
+def call_bedrock(method: str, request: dict):
+    """Call a bedrock-runtime method, dropping the prompt-cache marker if the model rejects it."""
+    global _PROMPT_CACHE_SUPPORTED
+    call = getattr(get_bedrock_client(), method)
     try:
-        prompt = (
-            "\n\nHuman: You are an expert React accessibility engineer. Below is a JSON array of accessibility violations "
-            "detected in a JSX webpage. For each violation:\n"
-            "- Identify the JSX element in the `htmlSnippet` field.\n"
-            "- Fix the element by adding accessibility attributes like `aria-label`, `role`, `tabIndex`, etc.\n"
-            "- For color-contrast violations:\n"
-            "  - Use the `fg` (foreground), `bg` (background), and `contrast` values from the input.\n"
-            "  - If contrast < 4.5:1, suggest a new foreground or background color to meet WCAG 2.1 AA (≥ 4.5:1).\n"
-            "  - Only update the `style={{ color: ..., backgroundColor: ... }}` part of the JSX tag or its `className` if applicable.\n"
-            "  - Do NOT remove any styles, props, or attributes.\n"
-            "\n"
-            "Strict rules:\n"
-            "- ONLY modify the JSX element shown in the `htmlSnippet`.\n"
-            "- DO NOT remove or replace any unrelated code.\n"
-            "- DO NOT write comments like `// logic unchanged` or `// styles unchanged`.\n"
-            "- DO NOT remove or rewrite styles, logic, imports, or component structure.\n"
-            "- DO NOT reformat or restructure surrounding JSX.\n"
-            "- Return ONLY valid JSX elements — one per violation.\n"
-            "\n"
-            "Violations:\n" + json.dumps(violations, indent=2) +
-            "\n\nAssistant:"
+        return call(
+            modelId=BEDROCK_MODEL_ID,
+            accept="application/json",
+            contentType="application/json",
+            body=json.dumps(request, separators=(",", ":")),
         )
-
-        bedrock = boto3.client("bedrock-runtime", region_name=os.getenv("AWS_REGION"))
-        response = bedrock.invoke_model(
-            modelId="anthropic.claude-3-5-sonnet-20240620-v1:0",
+    except Exception as e:
+        system_block = request["system"][0]
+        if "cache_control" not in system_block or "ValidationException" not in str(e):
+            raise
+        # Model without prompt caching support: drop the marker for the rest of the run
+        print(f"⚠ Prompt caching rejected by {BEDROCK_MODEL_ID}; continuing without it.")
+        _PROMPT_CACHE_SUPPORTED = False
+        system_block.pop("cache_control")
+        return call(
+            modelId=BEDROCK_MODEL_ID,
             accept="application/json",
             contentType="application/json",
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "messages": [{ "role": "user", "content": prompt }],
-                "max_tokens": 3000,
-                "temperature": 0.4,
-                "stop_sequences": ["\n\nHuman:"]
-            }),
+            body=json.dumps(request, separators=(",", ":")),
         )
 
+def invoke_claude(system: str, user_content: str, max_tokens: int, temperature: float) -> tuple[str, dict, float]:
+    """Single blocking Bedrock round trip. Returns (text, usage, latency seconds)."""
+    request = claude_request(system, user_content, max_tokens, temperature)
+    started = time.perf_counter()
+    with STAGE_LIMITS.llm:
+        response = call_bedrock("invoke_model", request)
         body = json.loads(response["body"].read())
-        completion = body.get("content", [{}])[0].get("text", "").strip()
-        cleaned = clean_updated_jsx(completion)
-        FIX_SUGGESTIONS_PATH.write_text(cleaned, encoding="utf-8")
-        print(f"💡 Fix suggestions saved: {FIX_SUGGESTIONS_PATH}")
-        return cleaned
+    latency = time.perf_counter() - started
+    text = body.get("content", [{}])[0].get("text", "").strip()
+    return text, body.get("usage", {}), latency
+
+def stream_claude(system: str, user_content: str, max_tokens: int, temperature: float,
+                  validator: FixStreamValidator) -> dict:
+    """
+    Streamed Bedrock call feeding `validator` as text arrives. The stream is closed as soon
+    as the validator rejects the answer or the answer is complete, so neither a bad answer
+    nor trailing chatter is paid for in full.
+    Returns {"usage", "latency", "first_fix" (seconds to the first accepted fix), "rejected" (reason)}.
+    """
+    request = claude_request(system, user_content, max_tokens, temperature)
+    started = time.perf_counter()
+    usage, streamed, first_fix, rejected = {}, [], None, None
+    with STAGE_LIMITS.llm:
+        body = call_bedrock("invoke_model_with_response_stream", request)["body"]
+        try:
+            for event in iter_stream_events(body):
+                kind = event.get("type")
+                if kind == "message_start":
+                    usage.update(event.get("message", {}).get("usage", {}))
+                elif kind == "message_delta":
+                    usage.update(event.get("usage", {}))
+                elif kind == "content_block_delta":
+                    text = event.get("delta", {}).get("text", "")
+                    streamed.append(text)
+                    if validator.feed(text) and first_fix is None:
+                        first_fix = time.perf_counter() - started
+                    if validator.done:
+                        break
+            validator.finish()
+        except StreamRejected as e:
+            rejected = str(e)
+        finally:
+            body.close()
+    # A closed stream never sends its final usage event: count what arrived
+    usage["output_tokens"] = max(usage.get("output_tokens", 0), estimate_tokens("".join(streamed)))
+    return {"usage": usage, "latency": time.perf_counter() - started, "first_fix": first_fix, "rejected": rejected}
+
+def request_fixes(user_content: str, max_tokens: int, temperature: float, validator: FixStreamValidator) -> dict:
+    """One fix-suggestion attempt, streamed unless --no-stream; same result shape as stream_claude."""
+    if BEDROCK_STREAMING:
+        return stream_claude(SUGGESTION_INSTRUCTIONS, user_content, max_tokens, temperature, validator)
+    text, usage, latency = invoke_claude(SUGGESTION_INSTRUCTIONS, user_content, max_tokens, temperature)
+    rejected = None
+    try:
+        validator.feed(text)
+        validator.finish()
+    except StreamRejected as e:
+        rejected = str(e)
+    return {"usage": usage, "latency": latency, "first_fix": latency if validator.fixes else None, "rejected": rejected}
+
+class LlmStats:
+    """Per-page token and latency accounting for Bedrock calls, written to a11y_backups/llm-usage.json."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def record(self, page: str, kind: str, usage: dict, latency: float, baseline_input_tokens: int = 0, batch_size: int = 1,
+               first_fix: float | None = None, wasted_output_tokens: int = 0, attempts: int = 1):
+        with self._lock:
+            self.calls.append({
+                "page": page,
+                "kind": kind,
+                "batch_size": batch_size,
+                "input_tokens": usage.get("input_tokens", 0),
+                "output_tokens": usage.get("output_tokens", 0),
+                "cache_read_input_tokens": usage.get("cache_read_input_tokens", 0),
+                "cache_creation_input_tokens": usage.get("cache_creation_input_tokens", 0),
+                # Estimated input tokens the same request cost before batching/caching/compact JSON
+                "baseline_input_tokens_est": baseline_input_tokens,
+                "latency_s": round(latency, 3),
+                "time_to_first_fix_s": round(first_fix, 3) if first_fix is not None else None,
+                # Output of rejected answers that had to be regenerated
+                "wasted_output_tokens": wasted_output_tokens,
+                "attempts": attempts,
+            })
+
+    def latest(self, page: str) -> dict | None:
+        with self._lock:
+            return next((c for c in reversed(self.calls) if c["page"] == page), None)
+
+    def per_page(self) -> dict:
+        pages = {}
+        with self._lock:
+            for call in self.calls:
+                totals = pages.setdefault(call["page"], {
+                    "calls": 0, "input_tokens": 0, "output_tokens": 0, "cache_read_input_tokens": 0,
+                    "baseline_input_tokens_est": 0, "wasted_output_tokens": 0, "latency_s": 0.0,
+                })
+                totals["calls"] += 1
+                for key in ("input_tokens", "output_tokens", "cache_read_input_tokens", "baseline_input_tokens_est",
+                            "wasted_output_tokens"):
+                    totals[key] += call[key]
+                totals["latency_s"] = round(totals["latency_s"] + call["latency_s"], 3)
+        return pages
+
+    def report(self, path: Path = LLM_USAGE_PATH):
+        pages = self.per_page()
+        if not pages:
+            return
+        print("\n📊 Bedrock usage per page (input tokens now vs. estimated before batching):")
+        for page, t in sorted(pages.items()):
+            print(f"  {page:<40} in {t['input_tokens']:>7} (was ~{t['baseline_input_tokens_est']:>7})  "
+                  f"out {t['output_tokens']:>6} (wasted {t['wasted_output_tokens']:>5})  "
+                  f"cached {t['cache_read_input_tokens']:>6}  {t['latency_s']:>7.2f}s")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            path.write_text(json.dumps({"pages": pages, "calls": self.calls}, indent=2), encoding="utf-8")
+        print(f"📊 LLM usage saved to {path}")
+
+LLM_STATS = LlmStats()
+
+class SuggestionBatcher:
+    """
+    Groups fix-suggestion requests from several pages into one Bedrock call.
+    - A batch is sent once its estimated input reaches token_budget, or after
+      `linger` seconds so a lone page is never held back for long.
+    - Element ids are prefixed with a per-request key (`P<n>.`) so the single JSON
+      answer can be routed back to the page that asked.
+    - token_budget <= 0 sends every request on its own.
+    """
+
+    def __init__(self, token_budget: int = BATCH_TOKEN_BUDGET, linger: float = BATCH_LINGER_SECONDS):
+        self.token_budget = token_budget
+        self.linger = linger
+        self._lock = threading.Lock()
+        self._pending = []
+        self._pending_tokens = 0
+        self._timer = None
+        self._seq = 0
+
+    def submit(self, job: PageJob, elements: list, baseline_tokens: int = 0) -> Future:
+        """Queue a page's elements ({id, source, issues}); resolves to [{id, replacement}] with local ids."""
+        with self._lock:
+            self._seq += 1
+            key = f"P{self._seq}"
+        tagged = [{**el, "id": f"{key}.{el['id']}"} for el in elements]
+        tokens = estimate_tokens(json.dumps(tagged, separators=(",", ":")))
+        item = {"job": job, "key": key, "elements": tagged, "tokens": tokens,
+                "baseline": baseline_tokens, "future": Future()}
+        flush_now = None
+        with self._lock:
+            if self._pending and self._pending_tokens + tokens > self.token_budget:
+                flush_now = self._take()
+            self._pending.append(item)
+            self._pending_tokens += tokens
+            if self._pending_tokens >= self.token_budget:
+                flush_now = (flush_now or []) + self._take()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.linger, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self._send(flush_now)
+        return item["future"]
+
+    def _take(self) -> list:
+        items, self._pending, self._pending_tokens = self._pending, [], 0
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        return items
+
+    def flush(self):
+        with self._lock:
+            items = self._take()
+        if items:
+            self._send(items)
+
+    def _send(self, items: list):
+        # A budget overflow can hand over two batches at once; keep them separate
+        batches, current, tokens = [], [], 0
+        for item in items:
+            size = item["tokens"]
+            if current and tokens + size > self.token_budget:
+                batches.append(current)
+                current, tokens = [], 0
+            current.append(item)
+            tokens += size
+        batches.append(current)
+        for batch in batches:
+            self._run_batch(batch)
+
+    def _run_batch(self, batch: list):
+        # Pages rendering the same element with the same issues share one answer. The exact source is
+        # part of the group: a replacement is written for one spelling of the tag, so twins that differ
+        # only in whitespace are asked for separately.
+        twins = {}
+        for el in (el for item in batch for el in item["elements"]):
+            twins.setdefault((fix_key(el["issues"], el["source"]), el["source"]), []).append(el)
+        pending = [group[0] for group in twins.values()]
+        duplicates = sum(len(group) - 1 for group in twins.values())
+        print(f"✉️ Requesting fixes for {len(pending)} element(s) from {len(batch)} page(s) in one Bedrock call"
+              + (f" ({duplicates} duplicate(s) share an answer)..." if duplicates else "..."))
+        accepted, usage = {}, {}
+        elapsed, first_fix, wasted, attempts, reason = 0.0, None, 0, 0, None
+        while pending and attempts < max(1, LLM_ATTEMPTS):
+            attempts += 1
+            user_content = (RETRY_NOTE.format(reason=reason) if reason else "") + \
+                "Elements:\n" + json.dumps(pending, separators=(",", ":"))
+            validator = FixStreamValidator({el["id"]: el["source"] for el in pending})
+            try:
+                result = request_fixes(
+                    user_content,
+                    # Output is one opening tag per element, not whole files
+                    max_tokens=min(8000, 256 + 200 * len(pending)),
+                    temperature=0.4 if attempts == 1 else 0.0,
+                    validator=validator,
+                )
+            except Exception as e:
+                if not accepted:
+                    for item in batch:
+                        item["future"].set_exception(e)
+                    return
+                print(f"⚠ Bedrock retry failed ({e}); keeping the {len(accepted)} fix(es) already accepted.")
+                break
+            for key, value in result["usage"].items():
+                if isinstance(value, int):
+                    usage[key] = usage.get(key, 0) + value
+            if first_fix is None and result["first_fix"] is not None:
+                first_fix = elapsed + result["first_fix"]
+            elapsed += result["latency"]
+            accepted.update((fix["id"], fix["replacement"]) for fix in validator.fixes)
+            reason = result["rejected"]
+            if reason is None:
+                break  # elements the model skipped are left unfixed
+            kept = estimate_tokens(json.dumps(validator.fixes)) if validator.fixes else 0
+            wasted += max(0, result["usage"].get("output_tokens", 0) - kept)
+            pending = [el for el in pending if el["id"] not in accepted]
+            if pending:
+                print(f"↻ Bedrock answer rejected ({reason}); retrying {len(pending)} element(s) with a stricter prompt.")
+
+        for group in twins.values():
+            if group[0]["id"] in accepted:
+                accepted.update((el["id"], accepted[group[0]["id"]]) for el in group[1:])
+        routed = {item["key"]: [] for item in batch}
+        for fix_id, replacement in accepted.items():
+            key, _, local_id = fix_id.partition(".")
+            routed[key].append({"id": local_id, "replacement": replacement})
+
+        total_input = sum(item["tokens"] for item in batch) or 1
+        total_output = sum(len(r) for r in accepted.values()) or 1
+        for item in batch:
+            # Shared call: attribute tokens by each page's share of the payload / answer
+            fixes = routed[item["key"]]
+            in_share = item["tokens"] / total_input
+            out_share = sum(len(r["replacement"]) for r in fixes) / total_output
+            LLM_STATS.record(
+                item["job"].page, "suggest",
+                {
+                    "input_tokens": round(usage.get("input_tokens", 0) * in_share),
+                    "output_tokens": round(usage.get("output_tokens", 0) * out_share),
+                    "cache_read_input_tokens": round(usage.get("cache_read_input_tokens", 0) * in_share),
+                    "cache_creation_input_tokens": round(usage.get("cache_creation_input_tokens", 0) * in_share),
+                },
+                elapsed, baseline_input_tokens=item["baseline"], batch_size=len(batch),
+                first_fix=first_fix, wasted_output_tokens=round(wasted * in_share), attempts=attempts,
+            )
+            item["future"].set_result(fixes)
+
+SUGGESTION_BATCHER = SuggestionBatcher()
+
+def prepare_fix_targets(jsx: str, violations) -> tuple[list, dict]:
+    """
+    Map every violation node to the source span of its JSX opening tag.
+    Returns (elements for the prompt, {id: span info}). Issues on the same element are merged
+    so it gets exactly one replacement; nodes that cannot be located are dropped.
+    """
+    elements, spans, by_start = [], {}, {}
+    unmapped = 0
+    for v in violations:
+        for node in v.get("nodes", []):
+            tag = locate_node(jsx, node)
+            if tag is None:
+                unmapped += 1
+                continue
+            issue = {"rule": v.get("id"), "help": v.get("help"), "htmlSnippet": node.get("html", "")}
+            for key in ("failureSummary", "fg", "bg", "contrast"):
+                if node.get(key):
+                    issue[key] = node[key]
+            if v.get("id") == "color-contrast":
+                data = contrast_data(node)
+                for key in ("fg", "bg", "contrast"):
+                    if key in data:
+                        issue.setdefault(key, data[key])
+            element = by_start.get(tag.start)
+            if element is None:
+                element = {"id": f"n{len(elements) + 1}", "source": jsx[tag.start:tag.end], "issues": []}
+                by_start[tag.start] = element
+                elements.append(element)
+                spans[element["id"]] = {"start": tag.start, "end": tag.end, "original": element["source"], "rules": []}
+            if issue not in element["issues"]:
+                element["issues"].append(issue)
+                spans[element["id"]]["rules"].append(v.get("id"))
+    if unmapped:
+        print(f"⚠ {unmapped} violation node(s) could not be mapped to the source and were skipped.")
+    return elements, spans
+
+@PROFILE.stage("llm")
+def generate_fix_suggestions(violations, job: PageJob) -> list:
+    """
+    Ask Bedrock for per-element replacements and save them (with their source spans) to
+    the page's fix-suggestions file. Returns the suggestions.
+    """
+    try:
+        original_jsx = job.jsx_path.read_text(encoding='utf-8')
+        elements, spans = prepare_fix_targets(original_jsx, violations)
+        if not elements:
+            return []
+        fixes, misses = [], elements
+        if FIX_STORE is not None:
+            for element in elements:
+                replacement = FIX_STORE.get(element)
+                if replacement is not None:
+                    fixes.append({"id": element["id"], "replacement": replacement})
+            misses = [el for el in elements if el["id"] not in {fix["id"] for fix in fixes}]
+            PROFILE.note(memo_hits=len(fixes))
+            if fixes:
+                print(f"🧠 {len(fixes)} of {len(elements)} element(s) on {job.page} reused from the fix store.")
+        if misses:
+            # What the old flow sent: indented violations, then the whole file again with the fragments
+            baseline = estimate_tokens(SUGGESTION_INSTRUCTIONS + json.dumps(violations, indent=2) + original_jsx * 2)
+            answered = SUGGESTION_BATCHER.submit(job, misses, baseline).result()
+            call = LLM_STATS.latest(job.page)
+            if call:
+                PROFILE.note(retries=call["attempts"] - 1, input_tokens=call["input_tokens"],
+                             output_tokens=call["output_tokens"], batch_size=call["batch_size"],
+                             llm_latency_s=call["latency_s"])
+            if FIX_STORE is not None:
+                by_id = {el["id"]: el for el in misses}
+                for fix in answered:
+                    if fix["id"] in by_id:
+                        FIX_STORE.put(by_id[fix["id"]], fix["replacement"])
+            fixes += answered
+
+        suggestions = []
+        by_id = {el["id"]: el for el in elements}
+        for fix in fixes:
+            span = spans.get(fix["id"])
+            if span:
+                # store_key lets verification drop the stored fix again if it regresses the page
+                suggestions.append({"id": fix["id"], **span, "replacement": clean_updated_jsx(fix["replacement"]).strip(),
+                                    "store_key": fix_key(by_id[fix["id"]]["issues"], by_id[fix["id"]]["source"])})
+        job.fix_suggestions_path.parent.mkdir(parents=True, exist_ok=True)
+        PROFILE.note(bytes_written=atomic_write_text(job.fix_suggestions_path, json.dumps(suggestions, indent=2)))
+        print(f"💡 {len(suggestions)} fix suggestion(s) saved: {job.fix_suggestions_path}")
+        return suggestions
     except Exception as e:
         print("Failed to generate fix suggestions:", e)
         traceback.print_exc()
-        return ""
+        return []
 
-def apply_claude_fixes_to_jsx():
+@PROFILE.stage("apply")
+def apply_claude_fixes_to_jsx(job: PageJob) -> bool:
+    """
+    Apply the saved per-element replacements to the JSX as span edits (no second model call).
+    Returns False when the fixes could not be applied.
+    """
     try:
-        if not JSX_PATH.exists() or not FIX_SUGGESTIONS_PATH.exists():
+        if not job.jsx_path.exists() or not job.fix_suggestions_path.exists():
             raise FileNotFoundError("Required JSX or fix-suggestions file missing.")
 
-        original_jsx = JSX_PATH.read_text(encoding='utf-8')
-        fix_suggestions = FIX_SUGGESTIONS_PATH.read_text(encoding='utf-8')
-
-        prompt = (
-            "\n\nHuman: Here is a full React JSX file and some small JSX fragments that apply accessibility fixes "
-            "like `aria-label`, `role`, `alt`, `tabIndex`, etc.\n"
-            "- Your job is to **patch** the full JSX file by replacing matching elements with their fixed versions.\n"
-            "- Keep the entire JSX file intact — do NOT remove any sections like <Button>, <img>, <Table>.\n"
-            "- Do NOT add summaries, comments, or extra headers like 'The key changes'.\n"
-            "- Output only the updated JSX file — no explanations.\n"
-            "- Only apply the fixes provided — DO NOT invent new changes.\n\n"
-            f"Original JSX:\n\n{original_jsx}\n\nFix Fragments:\n\n{fix_suggestions}\n\nAssistant:"
-        )
-
-        print("✉️ Sending JSX + fixes to Claude via Bedrock...")
-        config = Config(
-            connect_timeout=60,
-            read_timeout=600,
-            retries={
-                'max_attempts': 3,
-                'mode': 'adaptive'
-            }
-        )
-
-        bedrock = boto3.client("bedrock-runtime", region_name=os.getenv("AWS_REGION"))
-        response = bedrock.invoke_model(
-            modelId="anthropic.claude-3-5-sonnet-20240620-v1:0",
-            accept="application/json",
-            contentType="application/json",
-            body=json.dumps({
-                "anthropic_version": "bedrock-2023-05-31",
-                "messages": [{ "role": "user", "content": prompt }],
-                "max_tokens": 2000,
-                "temperature": 0.3,
-                "stop_sequences": ["\n\nHuman:"]
-            }),
-        )
-
-        body = json.loads(response["body"].read())
-        raw_output = body.get("content", [{}])[0].get("text", "").strip()
-        updated_jsx = clean_updated_jsx(raw_output)
-        updated_jsx = add_aria_labels_to_buttons(updated_jsx)
-        updated_jsx = add_tabindex_to_focusable(updated_jsx)
-        updated_jsx = add_aria_labels_to_icons(updated_jsx)
-        updated_jsx = add_aria_labels_to_typography(updated_jsx)
-
-        if not BACKUP_PATH.exists():
-            BACKUP_PATH.write_text(original_jsx, encoding='utf-8')
-
-        if any(k in updated_jsx.lower() for k in ["placeholder", "// table", "<TableBody></TableBody>"]):
-            print("⚠️ Detected placeholder or missing content — restoring original table block.")
-            updated_jsx = restore_table_from_backup(updated_jsx)
+        original_jsx = job.jsx_path.read_text(encoding='utf-8')
+        suggestions = json.loads(job.fix_suggestions_path.read_text(encoding='utf-8'))
+
+        edits = []
+        for fix in suggestions:
+            start, end, original = fix["start"], fix["end"], fix["original"]
+            if original_jsx[start:end] != original:
+                # The file changed since the suggestions were made: follow the tag if it is unambiguous
+                if original_jsx.count(original) != 1:
+                    print(f"⚠ Skipping {fix['id']}: element moved or is ambiguous.")
+                    continue
+                start = original_jsx.index(original)
+                end = start + len(original)
+            if not same_element_tag(original, fix["replacement"]):
+                print(f"⚠ Skipping {fix['id']}: replacement is not a single {original.split()[0]}...> opening tag.")
+                continue
+            edits.append((start, end, fix["replacement"]))
+
+        if not edits:
+            print(f"No applicable fixes for {job.page}.")
+            return True
+        with PROFILE.span("postprocess", job.page):
+            updated_jsx = postprocess_jsx(apply_edits(original_jsx, edits))
+
+        with STAGE_LIMITS.write:
+            if not job.backup_path.exists():
+                PROFILE.note(bytes_written=atomic_write_text(job.backup_path, original_jsx))
 
         # Inject a tiny summary (kept from your base)
         summary_comment = (
@@ -361,45 +1292,142 @@ def apply_claude_fixes_to_jsx():
             else:
                 updated_jsx = summary_comment + updated_jsx
 
-        JSX_PATH.write_text(updated_jsx, encoding='utf-8')
-        print(f"✅ JSX updated: {JSX_PATH}")
+        with STAGE_LIMITS.write:
+            PROFILE.note(bytes_written=atomic_write_text(job.jsx_path, updated_jsx))
+        print(f"✅ JSX updated: {job.jsx_path}")
+        return True
 
     except Exception:
         print("Error applying JSX fixes:")
         print(traceback.format_exc())
+        return False
 
 def enrich_color_contrast_violations(violations):
     for v in violations:
         if v.get("id") == "color-contrast":
             for node in v.get("nodes", []):
-                summary = node.get("failureSummary", "")
-                fg_match = re.search(r"Foreground:\s*(#(?:[0-9a-fA-F]{3,6}))", summary)
-                bg_match = re.search(r"Background:\s*(#(?:[0-9a-fA-F]{3,6}))", summary)
-                contrast_match = re.search(r"contrast of\s*([\d.]+):1", summary)
-                if fg_match: node["fg"] = fg_match.group(1)
-                if bg_match: node["bg"] = bg_match.group(1)
-                if contrast_match: node["contrast"] = float(contrast_match.group(1))
+                data = contrast_data(node)
+                for key in ("fg", "bg", "contrast"):
+                    if key in data and not node.get(key):
+                        node[key] = data[key]
     return violations
 
-def create_pr():
+@PROFILE.stage("rules")
+def apply_rule_based_fixes(violations, job: PageJob) -> list:
+    """Patch the JSX with the deterministic rule handlers; returns the violations left for Bedrock."""
     try:
-        branch_name = f"a11y-fix-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
-        base_branch = "dev"
-        commit_message = f"Automated accessibility fixes for {JSX_PATH.name}"
-
-        print("🔍 Checking for JSX changes...")
-        result = subprocess.run(["git", "diff", "--quiet", str(JSX_PATH)])
-        if result.returncode == 0:
-            print("No changes to commit.")
-            return
+        original_jsx = job.jsx_path.read_text(encoding='utf-8')
+        updated_jsx, remaining, fixed = apply_rule_fixes(original_jsx, violations)
+        if fixed and updated_jsx != original_jsx:
+            with STAGE_LIMITS.write:
+                if not job.backup_path.exists():
+                    PROFILE.note(bytes_written=atomic_write_text(job.backup_path, original_jsx))
+                PROFILE.note(bytes_written=atomic_write_text(job.jsx_path, updated_jsx))
+            print(f"🔧 Rule engine fixed {fixed} node(s) in {job.page}; {len(remaining)} violation(s) left for Bedrock.")
+        return remaining
+    except Exception:
+        print("Error applying rule-based fixes:")
+        print(traceback.format_exc())
+        return violations
 
-        subprocess.run(["git", "checkout", "-b", branch_name], check=True)
-        subprocess.run(["git", "add", str(JSX_PATH), str(BACKUP_PATH), str(FIX_SUGGESTIONS_PATH)], check=True)
-        subprocess.run(["git", "commit", "-m", commit_message], check=True)
-        subprocess.run(["git", "push", "--set-upstream", "origin", branch_name], check=True)
-        # If you re-enable GH CLI, add it here.
-    except Exception as e:
-        print(f"Failed to create PR: {str(e)}")
+@PROFILE.stage("pr")
+def create_pr(job: PageJob):
+    """Queue the page for the run's fix branch; ChangeCollector.publish() commits and pushes them all."""
+    CHANGES.add(job)
+
+class ChangeCollector:
+    """
+    Run-level git batching. Pages register as they finish; publish() then
+    - finds the pages whose JSX differs from HEAD (2 git calls for the whole run),
+    - writes one commit per page, or a single squashed commit, onto a new branch
+      through one `git fast-import` stream (blobs, trees and commits in one process),
+    - pushes that branch once.
+    The working tree, index and current branch are left untouched.
+    """
+
+    def __init__(self, remote: str = "origin"):
+        self.remote = remote
+        self._lock = threading.Lock()
+        self._jobs = []
+        self.published = []  # jobs committed by the last publish()
+
+    def add(self, job: PageJob):
+        with self._lock:
+            self._jobs.append(job)
+
+    def discard(self, job: PageJob):
+        with self._lock:
+            self._jobs = [j for j in self._jobs if j.page != job.page]
+
+    def changed_jobs(self) -> list[PageJob]:
+        with self._lock:
+            jobs = sorted(self._jobs, key=lambda j: j.index)
+        if not jobs:
+            return []
+        paths = [str(j.jsx_path) for j in jobs]
+        diff = subprocess.run(["git", "diff", "--name-only", "--relative", "HEAD", "--", *paths],
+                              check=True, capture_output=True, text=True)
+        untracked = subprocess.run(["git", "ls-files", "--others", "--exclude-standard", "--", *paths],
+                                   check=True, capture_output=True, text=True)
+        changed = {Path(os.path.normpath(n)) for n in diff.stdout.splitlines() + untracked.stdout.splitlines() if n.strip()}
+        return [j for j in jobs if Path(os.path.normpath(j.jsx_path)) in changed]
+
+    @staticmethod
+    def _commit(branch: str, ident: str, message: str, files: list[tuple[str, bytes]], parent: str | None) -> bytes:
+        msg = message.encode("utf-8")
+        out = [f"commit refs/heads/{branch}\ncommitter {ident}\n".encode(), b"data %d\n%s\n" % (len(msg), msg)]
+        if parent:
+            out.append(f"from {parent}\n".encode())
+        for path, data in files:
+            if any(c in path for c in '"\\\n'):
+                path = json.dumps(path, ensure_ascii=False)  # fast-import takes C-style quoted paths
+            out.append(f"M 100644 inline {path}\n".encode("utf-8"))
+            out.append(b"data %d\n%s\n" % (len(data), data))
+        out.append(b"\n")
+        return b"".join(out)
+
+    def publish(self, squash: bool = False, push: bool = True) -> str | None:
+        """Commit every changed page to one new branch and push it. Returns the branch name."""
+        try:
+            jobs = self.changed_jobs()
+            if not jobs:
+                print("No changes to commit.")
+                return None
+            # HEAD and this directory's path inside the repo (fast-import paths are repo-relative)
+            head, prefix = (subprocess.run(["git", "rev-parse", "HEAD", "--show-prefix"],
+                                           check=True, capture_output=True, text=True).stdout.split("\n") + [""])[:2]
+            ident = subprocess.run(["git", "var", "GIT_COMMITTER_IDENT"],
+                                   check=True, capture_output=True, text=True).stdout.strip()
+            branch = f"a11y-fix-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+
+            def page_files(job):
+                # Pages fixed entirely by the rule engine have no fix-suggestions file
+                artifacts = [p for p in (job.jsx_path, job.backup_path, job.fix_suggestions_path) if p.exists()]
+                return [(prefix + p.as_posix(), p.read_bytes()) for p in artifacts]
+
+            if squash:
+                names = "\n".join(f"- {j.page}" for j in jobs)
+                message = f"Automated accessibility fixes for {len(jobs)} page(s)\n\n{names}\n"
+                stream = self._commit(branch, ident, message, [f for j in jobs for f in page_files(j)], head)
+            else:
+                stream = b"".join(
+                    self._commit(branch, ident, f"Automated accessibility fixes for {j.jsx_path.name}\n",
+                                 page_files(j), head if i == 0 else None)
+                    for i, j in enumerate(jobs)
+                )
+            subprocess.run(["git", "fast-import", "--quiet"], input=stream + b"done\n", check=True)
+            print(f"🌿 {len(jobs)} page(s) committed to {branch} "
+                  f"({'1 squashed commit' if squash else f'{len(jobs)} commit(s)'}) without touching the working tree.")
+            if push:
+                subprocess.run(["git", "push", "--set-upstream", self.remote, branch], check=True)
+            # If you re-enable GH CLI, add it here.
+            self.published = jobs
+            return branch
+        except Exception as e:
+            print(f"Failed to create PR: {str(e)}")
+            return None
+
+CHANGES = ChangeCollector()
 
 # ---------- Routing ----------
 def load_route_map():
@@ -428,8 +1456,350 @@ def file_path_to_route(file_path: Path, route_map: dict) -> str:
         return route
     return BASE_URL.rstrip("/") + "/" + route.lstrip("/")
 
+# ---------- Source dependency graph ----------
+SOURCE_EXTENSIONS = (".jsx", ".tsx", ".js", ".ts")
+# import X from "./x" | import "./x.css" | import("./x") | require("./x") — relative specifiers only
+LOCAL_IMPORT_RE = re.compile(
+    r"""(?:\bfrom\s*|\bimport\s*\(?\s*|\brequire\s*\(\s*)["'](\.{1,2}/[^"']+)["']"""
+)
+
+def resolve_local_import(from_file: Path, spec: str) -> Path | None:
+    base = from_file.parent / spec
+    candidates = [base]
+    candidates += [base.with_name(base.name + ext) for ext in SOURCE_EXTENSIONS]
+    candidates += [base / ("index" + ext) for ext in SOURCE_EXTENSIONS]
+    for candidate in candidates:
+        if candidate.is_file():
+            return Path(os.path.normpath(candidate))
+    return None
+
+def local_imports(file_path: Path) -> list[Path]:
+    try:
+        source = file_path.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return []
+    found = []
+    for spec in LOCAL_IMPORT_RE.findall(source):
+        resolved = resolve_local_import(file_path, spec)
+        if resolved and resolved not in found:
+            found.append(resolved)
+    return found
+
+def local_dependency_closure(file_path: Path) -> list[Path]:
+    """The file plus everything it transitively imports through relative paths (sorted)."""
+    root = Path(os.path.normpath(file_path))
+    seen = {root}
+    stack = [root]
+    while stack:
+        for dep in local_imports(stack.pop()):
+            if dep not in seen:
+                seen.add(dep)
+                stack.append(dep)
+    return sorted(seen)
+
+ENTRY_SCRIPT_RE = re.compile(r"""<script\b[^>]*\btype=["']module["'][^>]*\bsrc=["']/?([^"']+)["']""", re.IGNORECASE)
+
+def app_entry_files() -> list[Path]:
+    """Module scripts of index.html (e.g. src/main.jsx), else src/main.* when there is no index.html."""
+    try:
+        html = APP_HTML.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        html = ""
+    entries = [Path(os.path.normpath(spec)) for spec in ENTRY_SCRIPT_RE.findall(html)]
+    if not entries:
+        entries = [SRC_ROOT / ("main" + ext) for ext in SOURCE_EXTENSIONS]
+    return [entry for entry in entries if entry.is_file()]
+
+def is_page_file(file_path: Path) -> bool:
+    return Path(os.path.normpath(file_path)).is_relative_to(os.path.normpath(JSX_FOLDER))
+
+@functools.lru_cache(maxsize=1)
+def layout_files() -> tuple[Path, ...]:
+    """
+    Files every page renders inside: the app entry and whatever it imports without going
+    through a page (routes, layouts such as the navbar in MainLayout, providers, global CSS).
+    """
+    seen = set()
+    stack = app_entry_files()
+    seen.update(stack)
+    while stack:
+        for dep in local_imports(stack.pop()):
+            if dep not in seen and not is_page_file(dep):
+                seen.add(dep)
+                stack.append(dep)
+    return tuple(sorted(seen))
+
+def build_reverse_import_graph(root: Path = SRC_ROOT) -> dict[Path, set[Path]]:
+    """{imported file: {files importing it}} for every source file under root."""
+    reverse = {}
+    for file_path in sorted(root.rglob("*")):
+        if file_path.suffix not in SOURCE_EXTENSIONS or not file_path.is_file():
+            continue
+        importer = Path(os.path.normpath(file_path))
+        for dep in local_imports(file_path):
+            reverse.setdefault(dep, set()).add(importer)
+    return reverse
+
+def affected_by(changed: set[Path], reverse: dict[Path, set[Path]], stop=frozenset()) -> set[Path]:
+    """Changed files plus everything that (transitively) imports one of them, not following files in `stop`."""
+    affected = set(changed)
+    stack = [f for f in changed if f not in stop]
+    while stack:
+        for importer in reverse.get(stack.pop(), ()):
+            if importer in stop:
+                affected.add(importer)
+                continue
+            if importer not in affected:
+                affected.add(importer)
+                stack.append(importer)
+    return affected
+
+def changed_files_since(ref: str) -> set[Path]:
+    """Files under the current directory changed since ref (committed, staged, unstaged or untracked)."""
+    diff = subprocess.run(
+        ["git", "diff", "--name-only", "--relative", ref, "--"],
+        check=True, capture_output=True, text=True,
+    )
+    untracked = subprocess.run(
+        ["git", "ls-files", "--others", "--exclude-standard"],
+        check=True, capture_output=True, text=True,
+    )
+    names = diff.stdout.splitlines() + untracked.stdout.splitlines()
+    return {Path(os.path.normpath(name)) for name in names if name.strip()}
+
+def select_targets_since(targets: list[Path], ref: str) -> list[Path]:
+    changed = changed_files_since(ref)
+    reverse = build_reverse_import_graph()
+    pages = {Path(os.path.normpath(t)) for t in targets}
+    # A change reaching the layout without going through a page (navbar, routes, entry) renders on every page
+    layout = sorted(set(layout_files()) & affected_by(changed, reverse, stop=pages))
+    if layout:
+        print(f"🔀 {len(changed)} file(s) changed since {ref}, including the shared layout "
+              f"({', '.join(p.as_posix() for p in layout if p in changed) or 'via its imports'}): "
+              f"all {len(targets)} page(s) affected.")
+        return targets
+    affected = affected_by(changed, reverse)
+    selected = [t for t in targets if Path(os.path.normpath(t)) in affected]
+    print(f"🔀 {len(changed)} file(s) changed since {ref}: {len(selected)}/{len(targets)} page(s) affected.")
+    return selected
+
+# ---------- Component attribution ----------
+# Dev-mode builds can stamp the defining file on every element (e.g. react-dev-inspector)
+SOURCE_ATTR_RE = re.compile(r'\bdata-(?:inspector-relative-path|source-file|component-file)\s*=\s*"([^"]+)"')
+
+def node_fingerprint(rule_id: str, node: dict) -> str:
+    html = re.sub(r"\s+", " ", node.get("html", "")).strip()
+    return hashlib.sha1(f"{rule_id}\0{html}".encode("utf-8")).hexdigest()[:16]
+
+@functools.lru_cache(maxsize=4096)
+def attribute_snippet(html: str, candidates: tuple[Path, ...]) -> Path:
+    """
+    Source file (among candidates, the page first) that renders an axe node.
+    A data-* source attribute wins; otherwise the file whose best JSX match scores highest,
+    with ties and unscored matches going to the page. Page sources only change after their own attribution,
+    so results are cached for the run.
+    """
+    declared = SOURCE_ATTR_RE.search(html)
+    if declared:
+        name = Path(os.path.normpath(declared.group(1))).as_posix()
+        for candidate in candidates:
+            if candidate.as_posix() == name or candidate.as_posix().endswith("/" + name):
+                return candidate
+    owner, best = candidates[0], 0  # another file must positively beat the page
+    for candidate in candidates:
+        try:
+            match = match_node(candidate.read_text(encoding="utf-8"), {"html": html})
+        except OSError:
+            continue
+        if match is not None and match[0] > best:
+            owner, best = candidate, match[0]
+    return owner
+
+class SharedViolations:
+    """
+    Violation nodes attributed to a file other than the page that showed them, kept once per
+    (file, rule, node fingerprint) however many pages render them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._groups = {}
+        self._owned = set()  # keys a page job fixes in its own file
+        self.seen = 0
+
+    def claim(self, owner: Path, violation: dict, node: dict, job: PageJob) -> bool:
+        key = (owner, violation.get("id"), node_fingerprint(violation.get("id"), node))
+        with self._lock:
+            self.seen += 1
+            if key in self._groups:
+                group = self._groups[key]
+                group["pages"].append(job.page)
+                if job.index < group["index"]:
+                    # The component is audited on its first page in job order, however threads finished
+                    group.update(url=job.url, index=job.index)
+                return False
+            meta = {k: v for k, v in violation.items() if k != "nodes"}
+            self._groups[key] = {"violation": meta, "node": node, "pages": [job.page], "url": job.url, "index": job.index}
+            return True
+
+    def mark_owned(self, owner: Path, violation: dict, node: dict):
+        with self._lock:
+            self._owned.add((owner, violation.get("id"), node_fingerprint(violation.get("id"), node)))
+
+    def by_file(self) -> dict[Path, dict]:
+        """{file: {"url", "pages", "violations"}} for every group no page job already covers."""
+        files = {}
+        with self._lock:
+            groups = [(k, g) for k, g in self._groups.items() if k not in self._owned]
+        groups.sort(key=lambda item: (item[1]["index"], item[0][0].as_posix(), item[0][1] or "", item[0][2]))
+        for (owner, rule_id, _), group in groups:
+            entry = files.setdefault(owner, {"url": group["url"], "index": group["index"], "pages": set(), "violations": {}})
+            if group["index"] < entry["index"]:
+                entry.update(url=group["url"], index=group["index"])
+            entry["pages"].update(group["pages"])
+            violation = entry["violations"].setdefault(rule_id, {**group["violation"], "nodes": []})
+            violation["nodes"].append(group["node"])
+        for entry in files.values():
+            entry["violations"] = list(entry["violations"].values())
+        return files
+
+    def export(self) -> dict:
+        """JSON form of the groups and owned keys, for a shard bundle."""
+        with self._lock:
+            groups = [{"file": owner.as_posix(), "rule": rule_id, "fingerprint": fingerprint, **group}
+                      for (owner, rule_id, fingerprint), group in self._groups.items()]
+            owned = sorted([owner.as_posix(), rule_id, fingerprint] for owner, rule_id, fingerprint in self._owned)
+        return {"groups": groups, "owned": owned}
+
+    def load(self, data: dict):
+        """Add the groups of export(); groups found by several shards keep every page."""
+        with self._lock:
+            for g in data.get("groups", []):
+                key = (Path(g["file"]), g["rule"], g["fingerprint"])
+                self.seen += len(g["pages"])
+                group = self._groups.get(key)
+                if group is None:
+                    self._groups[key] = {"violation": g["violation"], "node": g["node"],
+                                         "pages": list(g["pages"]), "url": g["url"], "index": g["index"]}
+                    continue
+                group["pages"].extend(g["pages"])
+                if g["index"] < group["index"]:
+                    group.update(url=g["url"], index=g["index"])
+            self._owned.update((Path(owner), rule_id, fingerprint) for owner, rule_id, fingerprint in data.get("owned", []))
+
+SHARED = SharedViolations()
+
+def attribute_violations(violations: list, job: PageJob) -> list:
+    """The page's own violations; nodes rendered by shared components go to SHARED instead."""
+    page_file = Path(os.path.normpath(job.jsx_path))
+    # The page's own imports plus the layout it renders inside (a navbar no page imports)
+    deps = dict.fromkeys(local_dependency_closure(job.jsx_path) + list(layout_files()))
+    candidates = (page_file,) + tuple(d for d in deps if d != page_file)
+    own, shared = [], 0
+    for v in violations:
+        nodes = []
+        for node in v.get("nodes", []):
+            owner = attribute_snippet(node.get("html", ""), candidates) if len(candidates) > 1 else page_file
+            if owner == page_file:
+                nodes.append(node)
+                SHARED.mark_owned(owner, v, node)
+            else:
+                SHARED.claim(owner, v, node, job)
+                shared += 1
+        if nodes:
+            own.append({**v, "nodes": nodes})
+    if shared:
+        print(f"🧩 {shared} violation node(s) on {job.page} come from shared components; they are fixed once there.")
+    return own
+
+# ---------- Audit cache ----------
+_AUDIT_CACHE_LOCK = threading.Lock()
+
+def _package_version(name: str) -> str:
+    try:
+        with (Path("node_modules") / name / "package.json").open("r", encoding="utf-8") as f:
+            return json.load(f).get("version", "unknown")
+    except (OSError, ValueError):
+        return "unknown"
+
+@functools.lru_cache(maxsize=1)
+def audit_tool_versions() -> dict:
+    return {
+        "playwright": _package_version("playwright"),
+        "axe-core": _package_version("axe-core"),
+        "@axe-core/playwright": _package_version("@axe-core/playwright"),
+        # The node scripts post-process results (contrast enrichment), so they are part of the key too
+        "scripts": hashlib.sha256((ACCESSIBILITY_CHECK_JS + ACCESSIBILITY_WORKER_JS).encode("utf-8")).hexdigest()[:16],
+    }
+
+def audit_cache_key(job: PageJob) -> str:
+    """
+    Hash of the page source, its local imports, the layout it renders inside (entry, routes,
+    navbar, global CSS), the resolved URL, the axe/playwright versions and whether the page is
+    served with the stub session (--dev-server pages may render the login redirect instead).
+    """
+    h = hashlib.sha256()
+    h.update(json.dumps({"url": job.url, "versions": audit_tool_versions(), "dev_server": DEV_SERVER},
+                        sort_keys=True).encode("utf-8"))
+    for dep in sorted(set(local_dependency_closure(job.jsx_path)) | set(layout_files())):
+        h.update(b"\0" + dep.as_posix().encode("utf-8") + b"\0")
+        h.update(dep.read_bytes())
+    return h.hexdigest()
+
+def load_cached_audit(key: str) -> dict | None:
+    path = AUDIT_CACHE_DIR / f"{key}.json"
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            report = json.load(f)
+        os.utime(path)  # mtime doubles as the LRU timestamp
+        return report
+    except (OSError, ValueError):
+        return None
+
+def store_cached_audit(key: str, report: dict):
+    path = AUDIT_CACHE_DIR / f"{key}.json"
+    atomic_write_text(path, json.dumps(report))
+    evict_audit_cache()
+
+def evict_audit_cache(max_entries: int | None = None):
+    """Drop least recently used cache entries beyond max_entries."""
+    limit = AUDIT_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    with _AUDIT_CACHE_LOCK:
+        entries = []
+        for path in AUDIT_CACHE_DIR.glob("*.json"):
+            try:
+                entries.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+        if len(entries) <= limit:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - limit]:
+            path.unlink(missing_ok=True)
+
+@PROFILE.stage("audit")
+def audit_page(job: PageJob) -> dict | None:
+    """run_playwright_audit, skipped when an identical page/toolchain was audited before."""
+    key = audit_cache_key(job) if AUDIT_CACHE_MODE != "off" else None
+    if AUDIT_CACHE_MODE == "on":
+        report = load_cached_audit(key)
+        if report is not None:
+            print(f"♻️ Reusing cached audit for {job.page}")
+            PROFILE.note(cached=True, bytes_written=save_page_report(job.report_path, report))
+            return report
+
+    if not ensure_app_servers():
+        return None
+    queued = time.perf_counter()
+    with STAGE_LIMITS.audit:
+        PROFILE.note(cached=False, queued_s=round(time.perf_counter() - queued, 6))
+        report = run_playwright_audit(job.url, job.report_path)
+    if report is not None and key:
+        store_cached_audit(key, slim_report(report))
+    return report
+
 # ---------- Page processing ----------
-def process_report_for_current_file(report: dict):
+def process_report_for_current_file(report: dict, job: PageJob):
     if not report:
         print("⚠ Skipping fixes (no report).")
         return
@@ -439,71 +1809,572 @@ def process_report_for_current_file(report: dict):
         print("🎉 No accessibility issues found.")
         return
 
-    # Split + enrich
-    color_violations = [v for v in violations if v.get('id') == 'color-contrast']
-    other_violations = [v for v in violations if v.get('id') != 'color-contrast']
-    enriched_color_violations = enrich_color_contrast_violations(color_violations)
+    if JOURNAL.completed(job.page, "committed") is not None:
+        print(f"⏭️ {job.page} was already committed in this run.")
+        return
+    VERIFICATION.expect(job, violations)
+
+    # Enrich, then let the local rule engine take everything it can
+    done = JOURNAL.completed(job.page, "rules")
+    if done is None:
+        violations = enrich_color_contrast_violations(violations)
+        violations = apply_rule_based_fixes(violations, job)
+        JOURNAL.mark(job.page, "rules", source_digest(job.jsx_path), {"remaining": violations})
+    else:
+        violations = done["remaining"]
 
-    # Apply fixes in two passes (as in your base)
-    if generate_fix_suggestions(enriched_color_violations):
-        apply_claude_fixes_to_jsx()
-    if generate_fix_suggestions(other_violations):
-        apply_claude_fixes_to_jsx()
+    # One Bedrock request for what is left (per-element replacements, applied as span edits)
+    if violations:
+        suggested = JOURNAL.completed(job.page, "suggested") is not None and job.fix_suggestions_path.exists()
+        if suggested:
+            print(f"⏭️ Reusing fix suggestions from the interrupted run: {job.fix_suggestions_path}")
+        elif generate_fix_suggestions(violations, job):
+            JOURNAL.mark(job.page, "suggested", source_digest(job.jsx_path))
+            suggested = True
+        if suggested and JOURNAL.completed(job.page, "applied") is None and apply_claude_fixes_to_jsx(job):
+            JOURNAL.mark(job.page, "applied", source_digest(job.jsx_path))
 
-    create_pr()
+    create_pr(job)
+    JOURNAL.mark(job.page, "queued", source_digest(job.jsx_path))
 
-def process_jsx_file(file_path: Path, route_map: dict, consolidated: list):
-    global JSX_PATH, BACKUP_PATH, FIX_SUGGESTIONS_PATH
+CONSOLIDATED_REPORT = None  # ReportWriter opened in __main__
 
-    JSX_PATH = file_path
-    relative = file_path.relative_to(JSX_FOLDER)
-    # Per-file artifacts live under a11y_backups/<same-subdir>/
-    BACKUP_PATH = BACKUP_ROOT / relative.with_name(relative.stem + "_backup" + file_path.suffix)
-    FIX_SUGGESTIONS_PATH = BACKUP_ROOT / relative.with_name("fix-suggestions.txt")
-    page_report_path = BACKUP_ROOT / relative.with_name("accessibility-report.json")
+def snapshot_source(job: PageJob, resumed: bool):
+    """
+    Keep the source this run starts the file from. The backup holds the source from before
+    the first fixing run, which later human edits have moved past; rollbacks need this one.
+    A resumed page keeps the snapshot of the interrupted run.
+    """
+    if resumed and job.start_path.exists():
+        return
+    job.start_path.parent.mkdir(parents=True, exist_ok=True)
+    PROFILE.note(bytes_written=atomic_write_bytes(job.start_path, job.jsx_path.read_bytes()))
 
+@PROFILE.stage("page")
+def process_jsx_file(job: PageJob) -> dict | None:
+    """
+    Audit + fix one page. Its consolidated-report entry is appended to CONSOLIDATED_REPORT
+    as soon as the audit is in, and returned (None without a report).
+    """
+    print(f"\n=== Processing {job.jsx_path} ===")
     # Ensure dirs
-    BACKUP_ROOT.mkdir(parents=True, exist_ok=True)
-    BACKUP_PATH.parent.mkdir(parents=True, exist_ok=True)
-
-    # Route/URL for this page
-    url = file_path_to_route(file_path, route_map)
-    write_check_script()
-    report = run_playwright_audit(url, page_report_path)
+    job.backup_path.parent.mkdir(parents=True, exist_ok=True)
+
+    if JOURNAL.is_stale(job.page, source_digest(job.jsx_path)):
+        print(f"⚠ {job.page} changed since the interrupted run; processing it from the start.")
+        JOURNAL.forget(job.page)
+    resumed = JOURNAL.completed(job.page, "audited") is not None
+    if resumed and job.report_path.exists():
+        print(f"⏭️ Reusing audit from the interrupted run: {job.report_path}")
+        report = load_page_report(job.report_path)
+    else:
+        report = audit_page(job)
+        if report is not None:
+            JOURNAL.mark(job.page, "audited", source_digest(job.jsx_path))
 
-    # Save into consolidated memory (path + violations)
+    entry = None
     if report and "violations" in report:
-        consolidated.append({
-            "page": str(relative).replace("\\", "/"),
-            "url": report.get("url", url),
+        entry = {
+            "page": job.page,
+            "url": report.get("url", job.url),
             "violations": report["violations"]
-        })
-
+        }
+        if CONSOLIDATED_REPORT is not None:
+            CONSOLIDATED_REPORT.append({"index": job.index, **entry})
+
+    if AUDIT_ONLY:
+        return entry
+    snapshot_source(job, resumed)
+    if report:
+        VERIFICATION.baseline(job.url, report.get("violations", []))
+    if report and ATTRIBUTION:
+        report = {**report, "violations": attribute_violations(report.get("violations", []), job)}
     # Proceed with the same fix pipeline but scoped to this file/report
-    process_report_for_current_file(report)
+    process_report_for_current_file(report, job)
+    return entry
+
+@PROFILE.stage("component")
+def process_shared_component(job: PageJob, violations: list):
+    """Fix-and-queue one shared component with the deduplicated violations of every page rendering it."""
+    print(f"\n=== Processing shared component {job.jsx_path} ===")
+    if JOURNAL.is_stale(job.page, source_digest(job.jsx_path)):
+        JOURNAL.forget(job.page)
+    snapshot_source(job, JOURNAL.completed(job.page, "rules") is not None)
+    process_report_for_current_file({"violations": violations}, job)
+
+def run_shared_components(first_index: int) -> int:
+    """Fix every component SHARED collected, once each, after all pages ran. Returns how many."""
+    files = SHARED.by_file()
+    if not files:
+        return 0
+    nodes = sum(len(v["nodes"]) for entry in files.values() for v in entry["violations"])
+    print(f"\n🧩 {SHARED.seen} shared violation node(s) across pages -> {nodes} unique node(s) in {len(files)} component(s).")
+    work = [(make_component_job(first_index + i, path, entry["url"]), entry["violations"])
+            for i, (path, entry) in enumerate(sorted(files.items()))]
+    with ThreadPoolExecutor(max_workers=max(1, min(len(work), STAGE_LIMITS.max_in_flight))) as pool:
+        futures = {pool.submit(process_shared_component, job, violations): job for job, violations in work}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception:
+                print("❌ Failed while processing:", futures[future].jsx_path)
+                print(traceback.format_exc())
+    return len(work)
+
+def run_pages(jobs: list[PageJob]) -> int:
+    """
+    Run every page through process_jsx_file with several pages in flight.
+    Stage concurrency is bounded by STAGE_LIMITS. Entries are streamed to
+    CONSOLIDATED_REPORT, not kept; returns how many pages produced a report.
+    """
+    reported = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(len(jobs), STAGE_LIMITS.max_in_flight))) as pool:
+        futures = {pool.submit(process_jsx_file, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                if future.result():
+                    reported += 1
+            except Exception:
+                print("❌ Failed while processing:", job.jsx_path)
+                print(traceback.format_exc())
+    return reported
+
+# ---------- Verification ----------
+def violation_targets(violations: list) -> set[tuple[str, str]]:
+    """(rule id, JSON of the axe target) for every violation node."""
+    return {(v.get("id"), json.dumps(node["target"])) for v in violations for node in v.get("nodes", [])
+            if node.get("target")}
+
+class FixVerification:
+    """
+    What each queued page/component was fixed for, and the full audit of every URL.
+    After all fixes are in, each changed file's URL is re-audited with axe scoped (`include`)
+    to the selectors that failed; violations there that the full audit did not have are
+    regressions, and the file goes back to the source the run started from.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._expected = {}   # page -> (job, violations it was fixed for)
+        self._baselines = {}  # url -> violations of the full audit
+        self.results = []
+
+    def expect(self, job: PageJob, violations: list):
+        with self._lock:
+            self._expected[job.page] = (job, violations)
+
+    def baseline(self, url: str, violations: list):
+        with self._lock:
+            self._baselines[url] = violations
+
+    def pending(self) -> list[tuple[PageJob, list, list]]:
+        """(job, fixed-for violations, baseline violations) for every file the run changed from its start snapshot."""
+        with self._lock:
+            items = sorted(self._expected.values(), key=lambda item: item[0].index)
+            baselines = dict(self._baselines)
+        return [(job, violations, baselines.get(job.url, violations)) for job, violations in items
+                if job.start_path.exists() and source_digest(job.start_path) != source_digest(job.jsx_path)]
+
+VERIFICATION = FixVerification()
+
+def _targets_json(keys) -> list:
+    return [{"rule": rule, "target": json.loads(target)} for rule, target in sorted(keys)]
+
+def reject_stored_fixes(job: PageJob):
+    """Forget the stored fixes a rolled-back page used, so the next run asks for new ones."""
+    if FIX_STORE is None:
+        return
+    try:
+        suggestions = json.loads(job.fix_suggestions_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    dropped = FIX_STORE.reject([s["store_key"] for s in suggestions if s.get("store_key")])
+    if dropped:
+        print(f"🧠 Dropped {dropped} stored fix(es) of {job.page} from the fix store.")
+
+@PROFILE.stage("verify")
+def verify_page(job: PageJob, violations: list, baseline: list) -> dict | None:
+    """Scoped re-audit of one fixed file; rolls it back to the source the run started from when it regressed."""
+    expected = violation_targets(violations)
+    include = [json.loads(target) for target in sorted({target for _, target in expected})]
+    if not include:
+        return None
+    with STAGE_LIMITS.audit:
+        report = run_playwright_audit(job.url, job.verify_report_path, include=include)
+    if report is None:
+        print(f"⚠ Could not verify {job.page}; keeping its fixes.")
+        return None
+    after = violation_targets(report.get("violations", []))
+    gone = {json.dumps(target) for target in report.get("missing", [])}
+    before = violation_targets(baseline) | expected
+    result = {
+        "page": job.page,
+        "url": job.url,
+        "fixed": _targets_json({k for k in expected - after if k[1] not in gone}),
+        "still_failing": _targets_json(expected & after),
+        "new": _targets_json(after - before),
+        "unverified": _targets_json({k for k in expected if k[1] in gone}),
+    }
+    result["rolled_back"] = bool(result["new"])
+    if result["rolled_back"]:
+        with STAGE_LIMITS.write:
+            PROFILE.note(bytes_written=atomic_write_bytes(job.jsx_path, job.start_path.read_bytes()))
+        CHANGES.discard(job)
+        reject_stored_fixes(job)
+    JOURNAL.mark(job.page, "verified", source_digest(job.jsx_path), result)
+    return result
+
+def run_verification() -> list:
+    """Verify every file the run changed (after rebuilding the served app). Returns the results."""
+    work = VERIFICATION.pending()
+    if not work:
+        return []
+    results, todo = [], []
+    for job, violations, baseline in work:
+        done = JOURNAL.completed(job.page, "verified")
+        if done is None:
+            todo.append((job, violations, baseline))
+            continue
+        print(f"⏭️ {job.page} was already verified in the interrupted run.")
+        results.append(done)
+    for done in results:
+        if done.get("rolled_back"):
+            CHANGES.discard(next(job for job, _, _ in work if job.page == done["page"]))
+    if todo:
+        print(f"\n🔎 Verifying {len(todo)} fixed file(s) with scoped re-audits...")
+        try:
+            if not DEV_SERVER and APP_SERVERS is not None:
+                APP_SERVERS.rebuild()
+        except Exception as e:
+            print(f"⚠ Could not rebuild the app for verification ({e}); publishing without it.")
+            return results
+        if not ensure_app_servers():
+            return results
+        with ThreadPoolExecutor(max_workers=max(1, min(len(todo), STAGE_LIMITS.sizes["audit"]))) as pool:
+            futures = {pool.submit(verify_page, *item): item[0] for item in todo}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception:
+                    print("❌ Failed while verifying:", futures[future].jsx_path)
+                    print(traceback.format_exc())
+                    continue
+                if result is not None:
+                    results.append(result)
+    results.sort(key=lambda r: r["page"])
+    for r in results:
+        icon = "↩️" if r["rolled_back"] else "⚠" if r["still_failing"] or r["unverified"] else "✅"
+        print(f"{icon} {r['page']}: {len(r['fixed'])} fixed, {len(r['still_failing'])} still failing, "
+              f"{len(r['new'])} new, {len(r['unverified'])} unverified"
+              + (" -> rolled back to its source at the start of the run" if r["rolled_back"] else ""))
+    atomic_write_text(VERIFICATION_PATH, json.dumps({"pages": results}, indent=2))
+    print(f"🔎 Verification saved to {VERIFICATION_PATH}")
+    VERIFICATION.results = results
+    return results
+
+# ---------- Sharding ----------
+def shard_pages(targets: list[Path]) -> dict[str, int]:
+    """{page: file size} of every target, the input of the shard partition."""
+    return {target.relative_to(JSX_FOLDER).as_posix(): target.stat().st_size for target in targets}
+
+def update_shard_costs(entries, profile_records):
+    """Merge this run's per-page violation counts and wall times into SHARD_COSTS_PATH."""
+    costs = load_costs(SHARD_COSTS_PATH)
+    costs.update(collect_costs(entries, profile_records))
+    save_costs(SHARD_COSTS_PATH, costs)
+
+def write_shard_bundle(shard: tuple[int, int], jobs: list[PageJob], pages: dict, costs: dict) -> Path:
+    """
+    Everything `merge` needs from one shard: its report lines, trace, verification, shared
+    component groups, and the fixed JSX with backups and suggestions (under files/, same paths).
+    """
+    index, count = shard
+    bundle = SHARD_ROOT / f"{index}-of-{count}"
+    shutil.rmtree(bundle, ignore_errors=True)
+    changed = [] if AUDIT_ONLY else CHANGES.changed_jobs()
+    for job in changed:
+        for path in (job.jsx_path, job.backup_path, job.fix_suggestions_path):
+            if path.exists():
+                atomic_write_bytes(bundle / "files" / path, path.read_bytes())
+    for path, name in ((CONSOLIDATED_REPORT_PATH, CONSOLIDATED_REPORT_PATH.name),
+                       (PROFILE.trace_path, "run-profile.jsonl"), (VERIFICATION_PATH, VERIFICATION_PATH.name)):
+        if path is not None and path.exists():
+            atomic_write_bytes(bundle / name, path.read_bytes())
+    manifest = {
+        "shard": index,
+        "of": count,
+        "targets": targets_digest(sorted(pages)),
+        "costs": costs_digest(costs),
+        "total": len(pages),
+        "audit_only": AUDIT_ONLY,
+        "pages": [job.index for job in jobs],
+        "changed": [{"index": job.index, "jsx": job.jsx_path.as_posix()} for job in changed],
+        "shared": SHARED.export(),
+    }
+    atomic_write_text(bundle / "manifest.json", json.dumps(manifest, indent=2))
+    print(f"📦 Shard {index}/{count}: {len(jobs)} page(s), {len(changed)} changed, bundle in {bundle}")
+    return bundle
+
+def load_shard_bundles(paths: list[Path]) -> list[tuple[Path, dict]]:
+    """(bundle, manifest) in shard order; SystemExit unless they are exactly the n shards of one run."""
+    bundles = []
+    for path in paths:
+        try:
+            bundles.append((path, json.loads((path / "manifest.json").read_text(encoding="utf-8"))))
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"⚠ {path} is not a shard bundle: {e}")
+    if not bundles:
+        raise SystemExit(f"⚠ No shard bundles to merge (looked in {SHARD_ROOT}/).")
+    bundles.sort(key=lambda b: b[1]["shard"])
+    first = bundles[0][1]
+    for key, what in (("of", "shard count"), ("targets", "target pages"), ("costs", "shard costs"),
+                      ("total", "page count"), ("audit_only", "--audit-only")):
+        if any(m[key] != first[key] for _, m in bundles):
+            raise SystemExit(f"⚠ Shard bundles disagree on the {what}; they come from different runs.")
+    shards = [m["shard"] for _, m in bundles]
+    if shards != list(range(1, first["of"] + 1)):
+        raise SystemExit(f"⚠ Expected shards 1..{first['of']}, got {shards}.")
+    indexes = sorted(i for _, m in bundles for i in m["pages"])
+    if indexes != list(range(first["total"])):
+        raise SystemExit("⚠ Shard bundles do not cover every page exactly once.")
+    return bundles
+
+def merge_shards(args) -> int:
+    """
+    Combine shard bundles into one consolidated report, one legacy report and one fix branch,
+    as a single-node run would have produced. Shared components are fixed (and verified) here,
+    where every shard's groups are known.
+    """
+    global ATTRIBUTION, VERIFY, DEV_SERVER, FIX_STORE
+    ATTRIBUTION = not args.no_attribution
+    VERIFY = not args.no_verify
+    DEV_SERVER = args.dev_server
+    bundles = load_shard_bundles(args.bundles or sorted(p for p in SHARD_ROOT.glob("*-of-*") if p.is_dir()))
+    total, audit_only = bundles[0][1]["total"], bundles[0][1]["audit_only"]
+    print(f"🔀 Merging {len(bundles)} shard(s) covering {total} page(s)")
+
+    entries = merge_ndjson([b / CONSOLIDATED_REPORT_PATH.name for b, _ in bundles], CONSOLIDATED_REPORT_PATH)
+    write_legacy_report(CONSOLIDATED_REPORT_PATH, REPORT_PATH)
+    print(f"✅ Consolidated report: {len(entries)} page(s) in {CONSOLIDATED_REPORT_PATH.resolve()}")
+    print(f"✅ Legacy report saved to {REPORT_PATH.resolve()}")
+    update_shard_costs(entries, [r for b, _ in bundles for r in read_profile(b / "run-profile.jsonl")])
+    if audit_only:
+        return 0
+
+    route_map = load_route_map()
+    for bundle, manifest in bundles:
+        files = bundle / "files"
+        for path in sorted(p for p in files.rglob("*") if p.is_file()):
+            atomic_write_bytes(path.relative_to(files), path.read_bytes())
+        for changed in manifest["changed"]:
+            CHANGES.add(make_page_job(changed["index"], Path(changed["jsx"]), route_map))
+    results = [r for b, _ in bundles for r in _read_verification(b / VERIFICATION_PATH.name)]
+
+    if ATTRIBUTION:
+        for _, manifest in bundles:
+            SHARED.load(manifest["shared"])
+        for entry in entries:
+            VERIFICATION.baseline(entry["url"], entry["violations"])
+    if SHARED.by_file():
+        FIX_STORE = None if args.no_fix_store else \
+            FixStore(FIX_STORE_PATH, BEDROCK_MODEL_ID, PROMPT_VERSION, FIX_STORE_MAX_ENTRIES)
+        try:
+            run_shared_components(total)
+            if VERIFY:
+                start_audit_worker()
+                if AUDIT_WORKER is None:
+                    write_check_script()
+                results += run_verification()
+        finally:
+            stop_audit_worker()
+            stop_app_servers()
+            if FIX_STORE is not None:
+                FIX_STORE.close()
+    if results:
+        results.sort(key=lambda r: r["page"])
+        atomic_write_text(VERIFICATION_PATH, json.dumps({"pages": results}, indent=2))
+
+    branch = CHANGES.publish(squash=args.squash, push=not args.no_push)
+    LLM_STATS.report()
+    return 0 if branch or not CHANGES.changed_jobs() else 1
+
+def _read_verification(path: Path) -> list:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["pages"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+def parse_merge_args(argv=None):
+    parser = argparse.ArgumentParser(prog="accessibility_fix.py merge",
+                                     description="Combine --shard bundles into one report and one fix branch.")
+    parser.add_argument("bundles", nargs="*", type=Path,
+                        help=f"Shard bundle directories (default: every {SHARD_ROOT}/<i>-of-<n>).")
+    parser.add_argument("--squash", action="store_true",
+                        help="Put all fixed pages in one commit instead of one commit per page.")
+    parser.add_argument("--no-push", action="store_true", help="Create the fix branch locally without pushing it.")
+    parser.add_argument("--dev-server", action="store_true",
+                        help=f"Verify shared components against the server already running at BASE_URL ({BASE_URL}).")
+    parser.add_argument("--no-fix-store", action="store_true",
+                        help=f"Ask Bedrock for every shared component instead of reusing {FIX_STORE_PATH}.")
+    parser.add_argument("--no-verify", action="store_true", help="Skip the scoped re-audit of shared components.")
+    parser.add_argument("--no-attribution", action="store_true",
+                        help="Ignore the shared-component groups (use when the shards ran with --no-attribution).")
+    return parser.parse_args(argv)
 
 # ---------- Entry ----------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Audit JSX pages with axe and apply accessibility fixes via Bedrock.")
+    parser.add_argument("--audit-only", action="store_true",
+                        help="Only audit and write the reports: no fixes, no Bedrock, no git.")
+    parser.add_argument("--dev-server", action="store_true",
+                        help=f"Audit the server already running at BASE_URL ({BASE_URL}, e.g. `npm run dev`) "
+                             "instead of building dist/ and serving it with a stub backend.")
+    parser.add_argument("--no-audit-worker", action="store_true",
+                        help="Launch one node/Chromium process per page instead of the shared audit worker.")
+    parser.add_argument("--audit-concurrency", type=int, default=4, help="Browser audits in flight at once.")
+    parser.add_argument("--llm-concurrency", type=int, default=2, help="Concurrent Bedrock calls.")
+    parser.add_argument("--write-concurrency", type=int, default=1, help="Concurrent JSX/backup writes.")
+    parser.add_argument("--no-stream", action="store_true",
+                        help="Use blocking Bedrock calls and validate answers only once complete.")
+    parser.add_argument("--batch-tokens", type=int, default=BATCH_TOKEN_BUDGET,
+                        help="Estimated input-token budget for one batched suggestion call (0 disables batching).")
+    parser.add_argument("--since", metavar="REF",
+                        help="Only process pages changed since this git ref, or importing a changed file.")
+    parser.add_argument("--profile", type=Path, default=PROFILE_PATH, metavar="FILE",
+                        help=f"JSONL trace with one record per stage per page (default: {PROFILE_PATH}).")
+    parser.add_argument("--chrome-trace", type=Path, metavar="FILE",
+                        help="Also write the stage timings as Chrome trace events (chrome://tracing, Perfetto).")
+    parser.add_argument("--squash", action="store_true",
+                        help="Put all fixed pages in one commit instead of one commit per page.")
+    parser.add_argument("--no-push", action="store_true", help="Create the fix branch locally without pushing it.")
+    parser.add_argument("--report-format", choices=sorted(REPORT_FORMATS), default=REPORT_FORMAT,
+                        help="Encoding of the per-page reports (msgpack needs the msgpack package).")
+    parser.add_argument("--legacy-report", action=argparse.BooleanOptionalAction, default=True,
+                        help=f"Rebuild {REPORT_PATH} ({{\"pages\": [...]}}) from {CONSOLIDATED_REPORT_PATH} at the end "
+                             "(default); with --no-legacy-report only the NDJSON report is written.")
+    parser.add_argument("--no-fix-store", action="store_true",
+                        help=f"Ask Bedrock for every element instead of reusing fixes stored in {FIX_STORE_PATH}.")
+    parser.add_argument("--no-verify", action="store_true",
+                        help="Skip the scoped re-audit of fixed pages (and the rollback of pages that regressed).")
+    parser.add_argument("--no-attribution", action="store_true",
+                        help="Fix violations in the page file even when a shared component renders them.")
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N",
+                        help="Process only shard I of N (pages split by cost from the last run) and write "
+                             f"a bundle to {SHARD_ROOT}/ for `accessibility_fix.py merge` instead of publishing.")
+    parser.add_argument("--shard-costs", type=Path, default=SHARD_COSTS_PATH, metavar="FILE",
+                        help=f"Per-page costs the shards are balanced by (default: {SHARD_COSTS_PATH}); "
+                             "every shard must read the same file.")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"Continue the last interrupted run recorded in {JOURNAL_PATH}, skipping finished stages.")
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument("--no-cache", action="store_true", help="Neither read nor write the audit cache.")
+    cache.add_argument("--refresh", action="store_true", help="Re-audit every page and overwrite cached reports.")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["merge"]:
+        sys.exit(merge_shards(parse_merge_args(sys.argv[2:])))
+    args = parse_args()
+    STAGE_LIMITS = StageLimits(args.audit_concurrency, args.llm_concurrency, args.write_concurrency)
+    AUDIT_CACHE_MODE = "off" if args.no_cache else "refresh" if args.refresh else "on"
+    AUDIT_ONLY = args.audit_only
+    DEV_SERVER = args.dev_server
+    ATTRIBUTION = not args.no_attribution
+    VERIFY = not args.no_verify
+    REPORT_FORMAT = args.report_format
+    try:
+        ensure_report_format(REPORT_FORMAT)
+    except RuntimeError as e:
+        raise SystemExit(f"⚠ {e}")
+    SUGGESTION_BATCHER = SuggestionBatcher(token_budget=args.batch_tokens)
+    BEDROCK_STREAMING = not args.no_stream
     route_map = load_route_map()
-    consolidated = []
 
-    # Scan both .jsx and .tsx to be safe
-    targets = list(JSX_FOLDER.rglob("*.jsx")) + list(JSX_FOLDER.rglob("*.tsx"))
+    # Scan both .jsx and .tsx to be safe (sorted so job order is stable across runs)
+    targets = sorted(list(JSX_FOLDER.rglob("*.jsx")) + list(JSX_FOLDER.rglob("*.tsx")))
     if not targets:
         print(f"⚠ No JSX/TSX files found under {JSX_FOLDER.resolve()}")
-    for jsx_file in targets:
-        print(f"\n=== Processing {jsx_file} ===")
-        try:
-            process_jsx_file(jsx_file, route_map, consolidated)
-        except Exception:
-            print("❌ Failed while processing:", jsx_file)
-            print(traceback.format_exc())
+    if args.since:
+        targets = select_targets_since(targets, args.since)
+    jobs = [make_page_job(i, jsx_file, route_map) for i, jsx_file in enumerate(targets)]
+    if args.shard:
+        # Indexes stay those of the full target list, so `merge` restores the single-node order
+        shard_costs = load_costs(args.shard_costs)
+        pages = shard_pages(targets)
+        mine = set(partition(pages, args.shard[1], shard_costs)[args.shard[0] - 1])
+        jobs = [job for job in jobs if job.page in mine]
+        print(f"🔀 Shard {args.shard[0]}/{args.shard[1]}: {len(jobs)} of {len(targets)} page(s)"
+              + ("" if shard_costs else f" (no costs in {args.shard_costs}; balanced by file size)"))
 
-    # Write consolidated report (all pages)
-    consolidated_path = Path("accessibility-report.json")
-    with consolidated_path.open("w", encoding="utf-8") as f:
-        json.dump({"pages": consolidated}, f, indent=2)
-    print(f"\n✅ Consolidated report saved to {consolidated_path.resolve()}")
-
-    # Also keep legacy single-report behavior if the last run created the legacy file
-    # (Nothing else to do; per-page reports live in a11y_backups/**/accessibility-report.json)
+    BACKUP_ROOT.mkdir(parents=True, exist_ok=True)
+    PROFILE.open(args.profile)
+    JOURNAL = RunJournal(JOURNAL_PATH, resume=args.resume, argv=sys.argv[1:])
+    if JOURNAL.resumed:
+        progress = ", ".join(f"{n} {stage}" for stage, n in JOURNAL.progress().items()) or "nothing recorded"
+        print(f"⏯️ Resuming run #{JOURNAL.run_id} ({progress})")
+    elif args.resume:
+        print("⏯️ No interrupted run to resume; starting a new one.")
+    FIX_STORE = None if args.no_fix_store or AUDIT_ONLY else \
+        FixStore(FIX_STORE_PATH, BEDROCK_MODEL_ID, PROMPT_VERSION, FIX_STORE_MAX_ENTRIES)
+    if FIX_STORE is not None and FIX_STORE.invalidated:
+        print(f"🧠 Model or prompt changed: dropped {FIX_STORE.invalidated} stored fix(es).")
+    CONSOLIDATED_REPORT = ReportWriter(CONSOLIDATED_REPORT_PATH)
+    # Rebuilt from the NDJSON at the end (if at all): a copy left by an earlier run must not be read
+    REPORT_PATH.unlink(missing_ok=True)
+    if jobs:
+        if args.no_audit_worker:
+            write_check_script()
+        else:
+            start_audit_worker()
+            if AUDIT_WORKER is None:
+                write_check_script()
+    unpublished = False
+    try:
+        reported = run_pages(jobs)
+        if not AUDIT_ONLY and ATTRIBUTION and not args.shard:
+            run_shared_components(len(targets))
+        if not AUDIT_ONLY and VERIFY:
+            run_verification()
+        if args.shard:
+            CONSOLIDATED_REPORT.close()
+            PROFILE.close()
+            write_shard_bundle(args.shard, jobs, pages, shard_costs)
+        elif not AUDIT_ONLY:
+            with PROFILE.span("publish", ""):
+                branch = CHANGES.publish(squash=args.squash, push=not args.no_push)
+            for job in CHANGES.published:
+                JOURNAL.mark(job.page, "committed", source_digest(job.jsx_path), {"branch": branch})
+            unpublished = branch is None and bool(CHANGES.changed_jobs())
+        # A run whose fixes never reached a branch stays open, so --resume publishes them
+        if unpublished:
+            print(f"⏯️ Fixes were not published; run #{JOURNAL.run_id} stays open for --resume.")
+        else:
+            JOURNAL.finish()
+    finally:
+        stop_audit_worker()
+        stop_app_servers()
+        PROFILE.close()
+        CONSOLIDATED_REPORT.close()
+        JOURNAL.close()
+    LLM_STATS.report()
+    if FIX_STORE is not None:
+        memo = FIX_STORE.stats()
+        FIX_STORE.close()
+        if memo["hits"] or memo["misses"]:
+            print(f"🧠 Fix store: {memo['hits']} hit(s), {memo['misses']} miss(es) ({memo['hit_rate']:.0%}), "
+                  f"{memo['stored']} stored, {memo['evicted']} evicted, {memo['rejected']} rejected, "
+                  f"{memo['entries']} entries in {FIX_STORE_PATH}")
+    PROFILE.print_summary()
+    if args.chrome_trace:
+        PROFILE.write_chrome_trace(args.chrome_trace)
+
+    if not args.shard and not args.since:
+        update_shard_costs(iter_report(CONSOLIDATED_REPORT_PATH), PROFILE.records)
+
+    print(f"\n✅ Consolidated report: {reported} page(s) in {CONSOLIDATED_REPORT_PATH.resolve()}")
+    if args.legacy_report and not args.shard:
+        write_legacy_report(CONSOLIDATED_REPORT_PATH, REPORT_PATH)
+        print(f"✅ Legacy report saved to {REPORT_PATH.resolve()}")
+    if unpublished:
+        sys.exit(1)
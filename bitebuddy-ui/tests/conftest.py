@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The fixer modules live next to accessibility_fix.py, not in a package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,57 @@
+from a11y_fixstore import FixStore, fix_key
+
+
+def contrast_element(fg: str, bg: str) -> dict:
+    return {"source": '<span className="muted">', "issues": [
+        {"rule": "color-contrast", "htmlSnippet": '<span class="muted css-1x2y3z">Total</span>', "fg": fg, "bg": bg},
+    ]}
+
+
+def test_color_contrast_key_includes_the_color_pair():
+    light, dark = contrast_element("#777777", "#ffffff"), contrast_element("#777777", "#222222")
+    assert fix_key(light["issues"], light["source"]) != fix_key(dark["issues"], dark["source"])
+    upper = contrast_element("#777777", "#FFFFFF")
+    assert fix_key(light["issues"], light["source"]) == fix_key(upper["issues"], upper["source"])
+
+
+def test_store_does_not_reuse_a_colour_across_backgrounds():
+    store = FixStore()
+    store.put(contrast_element("#777777", "#ffffff"), '<span className="muted" style={{ color: "#595959" }}>')
+    assert store.get(contrast_element("#777777", "#222222")) is None
+    assert store.get(contrast_element("#777777", "#ffffff")) is not None
+    store.close()
+
+
+def test_key_ignores_volatile_attributes():
+    a = [{"rule": "image-alt", "htmlSnippet": '<img id="a1" data-testid="x" src="/logo.png">'}]
+    b = [{"rule": "image-alt", "htmlSnippet": '<img id="b7" src="/logo.png">'}]
+    assert fix_key(a, '<img src="/logo.png" />') == fix_key(b, '<img src="/logo.png" />')
+
+
+def test_reject_drops_a_regressing_fix():
+    store = FixStore()
+    element = {"source": "<button>", "issues": [{"rule": "button-name", "htmlSnippet": "<button></button>"}]}
+    store.put(element, '<button aria-label="Go">')
+    assert store.reject([fix_key(element["issues"], element["source"])]) == 1
+    assert store.get(element) is None
+    assert store.stats()["rejected"] == 1
+    store.close()
+
+
+def axe_contrast_element(fg: str, bg: str) -> dict:
+    """A prompt element built from an unmodified axe node: colors only in the summary, no fg/bg keys."""
+    summary = (f"Fix any of the following:\n  Element has insufficient color contrast of 4.47 "
+               f"(foreground color: {fg}, background color: {bg}, font size: 12.0pt (16px), "
+               f"font weight: normal). Expected contrast ratio of 4.5:1")
+    return {"source": '<span className="muted">', "issues": [
+        {"rule": "color-contrast", "htmlSnippet": '<span class="muted css-1x2y3z">Total</span>',
+         "failureSummary": summary},
+    ]}
+
+
+def test_color_contrast_key_uses_axe_colour_data():
+    light, dark = axe_contrast_element("#777777", "#ffffff"), axe_contrast_element("#777777", "#222222")
+    assert fix_key(light["issues"], light["source"]) != fix_key(dark["issues"], dark["source"])
+    # Same colours whether they arrive as fg/bg or only in axe's wording
+    enriched = contrast_element("#777777", "#ffffff")
+    assert fix_key(light["issues"], light["source"]) == fix_key(enriched["issues"], enriched["source"])
@@ -0,0 +1,50 @@
+from a11y_jsx import apply_edits, attribute_insertion, iter_elements, parse_jsx, run_visitors, visits
+
+
+def names(src: str) -> list[str]:
+    return [e.name for e in iter_elements(parse_jsx(src))]
+
+
+def test_nested_same_name_elements_close_in_order():
+    src = "<Table><TableCell><Table><TableCell>x</TableCell></Table></TableCell></Table>"
+    outer = parse_jsx(src)[0]
+    inner = outer.children[0].children[0]
+    assert (outer.name, inner.name) == ("Table", "Table")
+    assert src[outer.close[0]:outer.close[1]] == "</Table>" and outer.close[1] == len(src)
+    assert inner.inner(src) == "<TableCell>x</TableCell>"
+
+
+def test_code_strings_and_comments_are_not_jsx():
+    src = 'const s = "<p>"; // <span>\n/* <b> */ const a = x < y ? <div>{"}"}</div> : null;'
+    assert names(src) == ["div"]
+
+
+def test_expression_children_and_fragments():
+    src = "const g = <><ul>{items.map(i => <li key={i}>{`${i}`}</li>)}</ul></>;"
+    assert names(src) == ["", "ul", "li"]
+
+
+def test_unclosed_inner_element_ends_with_its_parent():
+    src = "<p>open <span>unclosed</p><i />"
+    p, i = parse_jsx(src)
+    assert p.close is not None and p.children[0].close is None
+    assert i.name == "i" and i.self_closing
+
+
+def test_tags_the_simple_pattern_skips_use_the_full_parser():
+    src = '<div><Button {...props} onClick={() => { go("}") }}>Go</Button></div>'
+    button = parse_jsx(src)[0].children[0]
+    assert [a.name for a in button.open.attrs] == ["{...}", "onClick"]
+    assert button.inner(src) == "Go"
+
+
+def test_visitors_edit_in_one_pass():
+    @visits("span")
+    def mark(element, src):
+        return [attribute_insertion(src, element.open, "tabIndex={0}")]
+    src = '<div><span a="1">x</span><b /><span /></div>'
+    assert run_visitors(src, [mark]) == '<div><span a="1" tabIndex={0}>x</span><b /><span tabIndex={0} /></div>'
+
+
+def test_apply_edits_keeps_insertion_order_at_one_offset():
+    assert apply_edits("<a>", [(2, 2, " x"), (2, 2, " y"), (0, 1, "[")]) == "[a x y>"
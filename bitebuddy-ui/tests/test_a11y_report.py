@@ -0,0 +1,23 @@
+import json
+
+from a11y_report import ReportWriter, iter_report
+
+
+def test_report_is_in_job_order_after_close(tmp_path):
+    path = tmp_path / "report.ndjson"
+    writer = ReportWriter(path)
+    for index in (2, 0, 3, 1):  # the order the pages finished in
+        writer.append({"index": index, "page": f"p{index}.jsx", "note": "é" * index})
+    writer.close()
+    writer.close()  # idempotent: the shard path closes it twice
+    assert [entry["index"] for entry in iter_report(path)] == [0, 1, 2, 3]
+    assert json.loads(path.read_text(encoding="utf-8").splitlines()[3])["note"] == "ééé"
+
+
+def test_interrupted_report_keeps_completion_order(tmp_path):
+    path = tmp_path / "report.ndjson"
+    writer = ReportWriter(path)
+    for index in (1, 0):
+        writer.append({"index": index})
+    assert [entry["index"] for entry in iter_report(path)] == [1, 0]
+    writer.close()
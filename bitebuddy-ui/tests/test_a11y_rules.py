@@ -0,0 +1,189 @@
+import pytest
+
+from a11y_rules import (RULE_FIXERS, apply_rule_fixes, contrast_data, contrast_ratio, locate_node,
+                        nearest_compliant_color)
+
+
+def run(src: str, rule_id: str, html: str, **node):
+    """(patched source, remaining violations, nodes fixed) for one axe node."""
+    return apply_rule_fixes(src, [{"id": rule_id, "nodes": [{"html": html, **node}]}])
+
+
+# ---------- Locating nodes ----------
+def test_locate_node_picks_the_matching_attribute():
+    src = '<div><img src="/a.png" /><img src="/b.png" /></div>'
+    tag = locate_node(src, {"html": '<img src="/b.png">'})
+    assert src[tag.start:tag.end] == '<img src="/b.png" />'
+
+
+def test_locate_node_refuses_a_lone_contradicting_tag():
+    src = '<div><img src="/hero.png" /></div>'
+    assert locate_node(src, {"html": '<img src="/logo-from-navbar.svg">'}) is None
+
+
+def test_locate_node_refuses_ties():
+    src = "<div><img /><img /></div>"
+    assert locate_node(src, {"html": "<img>"}) is None
+
+
+# ---------- image-alt ----------
+def test_image_alt_from_literal_src():
+    out, left, fixed = run('<img src="/main-logo.png" />', "image-alt", '<img src="/main-logo.png">')
+    assert out == '<img src="/main-logo.png" alt="Main logo" />'
+    assert (left, fixed) == ([], 1)
+
+
+def test_image_alt_from_imported_src():
+    src = 'import heroImage from "./assets/hero-image.jpg";\nconst A = () => <img className="hero" src={heroImage} />;'
+    out, left, fixed = run(src, "image-alt", '<img class="hero" src="/assets/hero-image.abc123.jpg">')
+    assert 'alt="Hero image"' in out
+    assert fixed == 1
+
+
+def test_image_alt_leaves_contradicting_image_alone():
+    src = '<img src="/hero.png" />'
+    out, left, fixed = run(src, "image-alt", '<img src="/logo-from-navbar.svg">')
+    assert out == src
+    assert fixed == 0 and len(left) == 1
+
+
+# ---------- button-name ----------
+def test_button_name_from_icon():
+    src = '<button className="del"><DeleteIcon /></button>'
+    out, left, fixed = run(src, "button-name", '<button class="del"><svg></svg></button>')
+    assert out.startswith('<button className="del" aria-label="Delete">')
+    assert fixed == 1
+
+
+def test_button_name_without_any_label_source():
+    src = '<button className="del"><span /></button>'
+    out, left, fixed = run(src, "button-name", '<button class="del"><span></span></button>')
+    assert out == src
+    assert fixed == 0 and left[0]["nodes"]
+
+
+# ---------- link-name ----------
+def test_link_name_from_route():
+    src = '<Link to="/order-history"><HistoryIcon /></Link>'
+    out, _, fixed = run(src, "link-name", '<a href="/order-history"><svg></svg></a>')
+    assert 'aria-label="History"' in out
+    assert fixed == 1
+
+
+def test_link_name_from_href_without_icon():
+    src = '<a href="/order-history"><span /></a>'
+    out, _, fixed = run(src, "link-name", '<a href="/order-history"><span></span></a>')
+    assert 'aria-label="Order history"' in out
+    assert fixed == 1
+
+
+def test_link_name_skips_placeholder_href():
+    src = '<a href="#"><span /></a>'
+    out, left, fixed = run(src, "link-name", '<a href="#"><span></span></a>')
+    assert out == src
+    assert fixed == 0 and len(left) == 1
+
+
+# ---------- label / select-name ----------
+@pytest.mark.parametrize("rule_id, src, html, label", [
+    ("label", '<input type="email" placeholder="Email address" />', '<input type="email" placeholder="Email address">',
+     "Email address"),
+    ("select-name", '<select name="delivery_slot"></select>', '<select name="delivery_slot">', "Delivery slot"),
+])
+def test_form_label_from_attributes(rule_id, src, html, label):
+    out, _, fixed = run(src, rule_id, html)
+    assert f'aria-label="{label}"' in out
+    assert fixed == 1
+
+
+def test_form_label_without_any_label_source():
+    src = '<input type="text" />'
+    out, left, fixed = run(src, "label", '<input type="text">')
+    assert out == src
+    assert fixed == 0 and len(left) == 1
+
+
+# ---------- th scope ----------
+def test_th_scope_in_head_and_body():
+    src = "<table><thead><tr><th>Item</th></tr></thead><tbody><tr><th>Pizza</th><td>9</td></tr></tbody></table>"
+    out, _, fixed = apply_rule_fixes(src, [{"id": "scope-attr-valid", "nodes": [
+        {"html": "<th>Item</th>"}, {"html": "<th>Pizza</th>"},
+    ]}])
+    assert '<th scope="col">Item' in out and '<th scope="row">Pizza' in out
+    assert fixed == 2
+
+
+def test_th_scope_keeps_valid_scope():
+    src = '<table><tbody><tr><th scope="row">Pizza</th></tr></tbody></table>'
+    out, left, fixed = run(src, "scope-attr-valid", '<th scope="row">Pizza</th>')
+    assert out == src
+    assert fixed == 0 and len(left) == 1
+
+
+def test_th_has_data_cells_is_left_to_the_model():
+    assert "th-has-data-cells" not in RULE_FIXERS
+    src = "<table><tr><th>Empty</th></tr></table>"
+    out, left, fixed = run(src, "th-has-data-cells", "<th>Empty</th>")
+    assert out == src and fixed == 0
+
+
+# ---------- color-contrast ----------
+@pytest.mark.parametrize("fg, bg", [("#777777", "#ffffff"), ("#999", "#ffffff"), ("#3a3a3a", "#000000"),
+                                    ("#ff6600", "#ffffff")])
+def test_nearest_compliant_color_reaches_aa(fg, bg):
+    color = nearest_compliant_color(fg, bg)
+    assert contrast_ratio(color, bg) >= 4.5
+
+
+def test_nearest_compliant_color_keeps_passing_color():
+    assert nearest_compliant_color("#000000", "#FFFFFF") == "#000000"
+
+
+def test_color_contrast_patches_inline_style():
+    src = '<p style={{ color: "#777777" }}>Hi</p>'
+    out, left, fixed = run(src, "color-contrast", '<p style="color: rgb(119, 119, 119);">Hi</p>',
+                           fg="#777777", bg="#ffffff", failureSummary="Expected contrast ratio of 4.5:1")
+    assert fixed == 1 and left == []
+    color = out.split('"')[1]
+    assert color != "#777777" and contrast_ratio(color, "#ffffff") >= 4.5
+
+
+def test_color_contrast_leaves_class_styles_alone():
+    src = '<p className="muted">Hi</p>'
+    out, left, fixed = run(src, "color-contrast", '<p class="muted">Hi</p>', fg="#777777", bg="#ffffff")
+    assert out == src
+    assert fixed == 0 and len(left) == 1
+
+
+# An unmodified axe-core color-contrast node: no fg/bg keys of its own
+AXE_CONTRAST_NODE = {
+    "html": '<p style="color: rgb(119, 119, 119);">Hi</p>',
+    "target": ["main > p"],
+    "any": [{
+        "id": "color-contrast", "impact": "serious",
+        "data": {"fgColor": "#777777", "bgColor": "#ffffff", "contrastRatio": 4.47, "fontSize": "12.0pt (16px)",
+                 "fontWeight": "normal", "messageKey": None, "expectedContrastRatio": "4.5:1"},
+        "message": "Element has insufficient color contrast of 4.47 (foreground color: #777777, background color: "
+                   "#ffffff, font size: 12.0pt (16px), font weight: normal). Expected contrast ratio of 4.5:1",
+    }],
+    "all": [], "none": [],
+    "failureSummary": "Fix any of the following:\n  Element has insufficient color contrast of 4.47 (foreground color: "
+                      "#777777, background color: #ffffff, font size: 12.0pt (16px), font weight: normal). "
+                      "Expected contrast ratio of 4.5:1",
+}
+
+
+def test_contrast_data_from_axe_check_data():
+    assert contrast_data(AXE_CONTRAST_NODE) == {"fg": "#777777", "bg": "#ffffff", "contrast": 4.47, "expected": 4.5}
+
+
+def test_contrast_data_from_axe_summary_wording():
+    node = {"failureSummary": AXE_CONTRAST_NODE["failureSummary"].replace("4.5:1", "7:1")}
+    assert contrast_data(node) == {"fg": "#777777", "bg": "#ffffff", "contrast": 4.47, "expected": 7.0}
+
+
+def test_color_contrast_fixes_an_unmodified_axe_node():
+    src = '<p style={{ color: "#777777" }}>Hi</p>'
+    out, left, fixed = apply_rule_fixes(src, [{"id": "color-contrast", "nodes": [AXE_CONTRAST_NODE]}])
+    assert fixed == 1 and left == []
+    assert contrast_ratio(out.split('"')[1], "#ffffff") >= 4.5
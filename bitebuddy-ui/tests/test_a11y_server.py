@@ -0,0 +1,48 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import pytest
+
+from a11y_server import STUB_LOCAL_STORAGE, AppServers
+
+ROOT = Path(__file__).resolve().parent.parent
+BROWSER_TOOLCHAIN = bool(shutil.which("node") and shutil.which("npm")) and all(
+    (ROOT / "node_modules" / name).is_dir() for name in ("playwright", "@axe-core/playwright", "vite"))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_stub_session_is_seeded_only_with_the_stub_backend():
+    assert AppServers("http://localhost:8989").local_storage == STUB_LOCAL_STORAGE
+    assert AppServers("http://localhost:8989", stub_backend=False).local_storage == {}
+
+
+@pytest.mark.skipif(not BROWSER_TOOLCHAIN, reason="needs node, npm install and Playwright's Chromium")
+def test_private_route_renders_its_own_page(tmp_path):
+    accessibility_fix = pytest.importorskip("accessibility_fix")
+    script = tmp_path / "accessibility-check.cjs"
+    script.write_text(accessibility_fix.ACCESSIBILITY_CHECK_JS, encoding="utf-8")
+    env = {**os.environ, "NODE_PATH": str(ROOT / "node_modules")}
+
+    def audited_path(url: str, storage: dict) -> str:
+        out = tmp_path / "report.json"
+        seed = ["--storage", json.dumps(storage)] if storage else []
+        subprocess.run(["node", str(script), "--url", url, "--out", str(out), *seed],
+                       cwd=ROOT, env=env, check=True, capture_output=True)
+        return urlsplit(json.loads(out.read_text(encoding="utf-8"))["url"]).path
+
+    base_url = f"http://127.0.0.1:{free_port()}"
+    with AppServers(base_url, root=ROOT, out_dir=tmp_path / "dist") as servers:
+        assert servers.local_storage, "port 5000 is taken, so the stub session is not seeded"
+        assert audited_path(servers.base_url + "/catalog", servers.local_storage) == "/catalog"
+        # Without the seeded session PrivateRoute sends the fresh context to /login
+        assert audited_path(servers.base_url + "/catalog", {}) == "/login"
@@ -0,0 +1,123 @@
+import json
+
+import pytest
+
+from a11y_stream import FakeBedrockClient, FixStreamValidator, StreamRejected
+
+SOURCES = {"n1": '<button className="del">', "n2": '<img src="/logo.png" />'}
+FIXES = [
+    {"id": "n1", "replacement": """<button className="del" aria-label='Delete "draft" \\ café'>"""},
+    {"id": "n2", "replacement": '<img src="/logo.png" alt="Logo" />'},
+]
+# As the model sends it: the quotes, the backslash and the é arrive as JSON escapes
+ANSWER = json.dumps(FIXES)
+
+
+def feed_all(chunks, sources=SOURCES) -> FixStreamValidator:
+    validator = FixStreamValidator(sources)
+    for chunk in chunks:
+        validator.feed(chunk)
+    validator.finish()
+    return validator
+
+
+# ---------- FixStreamValidator ----------
+def test_answer_split_at_every_offset():
+    assert '\\"' in ANSWER and "\\\\" in ANSWER and "\\u00e9" in ANSWER
+    for cut in range(1, len(ANSWER)):  # mid-string, mid-escape, between objects...
+        assert feed_all([ANSWER[:cut], ANSWER[cut:]]).fixes == FIXES, ANSWER[:cut]
+
+
+def test_answer_one_character_at_a_time():
+    assert feed_all(list(ANSWER)).fixes == FIXES
+
+
+def test_fenced_answer_is_accepted():
+    assert len(feed_all(["```js", "on\n", ANSWER, "\n```"]).fixes) == 2
+
+
+def test_narration_before_the_array_is_rejected():
+    with pytest.raises(StreamRejected, match="narration"):
+        feed_all(["Here is the updated JSX: ", ANSWER])
+
+
+def test_malformed_object_keeps_the_fixes_before_it():
+    validator = FixStreamValidator(SOURCES)
+    with pytest.raises(StreamRejected, match="malformed JSON"):
+        validator.feed(ANSWER[:ANSWER.index("}, ") + 3] + '{"id": "n2" "replacement": "<img />"}]')
+    assert [f["id"] for f in validator.fixes] == ["n1"]
+
+
+def test_unknown_id_is_rejected():
+    with pytest.raises(StreamRejected, match="unknown id"):
+        feed_all(['[{"id": "n9", "replacement": "<button>"}]'])
+
+
+def test_replacement_for_another_element_is_rejected():
+    with pytest.raises(StreamRejected, match="n1: replacement is not a single opening tag"):
+        feed_all(['[{"id": "n1", "replacement": "<a href=\\"/\\">"}]'])
+
+
+def test_done_once_every_id_is_answered():
+    validator = FixStreamValidator(SOURCES)
+    validator.feed(ANSWER[:-1])  # no closing "]" yet
+    assert validator.done
+    assert validator.feed("] Let me know if you need anything else!") == []
+    validator.finish()
+
+
+def test_unclosed_array_with_missing_ids_is_rejected():
+    with pytest.raises(StreamRejected, match="ended before"):
+        feed_all([ANSWER[:ANSWER.index("}, ") + 1]])
+
+
+# ---------- stream_claude / retries (need accessibility_fix) ----------
+@pytest.fixture
+def fixer(monkeypatch):
+    fixer = pytest.importorskip("accessibility_fix")
+    monkeypatch.setattr(fixer, "BEDROCK_STREAMING", True)
+    monkeypatch.setattr(fixer, "LLM_STATS", fixer.LlmStats())
+    return fixer
+
+
+def test_stream_closes_once_every_id_is_answered(fixer, monkeypatch):
+    client = FakeBedrockClient(lambda request: ANSWER[:-1] + "\n" + "chatter " * 2000, chunk_chars=8)
+    monkeypatch.setattr(fixer, "_BEDROCK_CLIENT", client)
+    validator = FixStreamValidator(SOURCES)
+    result = fixer.stream_claude("system", "Elements:\n[]", 256, 0.0, validator)
+    body = client.bodies[0]
+    assert result["rejected"] is None and len(validator.fixes) == 2
+    assert body.closed and body.delivered < len(ANSWER) // 8 + 4  # the chatter was never read
+    assert result["first_fix"] is not None and result["usage"]["output_tokens"] > 0
+
+
+def test_rejected_stream_is_cut_off(fixer, monkeypatch):
+    client = FakeBedrockClient(lambda request: "Here's the updated JSX:\n" + "x" * 8000, chunk_chars=16)
+    monkeypatch.setattr(fixer, "_BEDROCK_CLIENT", client)
+    result = fixer.stream_claude("system", "Elements:\n[]", 256, 0.0, FixStreamValidator(SOURCES))
+    assert result["rejected"].startswith("narration")
+    assert client.bodies[0].delivered < 10
+
+
+class Job:
+    page = "home.jsx"
+
+
+def test_retry_asks_again_only_for_unanswered_elements(fixer, monkeypatch):
+    def respond(request):
+        asked = json.loads(request["messages"][0]["content"].split("Elements:\n", 1)[1])
+        if len(asked) == 2:  # first attempt: one good fix, then a broken object
+            return json.dumps([{**FIXES[0], "id": "P1.n1"}])[:-1] + ', {"id": oops'
+        return json.dumps([{"id": el["id"], "replacement": FIXES[1]["replacement"]} for el in asked])
+
+    client = FakeBedrockClient(respond, chunk_chars=16)
+    monkeypatch.setattr(fixer, "_BEDROCK_CLIENT", client)
+    elements = [{"id": k, "source": v, "issues": []} for k, v in SOURCES.items()]
+    fixes = fixer.SuggestionBatcher(token_budget=0).submit(Job(), elements).result(5)
+
+    assert sorted(f["id"] for f in fixes) == ["n1", "n2"]
+    retry = client.requests[1]["messages"][0]["content"]
+    assert retry.startswith("Your previous answer was rejected: malformed JSON")
+    assert [el["id"] for el in json.loads(retry.split("Elements:\n", 1)[1])] == ["P1.n2"]
+    call = fixer.LLM_STATS.calls[0]
+    assert call["attempts"] == 2 and call["wasted_output_tokens"] >= 0
@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("dotenv")  # accessibility_fix needs python-dotenv to import at all
+
+import accessibility_fix as fixer  # noqa: E402
+
+
+def test_instructions_are_long_enough_to_cache():
+    # Bedrock only caches prefixes of at least 1024 tokens; shorter ones are billed in full every call
+    assert fixer.estimate_tokens(fixer.SUGGESTION_INSTRUCTIONS) >= fixer.PROMPT_CACHE_MIN_TOKENS
+
+
+def test_default_model_gets_a_cache_point(monkeypatch):
+    monkeypatch.setattr(fixer, "_PROMPT_CACHE_SUPPORTED",
+                        any(f in fixer.BEDROCK_MODEL_ID for f in fixer.PROMPT_CACHE_MODELS))
+    request = fixer.claude_request(fixer.SUGGESTION_INSTRUCTIONS, "Elements:\n[]", 256, 0.0)
+    assert request["system"][0]["cache_control"] == {"type": "ephemeral"}
+
+
+def test_model_without_caching_gets_no_cache_point(monkeypatch):
+    monkeypatch.setattr(fixer, "_PROMPT_CACHE_SUPPORTED", False)
+    request = fixer.claude_request(fixer.SUGGESTION_INSTRUCTIONS, "Elements:\n[]", 256, 0.0)
+    assert "cache_control" not in request["system"][0]
@@ -0,0 +1,89 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("dotenv")  # accessibility_fix needs python-dotenv to import at all
+
+import accessibility_fix as fixer  # noqa: E402
+
+PAGES = {"home.jsx": "<img src=\"/logo.png\" />\n", "order history/cart page.jsx": "<button><CartIcon /></button>\n"}
+
+
+def git(*args, cwd=".") -> str:
+    return subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    """A repo with the app in ui/ (so paths need the repo prefix) and a bare `origin`; cwd is ui/."""
+    for key, value in {"GIT_AUTHOR_NAME": "a11y", "GIT_AUTHOR_EMAIL": "a11y@example.com",
+                       "GIT_COMMITTER_NAME": "a11y", "GIT_COMMITTER_EMAIL": "a11y@example.com"}.items():
+        monkeypatch.setenv(key, value)
+    remote = tmp_path / "remote.git"
+    git("init", "-q", "--bare", str(remote))
+    root = tmp_path / "repo"
+    ui = root / "ui"
+    for name, source in PAGES.items():
+        path = ui / fixer.JSX_FOLDER / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding="utf-8")
+    (ui / fixer.JSX_FOLDER / "about.jsx").write_text("<main />\n", encoding="utf-8")
+    git("init", "-q", cwd=root)
+    git("add", "-A", cwd=root)
+    git("commit", "-q", "-m", "init", cwd=root)
+    git("remote", "add", "origin", str(remote), cwd=root)
+    monkeypatch.chdir(ui)
+    return root, remote
+
+
+def fixed_pages() -> fixer.ChangeCollector:
+    """Fix both PAGES (with a backup each) and leave about.jsx unchanged."""
+    changes = fixer.ChangeCollector()
+    for index, name in enumerate(["about.jsx", *PAGES]):
+        job = fixer.make_page_job(index, fixer.JSX_FOLDER / name, {})
+        if name in PAGES:
+            job.backup_path.parent.mkdir(parents=True, exist_ok=True)
+            job.backup_path.write_text(PAGES[name], encoding="utf-8")
+            fixed = PAGES[name].replace(" />", ' alt="Logo" />').replace("<button>", '<button aria-label="Cart">')
+            job.jsx_path.write_text(fixed, encoding="utf-8")
+        changes.add(job)
+    return changes
+
+
+def changed_paths(remote: Path, rev: str) -> list[str]:
+    return sorted(git("show", "--name-only", "--format=", rev, cwd=remote).split("\n")[:-1])
+
+
+def test_publish_one_commit_per_page(repo):
+    root, remote = repo
+    branch = fixed_pages().publish(squash=False)
+
+    assert branch and git("rev-list", "--count", f"HEAD..{branch}", cwd=root).strip() == "2"
+    # Pushed: the bare remote has the branch and both commits
+    assert git("rev-list", "--count", branch, cwd=remote).strip() == "3"
+    assert changed_paths(remote, branch) == [
+        "ui/a11y_backups/order history/cart page_backup.jsx", "ui/src/page/order history/cart page.jsx"]
+    assert changed_paths(remote, branch + "~1") == ["ui/a11y_backups/home_backup.jsx", "ui/src/page/home.jsx"]
+    assert 'aria-label="Cart"' in git("show", f"{branch}:ui/src/page/order history/cart page.jsx", cwd=remote)
+    # The working tree, index and current branch are left as they were
+    assert git("rev-parse", "--abbrev-ref", "HEAD", cwd=root).strip() != branch
+    assert git("status", "--porcelain", "--untracked-files=no", cwd=root).count(" M ") == 2
+
+
+def test_publish_squashed(repo):
+    root, remote = repo
+    branch = fixed_pages().publish(squash=True)
+
+    assert branch and git("rev-list", "--count", f"HEAD..{branch}", cwd=root).strip() == "1"
+    assert changed_paths(remote, branch) == [
+        "ui/a11y_backups/home_backup.jsx", "ui/a11y_backups/order history/cart page_backup.jsx",
+        "ui/src/page/home.jsx", "ui/src/page/order history/cart page.jsx"]
+    message = git("log", "-1", "--format=%B", branch, cwd=remote)
+    assert "2 page(s)" in message and "- order history/cart page.jsx" in message
+
+
+def test_publish_without_changes(repo):
+    changes = fixer.ChangeCollector()
+    changes.add(fixer.make_page_job(0, fixer.JSX_FOLDER / "about.jsx", {}))
+    assert changes.publish() is None and changes.published == []
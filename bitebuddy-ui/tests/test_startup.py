@@ -0,0 +1,22 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("dotenv")  # accessibility_fix needs python-dotenv to import at all
+
+from a11y_bench import LAZY_MODULES, parse_importtime  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def import_times() -> dict:
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import accessibility_fix"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    return parse_importtime(proc.stderr)
+
+
+def test_import_leaves_lazy_modules_unloaded():
+    eager = sorted(name for name in import_times() if name.split(".")[0] in LAZY_MODULES)
+    assert eager == [], f"imported at startup but should be lazy: {', '.join(eager[:5])}"
@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("dotenv")  # accessibility_fix needs python-dotenv to import at all
+
+import accessibility_fix as fixer  # noqa: E402
+
+
+class Job:
+    def __init__(self, page):
+        self.page = page
+
+
+def answer_every_element(monkeypatch):
+    """Stub request_fixes: answer each prompted element with an aria-label; returns the prompted ids."""
+    asked = []
+
+    def request_fixes(user_content, max_tokens, temperature, validator):
+        import json
+        elements = json.loads(user_content.split("Elements:\n", 1)[1])
+        asked.extend(el["id"] for el in elements)
+        answer = json.dumps([{"id": el["id"], "replacement": el["source"][:-1] + ' aria-label="Go">'}
+                             for el in elements])
+        validator.feed(answer)
+        validator.finish()
+        return {"usage": {}, "latency": 0.0, "first_fix": 0.0, "rejected": None}
+
+    monkeypatch.setattr(fixer, "request_fixes", request_fixes)
+    return asked
+
+
+def test_whitespace_twins_are_each_answered(monkeypatch):
+    asked = answer_every_element(monkeypatch)
+    issues = [{"rule": "button-name", "htmlSnippet": "<button></button>"}]
+    batcher = fixer.SuggestionBatcher(token_budget=100000, linger=60)
+    a = batcher.submit(Job("a.jsx"), [{"id": "n1", "source": '<button type="button">', "issues": issues}])
+    b = batcher.submit(Job("b.jsx"), [{"id": "n1", "source": '<button\n  type="button">', "issues": issues}])
+    c = batcher.submit(Job("c.jsx"), [{"id": "n1", "source": '<button type="button">', "issues": issues}])
+    batcher.flush()
+    assert len(asked) == 2  # c shares a's answer; b is spelled differently and asked on its own
+    assert a.result(1) == c.result(1) == [{"id": "n1", "replacement": '<button type="button" aria-label="Go">'}]
+    assert b.result(1) == [{"id": "n1", "replacement": '<button\n  type="button" aria-label="Go">'}]